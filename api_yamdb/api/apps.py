@@ -5,3 +5,12 @@ class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
     verbose_name = 'API'
+
+    def ready(self):
+        from django.core.signals import request_started
+
+        import api.signals  # noqa: F401
+        from api.db import check_connections, install_health_checks
+
+        install_health_checks()
+        request_started.connect(check_connections)
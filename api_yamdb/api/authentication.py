@@ -0,0 +1,182 @@
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from api.cache import get_cache
+from api.metrics import record_cache
+from users.models import CustomUser, RevokedToken
+
+AUTH_KEY = 'api:auth:{user_id}'
+# Отзыв токена и номер последнего отзыва всех токенов пользователя.
+REVOKED_TOKEN_KEY = 'api:auth:revoked:{jti}'
+REVOKED_USER_KEY = 'api:auth:revoked-user:{user_id}'
+# Номер последнего отзыва всех токенов пользователя на момент выдачи токена.
+REVOCATION_CLAIM = 'rev'
+# Поля пользователя, которых достаточно для проверки прав доступа.
+AUTH_FIELDS = ('id', 'username', 'role', 'is_staff', 'is_superuser',
+               'is_active')
+# Поля, которые при `JWT_ROLE_CLAIMS` записываются в токен доступа.
+AUTH_CLAIMS = ('username', 'role', 'is_staff', 'is_superuser')
+
+
+def get_authorization(user_id):
+    """Поля `AUTH_FIELDS` пользователя из кэша или, при промахе, из базы.
+
+    Возвращает `None`, если пользователя нет.
+    """
+    key = AUTH_KEY.format(user_id=user_id)
+    data = get_cache().get(key)
+    record_cache('auth', data is not None)
+    if data is None:
+        data = CustomUser.objects.filter(pk=user_id).values(
+            *AUTH_FIELDS
+        ).first()
+        if data is None:
+            return None
+        get_cache().set(key, data, settings.AUTH_CACHE_TIMEOUT)
+    return data
+
+
+def invalidate_authorization(*user_ids):
+    """Сбрасывает кэш прав пользователей после фиксации транзакции."""
+    keys = [AUTH_KEY.format(user_id=user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: get_cache().delete_many(keys))
+
+
+def build_user(data):
+    """Пользователь, загруженный только с полями `data`.
+
+    Остальные поля отложены и загружаются из базы при первом обращении.
+    """
+    names = [
+        field.attname for field in CustomUser._meta.concrete_fields
+        if field.attname in data
+    ]
+    return CustomUser.from_db(
+        router.db_for_read(CustomUser), names,
+        [data[name] for name in names]
+    )
+
+
+def get_revocations(jti, user_id):
+    """Отозван ли токен `jti` и номер последнего отзыва всех токенов
+    пользователя — из кэша или, при промахе, одним запросом к базе.
+    """
+    keys = [
+        REVOKED_TOKEN_KEY.format(jti=jti),
+        REVOKED_USER_KEY.format(user_id=user_id),
+    ]
+    cached = get_cache().get_many(keys)
+    record_cache('revoked', len(cached) == len(keys))
+    if len(cached) < len(keys):
+        token_revoked, last = False, 0
+        for pk, revoked_jti in RevokedToken.objects.filter(
+            Q(jti=jti) | Q(user_id=user_id, jti=''),
+            expires_at__gt=timezone.now()
+        ).values_list('pk', 'jti'):
+            if revoked_jti:
+                token_revoked = True
+            else:
+                last = max(pk, last)
+        found = dict(zip(keys, (token_revoked, last)))
+        get_cache().set_many(
+            {key: found[key] for key in keys if key not in cached},
+            settings.AUTH_CACHE_TIMEOUT
+        )
+        cached = {**found, **cached}
+    return cached[keys[0]], cached[keys[1]]
+
+
+def is_revoked(token):
+    token_revoked, last = get_revocations(
+        token.get(api_settings.JTI_CLAIM),
+        token.get(api_settings.USER_ID_CLAIM)
+    )
+    return token_revoked or token.get(REVOCATION_CLAIM, 0) < last
+
+
+def prune_revoked():
+    """Удаляет записи об отзыве токенов, срок действия которых истёк."""
+    RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+
+
+def revoke_token(token):
+    jti = token[api_settings.JTI_CLAIM]
+    RevokedToken.objects.create(
+        jti=jti,
+        user_id=token[api_settings.USER_ID_CLAIM],
+        expires_at=datetime_from_epoch(token['exp'])
+    )
+    prune_revoked()
+    transaction.on_commit(lambda: get_cache().set(
+        REVOKED_TOKEN_KEY.format(jti=jti), True, settings.AUTH_CACHE_TIMEOUT
+    ))
+
+
+def revoke_user_tokens(*user_ids):
+    """Отзывает все выданные пользователям токены."""
+    expires_at = timezone.now() + api_settings.ACCESS_TOKEN_LIFETIME
+    RevokedToken.objects.bulk_create(
+        RevokedToken(user_id=user_id, expires_at=expires_at)
+        for user_id in user_ids
+    )
+    prune_revoked()
+    keys = [REVOKED_USER_KEY.format(user_id=user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: get_cache().delete_many(keys))
+
+
+def issue_access_token(user):
+    token = AccessToken.for_user(user)
+    token[REVOCATION_CLAIM] = RevokedToken.objects.filter(
+        user_id=user.pk, jti=''
+    ).aggregate(last=Max('pk'))['last'] or 0
+    if settings.JWT_ROLE_CLAIMS:
+        for claim in AUTH_CLAIMS:
+            token[claim] = getattr(user, claim)
+    return token
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без запроса к базе на каждый запрос.
+
+    Если в токене есть роль (`JWT_ROLE_CLAIMS`), пользователь строится
+    прямо из токена; при изменении роли, блокировке или удалении
+    пользователя его токены отзываются. Иначе права пользователя берутся
+    из кэша, который сбрасывается при сохранении и удалении пользователя.
+    В обоих случаях токен проверяется по кэшированным записям об отзыве
+    этого токена и всех токенов пользователя.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            return super().get_user(validated_token)
+        if is_revoked(validated_token):
+            raise InvalidToken(_('Token has been revoked'))
+        if settings.JWT_ROLE_CLAIMS and all(
+            claim in validated_token for claim in AUTH_CLAIMS
+        ):
+            data = {'id': user_id, 'is_active': True}
+            data.update(
+                (claim, validated_token[claim]) for claim in AUTH_CLAIMS
+            )
+            return build_user(data)
+        data = get_authorization(user_id)
+        if data is None:
+            raise AuthenticationFailed(
+                _('User not found'), code='user_not_found'
+            )
+        if not data['is_active']:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        return build_user(data)
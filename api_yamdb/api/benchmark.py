@@ -0,0 +1,327 @@
+"""Нагрузочные замеры API: наборы данных, сценарии и сравнение результатов.
+
+Сценарии выполняются через тестовый клиент Django или по HTTP против
+запущенного сервера (`api.management.commands.benchmark_api`).
+"""
+import json
+import os
+import platform
+import subprocess
+from collections import namedtuple
+from contextlib import contextmanager
+from itertools import count, islice
+from statistics import mean, quantiles
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+import django
+from django.core.management import CommandError, call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from api.db import capture_queries
+from reviews.generator import DataGenerator
+from reviews.models import Comment, Genre, Review, Title
+from users.models import CustomUser
+
+# Масштабы набора данных: число отзывов.
+SCALES = {'1k': 1000, '100k': 100_000, '1m': 1_000_000}
+# Среднее число отзывов на произведение.
+REVIEWS_PER_TITLE = 20
+# Один комментарий на COMMENT_EVERY отзывов.
+COMMENT_EVERY = 5
+USERS = REVIEWS_PER_TITLE * 5
+CATEGORIES = 5
+GENRES = 10
+CONFIRMATION_CODE = 'benchmark'
+
+# Сценарий: HTTP-метод, имя маршрута из `api.urls` (или путь), функция,
+# которая по номеру запроса и параметрам набора возвращает аргументы
+# маршрута, параметры запроса и тело, и список набора, из которого она
+# выбирает значения.
+Scenario = namedtuple(
+    'Scenario', 'name method route request data', defaults=(None,)
+)
+# Описания списков набора для сообщения о пропущенном сценарии.
+DATASET_ITEMS = {
+    'offsets': 'произведений',
+    'titles': 'произведений',
+    'genres': 'жанров',
+    'reviews': 'отзывов с комментариями',
+    'users': (
+        f'пользователей с кодом подтверждения «{CONFIRMATION_CODE}» '
+        '(их создаёт benchmark_api --seed)'
+    ),
+}
+Result = namedtuple(
+    'Result', 'status seconds queries content', defaults=(b'',)
+)
+
+
+def pick(values, number):
+    return values[number * 7919 % len(values)]
+
+
+SCENARIOS = (
+    Scenario('titles-list', 'get', 'title-list', lambda number, data: (
+        {}, {'offset': pick(data['offsets'], number)}, None
+    ), data='offsets'),
+    Scenario('titles-filter', 'get', 'title-list', lambda number, data: (
+        {}, {'genre': pick(data['genres'], number), 'ordering': '-rating'},
+        None
+    ), data='genres'),
+    Scenario('titles-top', 'get', 'title-top', lambda number, data: (
+        {}, {'genre': pick(data['genres'], number)}, None
+    ), data='genres'),
+    Scenario('title-detail', 'get', 'title-detail', lambda number, data: (
+        {'pk': pick(data['titles'], number)}, {}, None
+    ), data='titles'),
+    Scenario('reviews-list', 'get', 'reviews-list', lambda number, data: (
+        {'title_id': pick(data['titles'], number)}, {}, None
+    ), data='titles'),
+    Scenario(
+        'reviews-cursor', 'get', 'reviews-list', lambda number, data: (
+            {'title_id': pick(data['titles'], number)},
+            {'pagination': 'cursor'}, None
+        ), data='titles'
+    ),
+    Scenario('comments-list', 'get', 'comments-list', lambda number, data: (
+        dict(zip(('title_id', 'review_id'), pick(data['reviews'], number))),
+        {}, None
+    ), data='reviews'),
+    Scenario('signup', 'post', '/api/v1/auth/signup/', lambda number, data: (
+        {}, {}, {
+            'username': f'signup{data["run"]}{number}me',
+            'email': f'signup{data["run"]}{number}@yamdb.fake',
+        }
+    )),
+    Scenario('token', 'post', '/api/v1/auth/token/', lambda number, data: (
+        {}, {}, {
+            'username': pick(data['users'], number),
+            'confirmation_code': CONFIRMATION_CODE,
+        }
+    ), data='users'),
+)
+
+
+def seed(reviews, batch_size=5000):
+    """Заполняет пустую базу набором данных с `reviews` отзывами.
+
+    Данные создаёт `DataGenerator`, поэтому популярность произведений
+    подчиняется закону Ципфа, как в `generate_data`: в среднем на
+    произведение приходится REVIEWS_PER_TITLE отзывов. Пользователи
+    получают общий код подтверждения для сценария `token`.
+    """
+    titles = max(reviews // REVIEWS_PER_TITLE, 1)
+    DataGenerator(
+        users=max(titles, USERS), titles=titles, reviews=reviews,
+        comments=reviews // COMMENT_EVERY, categories=CATEGORIES,
+        genres=GENRES
+    ).save(batch_size)
+    CustomUser.objects.update(confirmation_code=CONFIRMATION_CODE)
+
+
+@contextmanager
+def temporary_database(no_cache=False):
+    """Подменяет основную базу пустой временной базой SQLite.
+
+    Реплики и фоновая отправка писем отключаются, с `no_cache` — и кэш
+    ответов API.
+    """
+    initial = connections.databases[DEFAULT_DB_ALIAS]
+    if connections[DEFAULT_DB_ALIAS].vendor != 'sqlite':
+        raise CommandError(
+            'Без --url замер выполняется на временной базе SQLite.'
+        )
+    try:
+        with TemporaryDirectory() as tmp_dir, override_settings(
+            DB_REPLICA_ALIASES=[], EMAIL_QUEUE_WORKERS=0,
+            **({'API_CACHE_TIMEOUT': 0} if no_cache else {})
+        ):
+            connections.close_all()
+            del connections[DEFAULT_DB_ALIAS]
+            connections.databases[DEFAULT_DB_ALIAS] = dict(
+                initial, NAME=os.path.join(tmp_dir, 'benchmark.sqlite3')
+            )
+            call_command('migrate', verbosity=0)
+            yield
+    finally:
+        connections.close_all()
+        del connections[DEFAULT_DB_ALIAS]
+        connections.databases[DEFAULT_DB_ALIAS] = initial
+
+
+def get_dataset():
+    """Параметры сценариев из базы: существующие объекты и слаги."""
+    titles = list(Title.objects.order_by('pk').values_list('pk', flat=True))
+    if not titles:
+        return None
+    return {
+        'titles': titles,
+        'offsets': list(range(0, len(titles), 5)),
+        'genres': list(Genre.objects.values_list('slug', flat=True)),
+        'reviews': list(
+            Comment.objects.values_list('review__title_id', 'review_id')
+        ),
+        'users': list(CustomUser.objects.filter(
+            confirmation_code=CONFIRMATION_CODE
+        ).values_list('username', flat=True)),
+        'run': timezone.now().strftime('%H%M%S'),
+        'size': {
+            'titles': len(titles),
+            'reviews': Review.objects.count(),
+            'comments': Comment.objects.count(),
+        },
+    }
+
+
+def get_path(scenario, kwargs):
+    if scenario.route.startswith('/'):
+        return scenario.route
+    return reverse(scenario.route, kwargs=kwargs)
+
+
+def encode_body(body):
+    """Тело запроса: словарь кодируется в JSON, строка передаётся как есть."""
+    return body if isinstance(body, str) else json.dumps(body)
+
+
+def client_sender(client):
+    """Выполняет запрос тестовым клиентом и считает SQL-запросы."""
+    def send(method, path, params, body, headers=None):
+        extra = {
+            f'HTTP_{name.upper().replace("-", "_")}': value
+            for name, value in (headers or {}).items()
+        }
+        with capture_queries() as queries:
+            started = perf_counter()
+            if body is None and method in ('get', 'head'):
+                response = getattr(client, method)(path, params, **extra)
+            else:
+                response = getattr(client, method)(
+                    path, '' if body is None else encode_body(body),
+                    content_type='application/json', **extra
+                )
+            seconds = perf_counter() - started
+        return Result(
+            response.status_code, seconds, len(queries), response.content
+        )
+    return send
+
+
+def http_sender(base_url):
+    """Выполняет запрос к запущенному серверу; SQL-запросы не видны."""
+    def send(method, path, params, body, headers=None):
+        query = f'?{urlencode(params)}' if params else ''
+        request = Request(
+            f'{base_url.rstrip("/")}{path}{query}',
+            data=None if body is None else encode_body(body).encode(),
+            headers={'Content-Type': 'application/json', **(headers or {})},
+            method=method.upper()
+        )
+        started = perf_counter()
+        try:
+            with urlopen(request) as response:
+                content = response.read()
+                status = response.status
+        except HTTPError as error:
+            content = error.read()
+            status = error.code
+        return Result(status, perf_counter() - started, None, content)
+    return send
+
+
+def get_missing_data(scenario, dataset):
+    """Описание данных, которых нет в наборе для сценария, или `None`."""
+    if scenario.data and not dataset[scenario.data]:
+        return DATASET_ITEMS[scenario.data]
+    return None
+
+
+def run_scenario(send, scenario, dataset, requests, warmup=5):
+    """Замер сценария: пропускная способность, перцентили задержки и
+    число SQL-запросов на один запрос.
+    """
+    numbers = count()
+    for number in islice(numbers, warmup):
+        kwargs, params, body = scenario.request(number, dataset)
+        send(scenario.method, get_path(scenario, kwargs), params, body)
+    results = []
+    started = perf_counter()
+    for number in islice(numbers, requests):
+        kwargs, params, body = scenario.request(number, dataset)
+        results.append(
+            send(scenario.method, get_path(scenario, kwargs), params, body)
+        )
+    total = perf_counter() - started
+    return summarize(results, total)
+
+
+def summarize(results, total, errors=None):
+    """Сводка замера; `errors` по умолчанию — число ответов 4xx и 5xx."""
+    if errors is None:
+        errors = sum(result.status >= 400 for result in results)
+    latencies = [result.seconds * 1000 for result in results]
+    if len(latencies) > 1:
+        percentiles = quantiles(latencies, n=100, method='inclusive')
+    else:
+        percentiles = latencies * 99
+    queries = [
+        result.queries for result in results if result.queries is not None
+    ]
+    return {
+        'requests': len(results),
+        'errors': errors,
+        'throughput': round(len(results) / total, 1),
+        'mean_ms': round(mean(latencies), 3),
+        'p50_ms': round(percentiles[49], 3),
+        'p95_ms': round(percentiles[94], 3),
+        'p99_ms': round(percentiles[98], 3),
+        'queries': round(mean(queries), 2) if queries else None,
+    }
+
+
+def get_metadata(mode, dataset):
+    """Условия замера; `dataset` — размер набора данных или нагрузки."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'mode': mode,
+        'database': connections['default'].vendor,
+        'dataset': dataset,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'created': timezone.now().isoformat(),
+    }
+
+
+# Метрики, для которых рост значения означает ухудшение.
+LOWER_IS_BETTER = ('mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'queries')
+
+
+def compare(base, new):
+    """Строки сравнения двух файлов результатов: изменение в процентах."""
+    rows = []
+    for name, metrics in new['results'].items():
+        old = base['results'].get(name)
+        if old is None:
+            continue
+        for metric in ('throughput', *LOWER_IS_BETTER):
+            before, after = old.get(metric), metrics.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before * 100
+            worse = change > 0 if metric in LOWER_IS_BETTER else change < 0
+            rows.append((name, metric, before, after, change, worse))
+    return rows
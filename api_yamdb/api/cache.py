@@ -0,0 +1,145 @@
+from hashlib import md5
+from time import time
+from urllib.parse import urlencode
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from api.metrics import record_cache
+from api.routers import use_primary
+
+VERSION_KEY = 'api:version:{namespace}'
+RESPONSE_KEY = 'api:response:{etag}'
+# Пространство имён, от которого зависят все ответы; его версию меняет
+# `invalidate_all` после массовой загрузки данных.
+GLOBAL_NAMESPACE = 'all'
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def new_version():
+    """Версия с временем создания: по нему видно, давно ли менялись данные."""
+    return f'{time():.3f}-{uuid4().hex}'
+
+
+def changed_recently(versions, seconds):
+    """Менялись ли данные пространств имён за последние `seconds` секунд."""
+    since = time() - seconds
+    return any(
+        float(version.partition('-')[0] or 0) > since
+        for version in versions
+    )
+
+
+def get_versions(namespaces):
+    """Текущие версии пространств имён кэша.
+
+    Если ключ версии вытеснен из кэша, создаётся новая версия, поэтому
+    сохранённые ранее ответы и ETag никогда не совпадут повторно. Версии
+    живут `API_CACHE_TIMEOUT` секунд: с кэшем в памяти процесса запись
+    меняет версию только в обработавшем её воркере, и остальные воркеры
+    перестают отдавать 304 на устаревшие данные не позже, чем через
+    это время.
+    """
+    keys = [
+        VERSION_KEY.format(namespace=namespace)
+        for namespace in (GLOBAL_NAMESPACE, *namespaces)
+    ]
+    versions = get_cache().get_many(keys)
+    missing = {key: new_version() for key in keys if key not in versions}
+    if missing:
+        get_cache().set_many(missing, settings.API_CACHE_TIMEOUT)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def invalidate(*namespaces):
+    """Сбрасывает кэш ответов после фиксации текущей транзакции."""
+    def bump():
+        get_cache().set_many(
+            {
+                VERSION_KEY.format(namespace=namespace): new_version()
+                for namespace in namespaces
+            },
+            settings.API_CACHE_TIMEOUT
+        )
+    transaction.on_commit(bump)
+
+
+def invalidate_all():
+    """Сбрасывает кэш всех ответов после фиксации транзакции."""
+    invalidate(GLOBAL_NAMESPACE)
+
+
+class CachedListMixin:
+    """Условные GET-запросы и кэширование ответов на чтение.
+
+    ETag строится из пути, параметров запроса (включая пагинацию), формата
+    ответа и версий пространств имён, от которых зависят данные. Версии
+    меняют обработчики сигналов из `api.signals`, поэтому проверка ETag
+    не требует ни запросов к базе, ни сериализации. Если `cache_responses`
+    включён, по тому же ключу кэшируется и тело ответа.
+    """
+
+    cache_namespace = None
+    cache_responses = True
+
+    def get_cache_namespaces(self):
+        return (self.cache_namespace,)
+
+    def get_etag(self, request, versions):
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        parts = (
+            request.path,
+            query,
+            request.accepted_renderer.format,
+            *versions
+        )
+        return '"{}"'.format(md5('|'.join(parts).encode()).hexdigest())
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        versions = get_versions(self.get_cache_namespaces())
+        etag = self.get_etag(request, versions)
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag}
+            )
+        key = RESPONSE_KEY.format(etag=etag.strip('"'))
+        data = None
+        if self.cache_responses:
+            data = get_cache().get(key)
+            record_cache('response', data is not None)
+        if data is not None:
+            return Response(data, headers={'ETag': etag})
+        if changed_recently(versions, settings.DB_REPLICA_LAG):
+            # Реплика могла ещё не получить изменения: иначе устаревший
+            # ответ закэшировался бы под новой версией.
+            use_primary()
+        response = handler(request, *args, **kwargs)
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        if self.cache_responses:
+            get_cache().set(key, response.data, settings.API_CACHE_TIMEOUT)
+        response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+
+class CachedResponseMixin(CachedListMixin):
+    """То же, что `CachedListMixin`, для вьюсетов с просмотром объекта."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
@@ -0,0 +1,61 @@
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+
+def check_connections(**kwargs):
+    """Отмечает переиспользуемые соединения для проверки.
+
+    Выполняется в начале запроса для баз с `CONN_HEALTH_CHECKS`. Сама
+    проверка (`SELECT 1` в `is_usable`) откладывается до первого
+    обращения к соединению в запросе (`install_health_checks`), поэтому
+    запросы без обращений к базе, например ответы из кэша, её не ждут.
+    """
+    for conn in connections.all():
+        if (
+            conn.connection is not None
+            and conn.settings_dict.get('CONN_HEALTH_CHECKS')
+        ):
+            conn.health_check_done = False
+
+
+def install_health_checks():
+    """Проверяет отмеченное соединение перед первым использованием,
+    как `CONN_HEALTH_CHECKS` в Django 4.1.
+
+    Разорванное сервером соединение закрывается, и Django сразу открывает
+    новое: без проверки первый запрос после перезапуска базы или разрыва
+    соединения по таймауту завершился бы ошибкой.
+    """
+    ensure_connection = BaseDatabaseWrapper.ensure_connection
+    if getattr(ensure_connection, 'health_check', False):
+        return
+
+    def ensure_checked_connection(self):
+        if self.connection is None:
+            # Открытое в этом запросе соединение проверять не нужно.
+            self.health_check_done = True
+        elif not getattr(self, 'health_check_done', True):
+            self.health_check_done = True
+            if not self.in_atomic_block and not self.is_usable():
+                self.close()
+        ensure_connection(self)
+
+    ensure_checked_connection.health_check = True
+    BaseDatabaseWrapper.ensure_connection = ensure_checked_connection
+
+
+@contextmanager
+def capture_queries():
+    """Список (база, SQL, параметры) запросов ко всем базам внутри блока."""
+    queries = []
+
+    def execute(execute, sql, params, many, context):
+        queries.append((context['connection'].alias, sql, params))
+        return execute(sql, params, many, context)
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(execute))
+        yield queries
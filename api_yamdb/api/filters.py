@@ -1,20 +1,76 @@
 import django_filters
+from rest_framework.filters import OrderingFilter
 
 from reviews.models import Title
 
 
+class CharInFilter(django_filters.BaseInFilter, django_filters.CharFilter):
+    """Список значений через запятую."""
+
+
+def with_genres(slugs):
+    return Title.genre.through.objects.filter(
+        genre__slug__in=slugs
+    ).values('title_id')
+
+
 class TitleFilter(django_filters.FilterSet):
     genre = django_filters.CharFilter(
         field_name='genre__slug',
         lookup_expr='exact',
         label='Жанр'
     )
+    genre__in = CharInFilter(
+        method='filter_any_genre',
+        label='Любой из жанров'
+    )
+    genre__all = CharInFilter(
+        method='filter_all_genres',
+        label='Все жанры'
+    )
     category = django_filters.CharFilter(
         field_name='category__slug',
         lookup_expr='exact',
         label='Категория'
     )
+    year__gte = django_filters.NumberFilter(
+        field_name='year', lookup_expr='gte'
+    )
+    year__lte = django_filters.NumberFilter(
+        field_name='year', lookup_expr='lte'
+    )
+    rating__gte = django_filters.NumberFilter(
+        field_name='rating', lookup_expr='gte'
+    )
+    rating__lte = django_filters.NumberFilter(
+        field_name='rating', lookup_expr='lte'
+    )
 
     class Meta:
         model = Title
         fields = ('name', 'year', 'category', 'genre')
+
+    # Жанры проверяются подзапросами IN по индексу жанра: соединение
+    # с таблицей жанров размножило бы произведения и потребовало DISTINCT.
+    def filter_any_genre(self, queryset, name, value):
+        return queryset.filter(pk__in=with_genres(value))
+
+    def filter_all_genres(self, queryset, name, value):
+        for slug in set(value):
+            queryset = queryset.filter(pk__in=with_genres([slug]))
+        return queryset
+
+
+class StableOrderingFilter(OrderingFilter):
+    """Сортировка с id в конце для устойчивой пагинации.
+
+    id сортируется в том же направлении, что и последнее поле, поэтому
+    запрос проходит составной индекс (поле, id) без дополнительной
+    сортировки.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(super().get_ordering(request, queryset, view) or ())
+        if ordering and ordering[-1].lstrip('-') != 'id':
+            ordering.append('-id' if ordering[-1].startswith('-') else 'id')
+        return ordering
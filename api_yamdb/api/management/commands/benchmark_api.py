@@ -0,0 +1,163 @@
+import json
+import logging
+
+from django.core.management import BaseCommand, CommandError
+from django.test import Client
+
+from api.benchmark import (SCENARIOS, SCALES, client_sender, compare,
+                           get_dataset, get_metadata, get_missing_data,
+                           http_sender, run_scenario, seed,
+                           temporary_database)
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет пропускную способность, задержку (p50/p95/p99) и число '
+        'SQL-запросов основных адресов API на наборе данных заданного '
+        'масштаба и сохраняет результаты в JSON для сравнения коммитов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            choices=SCALES,
+            default='1k',
+            help='Масштаб набора данных (число отзывов).'
+        )
+        parser.add_argument(
+            '--reviews',
+            type=int,
+            help='Число отзывов вместо стандартного масштаба.'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Количество запросов в каждом сценарии.'
+        )
+        parser.add_argument(
+            '--scenario',
+            choices=[scenario.name for scenario in SCENARIOS],
+            nargs='+',
+            help='Выполнить только указанные сценарии.'
+        )
+        parser.add_argument(
+            '--url',
+            help=(
+                'Адрес запущенного сервера, например http://127.0.0.1:8000. '
+                'Сервер должен работать с той же базой, что и команда.'
+            )
+        )
+        parser.add_argument(
+            '--seed',
+            action='store_true',
+            help=(
+                'Заполнить настроенную базу набором данных для замеров '
+                'через --url и завершить работу.'
+            )
+        )
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='Не кэшировать ответы API (только без --url).'
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл для результатов в формате JSON.'
+        )
+        parser.add_argument(
+            '--compare',
+            nargs=2,
+            metavar=('BASE', 'NEW'),
+            help='Сравнить два файла результатов и завершить работу.'
+        )
+
+    def handle(self, *args, **options):
+        if options['compare']:
+            return self.compare(*options['compare'])
+        reviews = options['reviews'] or SCALES[options['scale']]
+        if options['seed']:
+            if get_dataset() is not None:
+                raise CommandError('База уже содержит произведения.')
+            seed(reviews)
+            self.stdout.write(self.style.SUCCESS(
+                f'Набор данных создан: {get_dataset()["size"]}'
+            ))
+            return
+        scenarios = [
+            scenario for scenario in SCENARIOS
+            if not options['scenario'] or scenario.name in options['scenario']
+        ]
+        # Ответы 4xx не должны засорять вывод замеров.
+        logger = logging.getLogger('django.request')
+        level = logger.level
+        logger.setLevel(logging.ERROR)
+        try:
+            if options['url']:
+                report = self.run_live(options['url'], scenarios, options)
+            else:
+                report = self.run_in_process(reviews, scenarios, options)
+        finally:
+            logger.setLevel(level)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+
+    def run_live(self, url, scenarios, options):
+        dataset = get_dataset()
+        if dataset is None:
+            raise CommandError(
+                'База пуста: заполните её командой benchmark_api --seed.'
+            )
+        return self.run(http_sender(url), scenarios, dataset, 'http', options)
+
+    def run_in_process(self, reviews, scenarios, options):
+        """Замер на временной базе SQLite с настройками проекта."""
+        with temporary_database(options['no_cache']):
+            seed(reviews)
+            return self.run(
+                client_sender(Client()), scenarios, get_dataset(),
+                'client', options
+            )
+
+    def run(self, send, scenarios, dataset, mode, options):
+        report = {'meta': get_metadata(mode, dataset['size']), 'results': {}}
+        self.stdout.write(
+            f'Набор данных: {dataset["size"]}, режим: {mode}'
+        )
+        for scenario in scenarios:
+            missing = get_missing_data(scenario, dataset)
+            if missing:
+                self.stdout.write(self.style.WARNING(
+                    f'{scenario.name:15} пропущен: в базе нет {missing}'
+                ))
+                continue
+            result = run_scenario(
+                send, scenario, dataset, options['requests']
+            )
+            report['results'][scenario.name] = result
+            queries = result['queries']
+            self.stdout.write(
+                f'{scenario.name:15} {result["throughput"]:8.1f} з/с  '
+                f'p50 {result["p50_ms"]:7.2f} мс  '
+                f'p95 {result["p95_ms"]:7.2f} мс  '
+                f'p99 {result["p99_ms"]:7.2f} мс  '
+                f'SQL {"-" if queries is None else queries}  '
+                f'ошибок {result["errors"]}'
+            )
+        return report
+
+    def compare(self, base_path, new_path):
+        with open(base_path, encoding='utf-8') as file:
+            base = json.load(file)
+        with open(new_path, encoding='utf-8') as file:
+            new = json.load(file)
+        for name, metric, before, after, change, worse in compare(base, new):
+            line = (
+                f'{name:15} {metric:10} {before:10} -> {after:10} '
+                f'({change:+.1f}%)'
+            )
+            style = self.style.ERROR if worse and abs(change) >= 10 else (
+                self.style.SUCCESS if abs(change) >= 10 else str
+            )
+            self.stdout.write(style(line))
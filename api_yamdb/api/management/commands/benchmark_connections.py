@@ -0,0 +1,92 @@
+import logging
+from time import perf_counter
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время обработки запроса при разных CONN_MAX_AGE: '
+        'с новым соединением на каждый запрос и с переиспользованием.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default='/api/v1/titles/1/reviews/',
+            help='Адрес, к которому выполняются GET-запросы.'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Количество запросов для каждого значения CONN_MAX_AGE.'
+        )
+        parser.add_argument(
+            '--max-age',
+            type=int,
+            nargs='+',
+            default=[0, 60],
+            help='Сравниваемые значения CONN_MAX_AGE.'
+        )
+
+    def run_requests(self, path, count):
+        """Выполняет запросы через WSGI-обработчик, как при работе сервера.
+
+        В отличие от тестового клиента, обработчик закрывает устаревшие
+        соединения по сигналам начала и окончания запроса.
+        """
+        handler = WSGIHandler()
+        factory = RequestFactory()
+        opened = []
+
+        def count_connection(sender, connection, **kwargs):
+            opened.append(connection.alias)
+
+        # Ответы 404 не должны засорять вывод замеров.
+        logger = logging.getLogger('django.request')
+        level = logger.level
+        logger.setLevel(logging.ERROR)
+        connection_created.connect(count_connection)
+        try:
+            started = perf_counter()
+            for _ in range(count):
+                response = handler(
+                    factory.get(path).environ, lambda *args: None
+                )
+                b''.join(response)
+                response.close()
+            seconds = perf_counter() - started
+        finally:
+            connection_created.disconnect(count_connection)
+            logger.setLevel(level)
+        return len(opened), seconds
+
+    def handle(self, *args, **options):
+        connection = connections[DEFAULT_DB_ALIAS]
+        initial_max_age = connection.settings_dict['CONN_MAX_AGE']
+        count = options['requests']
+        results = []
+        try:
+            for max_age in options['max_age']:
+                connection.close()
+                connection.settings_dict['CONN_MAX_AGE'] = max_age
+                opened, seconds = self.run_requests(options['path'], count)
+                results.append(seconds)
+                self.stdout.write(
+                    f'CONN_MAX_AGE={max_age}: {count} запросов, '
+                    f'{opened} соединений, '
+                    f'{seconds / count * 1000:.3f} мс/запрос'
+                )
+        finally:
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = initial_max_age
+        if len(results) > 1:
+            overhead = (results[0] - min(results)) / count * 1000
+            self.stdout.write(self.style.SUCCESS(
+                f'Накладные расходы на соединение: {overhead:.3f} мс/запрос'
+            ))
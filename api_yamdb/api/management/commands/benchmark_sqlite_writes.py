@@ -0,0 +1,142 @@
+import logging
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import BaseCommand, CommandError, call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import RequestFactory
+
+from api.authentication import issue_access_token
+from reviews.models import Category, Title
+from users.models import CustomUser
+
+# Стандартный SQLite из Django и профиль из настроек проекта.
+PROFILES = {
+    'default': {'ENGINE': 'django.db.backends.sqlite3', 'OPTIONS': {}},
+    'tuned': {
+        'ENGINE': settings.SQLITE_ENGINE,
+        'OPTIONS': settings.SQLITE_OPTIONS,
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность параллельной записи отзывов '
+        'в стандартный SQLite и в настроенный профиль (WAL, IMMEDIATE).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=8,
+            help='Число потоков, одновременно отправляющих отзывы.'
+        )
+        parser.add_argument(
+            '--reviews',
+            type=int,
+            default=25,
+            help='Количество отзывов от каждого потока.'
+        )
+        parser.add_argument(
+            '--profile',
+            choices=PROFILES,
+            nargs='+',
+            default=list(PROFILES),
+            help='Сравниваемые профили.'
+        )
+
+    def seed(self, threads, reviews):
+        """Пользователь на каждый поток и произведение на каждый отзыв."""
+        category = Category.objects.create(name='Замер', slug='benchmark')
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {idx}', year=2000, category=category)
+            for idx in range(reviews)
+        )
+        users = CustomUser.objects.bulk_create(
+            CustomUser(
+                username=f'bench{idx}', email=f'bench{idx}@yamdb.fake'
+            )
+            for idx in range(threads)
+        )
+        title_ids = list(Title.objects.values_list('pk', flat=True))
+        return [
+            str(issue_access_token(user))
+            for user in CustomUser.objects.filter(
+                username__in=[user.username for user in users]
+            )
+        ], title_ids
+
+    def post_reviews(self, token, title_ids):
+        handler = WSGIHandler()
+        factory = RequestFactory()
+        statuses = Counter()
+        try:
+            for title_id in title_ids:
+                request = factory.post(
+                    f'/api/v1/titles/{title_id}/reviews/',
+                    data={'text': 'Отзыв', 'score': 7},
+                    content_type='application/json',
+                    HTTP_AUTHORIZATION=f'Bearer {token}'
+                )
+                response = handler(request.environ, lambda *args: None)
+                b''.join(response)
+                response.close()
+                statuses[response.status_code] += 1
+        finally:
+            connections.close_all()
+        return statuses
+
+    def run_profile(self, database, threads, reviews):
+        del connections[DEFAULT_DB_ALIAS]
+        connections.databases[DEFAULT_DB_ALIAS] = database
+        call_command('migrate', verbosity=0)
+        tokens, title_ids = self.seed(threads, reviews)
+        connections.close_all()
+        statuses = Counter()
+        started = perf_counter()
+        with ThreadPoolExecutor(threads) as executor:
+            for result in executor.map(
+                self.post_reviews, tokens, [title_ids] * threads
+            ):
+                statuses.update(result)
+        return statuses, perf_counter() - started
+
+    def handle(self, *args, **options):
+        if connections[DEFAULT_DB_ALIAS].vendor != 'sqlite':
+            raise CommandError('Замер выполняется только для SQLite.')
+        initial = connections.databases[DEFAULT_DB_ALIAS]
+        threads, reviews = options['threads'], options['reviews']
+        # Ошибки блокировки базы ожидаемы и не должны засорять вывод.
+        logger = logging.getLogger('django.request')
+        level = logger.level
+        logger.setLevel(logging.CRITICAL)
+        try:
+            with TemporaryDirectory() as tmp_dir:
+                for name in options['profile']:
+                    database = dict(
+                        initial,
+                        NAME=os.path.join(tmp_dir, f'{name}.sqlite3'),
+                        **PROFILES[name]
+                    )
+                    statuses, seconds = self.run_profile(
+                        database, threads, reviews
+                    )
+                    created = statuses.pop(201, 0)
+                    errors = sum(statuses.values())
+                    self.stdout.write(
+                        f'{name}: {threads} потоков, {created} отзывов '
+                        f'за {seconds:.2f} с ({created / seconds:.0f} '
+                        f'записей/с), ошибок: {errors}'
+                    )
+        finally:
+            logger.setLevel(level)
+            connections.close_all()
+            del connections[DEFAULT_DB_ALIAS]
+            connections.databases[DEFAULT_DB_ALIAS] = initial
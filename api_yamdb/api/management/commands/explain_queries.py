@@ -0,0 +1,130 @@
+import re
+from urllib.parse import quote
+from uuid import uuid4
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+
+from api.db import capture_queries
+from reviews.models import Comment, Genre, get_decade
+
+# Адреса проверяемых запросов к API. Полный просмотр разрешён только для
+# таблиц из второго элемента: списки без фильтров читают таблицу подряд
+# до LIMIT, а COUNT(*) без условий иначе выполнить нельзя.
+ENDPOINTS = (
+    ('/api/v1/categories/', {'reviews_category'}),
+    ('/api/v1/genres/', {'reviews_genre'}),
+    ('/api/v1/titles/', {'reviews_title'}),
+    ('/api/v1/titles/?year={year}', set()),
+    ('/api/v1/titles/?category={category}', set()),
+    ('/api/v1/titles/?genre={genre}', set()),
+    ('/api/v1/titles/?name={name}', set()),
+    ('/api/v1/titles/?genre__all={genre}', set()),
+    ('/api/v1/titles/?genre__in={genre}', set()),
+    ('/api/v1/titles/?year__gte={year}&year__lte={year}', set()),
+    ('/api/v1/titles/?ordering=-rating', {'reviews_title'}),
+    ('/api/v1/titles/?ordering=-reviews_count', {'reviews_title'}),
+    ('/api/v1/titles/?ordering=name', {'reviews_title'}),
+    ('/api/v1/titles/top/', set()),
+    ('/api/v1/titles/top/?genre={genre}', set()),
+    ('/api/v1/titles/top/?category={category}&decade={decade}', set()),
+    ('/api/v1/titles/{title_id}/', set()),
+    ('/api/v1/titles/{title_id}/reviews/', set()),
+    ('/api/v1/titles/{title_id}/reviews/?pagination=cursor', set()),
+    ('/api/v1/titles/{title_id}/reviews/{review_id}/', set()),
+    ('/api/v1/titles/{title_id}/reviews/{review_id}/comments/', set()),
+    (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        '?pagination=cursor',
+        set()
+    ),
+)
+# Строки плана с полным просмотром таблицы в SQLite и PostgreSQL.
+FULL_SCAN = re.compile(
+    r'^\s*(?:SCAN|->\s*Seq Scan on|Seq Scan on) (?:TABLE )?"?(\w+)"?'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет GET-запросы к API, получает план каждого SQL-запроса '
+        '(EXPLAIN QUERY PLAN) и сообщает о полных просмотрах таблиц.'
+    )
+
+    def get_params(self):
+        """Значения для адресов из первого комментария в базе."""
+        comment = Comment.objects.select_related(
+            'review__title__category'
+        ).order_by('id').first()
+        genre = Genre.objects.filter(title__isnull=False).first()
+        if comment is None or genre is None:
+            raise CommandError(
+                'Для проверки нужен хотя бы один комментарий и жанр '
+                'произведения: загрузите данные командой import_csv.'
+            )
+        title = comment.review.title
+        return {
+            'year': title.year,
+            'decade': get_decade(title.year),
+            'category': title.category.slug,
+            'genre': genre.slug,
+            'name': quote(title.name),
+            'title_id': title.pk,
+            'review_id': comment.review_id,
+        }
+
+    def capture(self, path):
+        """SQL-запросы, выполненные при обработке запроса к `path`."""
+        # Уникальный параметр исключает ответ из кэша.
+        separator = '&' if '?' in path else '?'
+        with capture_queries() as queries:
+            response = Client().get(
+                f'{path}{separator}explain={uuid4().hex}'
+            )
+        if response.status_code != 200:
+            raise CommandError(f'{path}: ответ {response.status_code}')
+        return [
+            query for query in queries
+            if query[1].lstrip().upper().startswith('SELECT')
+        ]
+
+    def explain(self, alias, sql, params):
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'{connection.ops.explain_query_prefix()} {sql}', params
+            )
+            return [str(row[-1]) for row in cursor.fetchall()]
+
+    def handle(self, *args, **options):
+        params = self.get_params()
+        problems = 0
+        for path, allowed in ENDPOINTS:
+            path = path.format(**params)
+            plan, scans = [], []
+            for alias, sql, query_params in self.capture(path):
+                tables = set(connections[alias].introspection.table_names())
+                for line in self.explain(alias, sql, query_params):
+                    plan.append(f'    {line.strip()}')
+                    match = FULL_SCAN.match(line)
+                    if (
+                        match and match.group(1) in tables
+                        and match.group(1) not in allowed
+                    ):
+                        scans.append(f'    {line.strip()}\n      {sql}')
+            if scans:
+                problems += 1
+                self.stdout.write(
+                    self.style.ERROR(f'{path}: полный просмотр')
+                )
+                self.stdout.write('\n'.join(scans))
+            elif options['verbosity'] > 0:
+                self.stdout.write(f'{path}: OK')
+            if options['verbosity'] > 1:
+                self.stdout.write('\n'.join(plan))
+        if problems:
+            raise CommandError(
+                f'Запросов с полным просмотром таблиц: {problems}'
+            )
+        self.stdout.write(self.style.SUCCESS('Полных просмотров нет'))
@@ -0,0 +1,186 @@
+import json
+import logging
+import os
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.test import Client
+
+from api.benchmark import (client_sender, get_metadata, http_sender,
+                           temporary_database)
+from api.replay import (create_collection_users, load_access_log,
+                        load_collection, prime, replay)
+
+COLLECTION = os.path.join(
+    os.path.dirname(settings.BASE_DIR), 'postman_collection',
+    'Ymdb-collection.postman_collection.json'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Воспроизводит запросы Postman-коллекции или журнала доступа в '
+        'несколько потоков с заданной частотой и сообщает задержку '
+        '(p50/p95/p99) и долю ошибок для каждого запроса.'
+    )
+
+    def add_arguments(self, parser):
+        source = parser.add_mutually_exclusive_group()
+        source.add_argument(
+            '--collection',
+            default=COLLECTION,
+            help='Postman-коллекция (формат 2.1).'
+        )
+        source.add_argument(
+            '--access-log',
+            help=(
+                'Журнал доступа (runserver, nginx, gunicorn): '
+                'воспроизводятся GET- и HEAD-запросы.'
+            )
+        )
+        parser.add_argument(
+            '--url',
+            help=(
+                'Адрес запущенного сервера. Коллекция создаёт объекты в '
+                'его базе, как запуск в Postman после set_up_data.sh; '
+                'сервер должен работать с той же базой, что и команда.'
+            )
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Число одновременных клиентов.'
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            help='Не больше N запросов в секунду на всех клиентов.'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=10,
+            help='Сколько раз повторить набор запросов.'
+        )
+        parser.add_argument(
+            '--methods',
+            default='GET,HEAD',
+            help=(
+                'Методы запросов коллекции, входящих в нагрузку; '
+                'остальные выполняются один раз при подготовке.'
+            )
+        )
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='Не кэшировать ответы API (только без --url).'
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл для результатов в формате JSON.'
+        )
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['iterations'] < 1:
+            raise CommandError(
+                'Число клиентов и повторений должно быть положительным.'
+            )
+        # Ответы 4xx ожидаемы и не должны засорять вывод.
+        logger = logging.getLogger('django.request')
+        level = logger.level
+        logger.setLevel(logging.CRITICAL)
+        try:
+            if options['access_log']:
+                report = self.replay_log(options)
+            elif options['url']:
+                report = self.replay_collection(
+                    lambda: http_sender(options['url']), 'http', options
+                )
+            else:
+                with temporary_database(options['no_cache']):
+                    create_collection_users()
+                    report = self.replay_collection(
+                        lambda: client_sender(Client()), 'client', options
+                    )
+        finally:
+            logger.setLevel(level)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+
+    def replay_log(self, options):
+        """Журнал только читает данные, поэтому без --url запросы
+        выполняются на настроенной базе.
+        """
+        steps, skipped, denied = load_access_log(options['access_log'])
+        if not steps:
+            raise CommandError('В журнале нет GET- и HEAD-запросов.')
+        self.stdout.write(
+            f'Запросов из журнала: {len(steps)}, пропущено строк: {skipped}, '
+            f'с отказом в доступе (401/403): {denied}'
+        )
+        self.stdout.write(
+            'Запросы повторяются без учётных данных и If-None-Match: '
+            'вместо 304 ожидается 200, ответы 401/403 считаются отказами, '
+            'а не ошибками.'
+        )
+        if options['url']:
+            return self.run(
+                lambda: http_sender(options['url']), steps, 'http', options
+            )
+        return self.run(
+            lambda: client_sender(Client()), steps, 'client', options
+        )
+
+    def replay_collection(self, make_sender, mode, options):
+        steps, variables, extractors = load_collection(
+            options['collection']
+        )
+        methods = {
+            method.strip().upper()
+            for method in options['methods'].split(',')
+        }
+        resolved, failures = prime(
+            make_sender(), steps, variables, extractors
+        )
+        self.stdout.write(
+            f'Подготовка: {len(resolved)} запросов коллекции, '
+            f'с неожиданным статусом: {failures}'
+        )
+        workload = [step for step in resolved if step.method in methods]
+        if not workload:
+            raise CommandError('В коллекции нет запросов с этими методами.')
+        return self.run(make_sender, workload, mode, options)
+
+    def run(self, make_sender, steps, mode, options):
+        workload = steps * options['iterations']
+        results = replay(
+            make_sender, workload, options['concurrency'], options['rate']
+        )
+        report = {
+            'meta': dict(
+                get_metadata(mode, {'requests': len(workload)}),
+                concurrency=options['concurrency'], rate=options['rate']
+            ),
+            'results': results,
+        }
+        width = max(map(len, results))
+        for name, result in sorted(results.items()):
+            line = (
+                f'{name:{width}} {result["requests"]:6} запр.  '
+                f'p50 {result["p50_ms"]:7.2f} мс  '
+                f'p95 {result["p95_ms"]:7.2f} мс  '
+                f'p99 {result["p99_ms"]:7.2f} мс  '
+                f'ошибок {result["error_rate"]:.1%}'
+            )
+            self.stdout.write(
+                self.style.ERROR(line) if result['errors'] else line
+            )
+        total = results['all']
+        self.stdout.write(self.style.SUCCESS(
+            f'Всего {total["requests"]} запросов, '
+            f'{total["throughput"]:.1f} з/с, ошибок {total["errors"]}, '
+            f'отказов в доступе {total["denied"]}'
+        ))
+        return report
@@ -0,0 +1,325 @@
+"""Метрики API в текстовом формате Prometheus.
+
+Счётчики и гистограммы хранятся в памяти процесса (`registry`) и
+обновляются под одной блокировкой без обращений к диску. Если задан
+`METRICS_DIR`, фоновый поток каждого процесса раз в
+`METRICS_FLUSH_INTERVAL` секунд и при завершении сохраняет значения
+процесса в файл этого каталога, а эндпоинт
+складывает файлы всех процессов — так метрики нескольких воркеров
+gunicorn видны с любого из них. Каталог нужно очищать при перезапуске
+сервера: файлы завершившихся воркеров продолжают учитываться.
+"""
+import atexit
+import json
+import logging
+import os
+import tempfile
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from hmac import compare_digest
+from threading import Lock, Thread
+from time import perf_counter, sleep
+from uuid import uuid4
+
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, HttpResponse
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1, 2.5, 5, 10
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+# Имя, тип, описание, метки и границы корзин гистограмм.
+METRICS = {
+    'yamdb_http_requests_total': (
+        'counter', 'HTTP requests.', ('route', 'method', 'status'), None
+    ),
+    'yamdb_http_request_duration_seconds': (
+        'histogram', 'HTTP request latency.', ('route', 'method'),
+        LATENCY_BUCKETS
+    ),
+    'yamdb_db_queries_per_request': (
+        'histogram', 'SQL queries per HTTP request.', ('route', 'method'),
+        QUERY_BUCKETS
+    ),
+    'yamdb_db_query_duration_seconds_total': (
+        'counter', 'Time spent in SQL queries.', ('route', 'method'), None
+    ),
+    'yamdb_cache_requests_total': (
+        'counter', 'Cache lookups by result (hit or miss).',
+        ('cache', 'result'), None
+    ),
+}
+# Маршрут запросов, не найденных в URLconf: путь в метке сделал бы число
+# рядов неограниченным.
+UNMATCHED = 'unmatched'
+
+logger = logging.getLogger(__name__)
+
+
+class Registry:
+    """Значения метрик одного процесса.
+
+    Счётчик — число, гистограмма — список `[корзины..., сумма, число]`
+    с некумулятивными корзинами; ключ — (имя метрики, значения меток).
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.flush_lock = Lock()
+        self.values = {}
+        self.pid = None
+        self.flusher_pid = None
+
+    @property
+    def name(self):
+        """Имя файла процесса. Меняется после fork (gunicorn --preload),
+        чтобы воркеры не перезаписывали файлы друг друга.
+        """
+        with self.lock:
+            if self.pid != os.getpid():
+                self.pid = os.getpid()
+                self._name = f'{self.pid}-{uuid4().hex}.json'
+            return self._name
+
+    def increment(self, name, labels, amount=1):
+        key = (name, labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][3]
+        key = (name, labels)
+        with self.lock:
+            histogram = self.values.get(key)
+            if histogram is None:
+                histogram = self.values[key] = [0] * (len(buckets) + 3)
+            histogram[bisect_left(buckets, value)] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def reset(self):
+        with self.lock:
+            self.values.clear()
+
+    def snapshot(self):
+        with self.lock:
+            return [
+                [name, list(labels), value[:] if isinstance(value, list)
+                 else value]
+                for (name, labels), value in self.values.items()
+            ]
+
+    def flush(self, directory):
+        """Атомарно записывает значения процесса в `directory`.
+
+        Запись идёт через уникальный временный файл, поэтому файл процесса
+        всегда содержит целый снимок; одновременные вызовы выполняются
+        по очереди.
+        """
+        with self.flush_lock:
+            os.makedirs(directory, exist_ok=True)
+            descriptor, temporary = tempfile.mkstemp(
+                suffix='.tmp', dir=directory
+            )
+            try:
+                with open(descriptor, 'w', encoding='utf-8') as file:
+                    json.dump(self.snapshot(), file)
+                os.replace(temporary, os.path.join(directory, self.name))
+            except BaseException:
+                os.unlink(temporary)
+                raise
+
+    def start_flusher(self):
+        """Запускает фоновый поток записи в `METRICS_DIR`.
+
+        Потоки не переживают fork, поэтому поток запускается в каждом
+        процессе при первом учтённом запросе.
+        """
+        if self.flusher_pid == os.getpid():
+            return
+        with self.flush_lock:
+            if self.flusher_pid == os.getpid():
+                return
+            self.flusher_pid = os.getpid()
+            Thread(
+                target=self.run, name='metrics-flusher', daemon=True
+            ).start()
+
+    def run(self):
+        while True:
+            if settings.METRICS_DIR:
+                try:
+                    self.flush(settings.METRICS_DIR)
+                except Exception:
+                    logger.exception('Ошибка при сохранении метрик')
+            sleep(settings.METRICS_FLUSH_INTERVAL)
+
+    def collect(self):
+        """Значения всех процессов из `METRICS_DIR` вместе с текущими."""
+        snapshots = [self.snapshot()]
+        if settings.METRICS_DIR and os.path.isdir(settings.METRICS_DIR):
+            for name in os.listdir(settings.METRICS_DIR):
+                if not name.endswith('.json') or name == self.name:
+                    continue
+                path = os.path.join(settings.METRICS_DIR, name)
+                try:
+                    with open(path, encoding='utf-8') as file:
+                        snapshots.append(json.load(file))
+                except (OSError, ValueError):
+                    # Файл удалили между listdir и open.
+                    continue
+        return merge(snapshots)
+
+
+def merge(snapshots):
+    values = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot:
+            if name not in METRICS:
+                continue
+            key = (name, tuple(labels))
+            if isinstance(value, list):
+                total = values.setdefault(key, [0] * len(value))
+                for index, item in enumerate(value):
+                    total[index] += item
+            else:
+                values[key] = values.get(key, 0) + value
+    return values
+
+
+registry = Registry()
+
+
+def flush_on_exit():
+    if settings.METRICS and settings.METRICS_DIR:
+        try:
+            registry.flush(settings.METRICS_DIR)
+        except Exception:
+            logger.exception('Ошибка при сохранении метрик')
+
+
+atexit.register(flush_on_exit)
+
+
+def record_cache(cache, hit):
+    """Учитывает обращение к кэшу `cache` для доли попаданий."""
+    registry.increment(
+        'yamdb_cache_requests_total', (cache, 'hit' if hit else 'miss')
+    )
+
+
+def get_route(request):
+    """Имя маршрута (`title-list`, `reviews-detail`) или шаблон пути
+    для маршрутов без имени.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNMATCHED
+    return match.url_name or match.route
+
+
+def record_request(request, response, seconds, queries, query_seconds):
+    labels = (get_route(request), request.method)
+    registry.increment(
+        'yamdb_http_requests_total', labels + (str(response.status_code),)
+    )
+    registry.observe('yamdb_http_request_duration_seconds', labels, seconds)
+    registry.observe('yamdb_db_queries_per_request', labels, queries)
+    registry.increment(
+        'yamdb_db_query_duration_seconds_total', labels, query_seconds
+    )
+    if settings.METRICS_DIR:
+        registry.start_flusher()
+
+
+@contextmanager
+def count_queries(stats):
+    """Считает в `stats` ([число, секунды]) SQL-запросы ко всем базам."""
+    def execute(execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            stats[0] += 1
+            stats[1] += perf_counter() - started
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(execute))
+        yield
+
+
+def escape(value):
+    return (
+        str(value).replace('\\', r'\\').replace('"', r'\"')
+        .replace('\n', r'\n')
+    )
+
+
+def format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{%s}' % ','.join(
+        f'{name}="{escape(value)}"' for name, value in pairs
+    )
+
+
+def format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_metrics(values):
+    """Текстовый формат Prometheus (version 0.0.4)."""
+    series = defaultdict(list)
+    for (name, labels), value in sorted(values.items()):
+        series[name].append((labels, value))
+    lines = []
+    for name, (kind, description, label_names, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in series[name]:
+            if kind == 'counter':
+                lines.append(
+                    f'{name}{format_labels(label_names, labels)} '
+                    f'{format_number(value)}'
+                )
+                continue
+            cumulative = 0
+            for bound, count in zip((*buckets, '+Inf'), value):
+                cumulative += count
+                lines.append(
+                    f'{name}_bucket'
+                    f'{format_labels(label_names, labels, [("le", bound)])} '
+                    f'{cumulative}'
+                )
+            lines.append(
+                f'{name}_sum{format_labels(label_names, labels)} '
+                f'{format_number(value[-2])}'
+            )
+            lines.append(
+                f'{name}_count{format_labels(label_names, labels)} '
+                f'{value[-1]}'
+            )
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """Эндпоинт для сборщика метрик.
+
+    Доступен только при `METRICS`; если задан `METRICS_TOKEN`, запрос
+    должен передать его в заголовке `Authorization: Bearer <токен>`.
+    """
+    if not settings.METRICS:
+        raise Http404
+    if settings.METRICS_TOKEN and not compare_digest(
+        request.META.get('HTTP_AUTHORIZATION', ''),
+        f'Bearer {settings.METRICS_TOKEN}'
+    ):
+        return HttpResponse(status=401, content_type=CONTENT_TYPE)
+    return HttpResponse(
+        render_metrics(registry.collect()), content_type=CONTENT_TYPE
+    )
@@ -0,0 +1,120 @@
+from hashlib import md5
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from api import metrics, profiling
+from api.cache import get_cache
+from api.routers import choose_replica, read_replica
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_KEY = 'api:replica:pin:{client}'
+
+
+def get_pin_key(request):
+    """Ключ закрепления клиента за основной базой.
+
+    Клиент определяется по заголовку авторизации: запись в API доступна
+    только с токеном, поэтому анонимным клиентам закрепление не нужно.
+    """
+    authorization = request.META.get('HTTP_AUTHORIZATION')
+    if not authorization:
+        return None
+    return PIN_KEY.format(client=md5(authorization.encode()).hexdigest())
+
+
+class ReplicaMiddleware:
+    """Отправляет безопасные запросы к каталогу и отзывам в реплику.
+
+    После запроса на запись клиент `DB_REPLICA_LAG` секунд читает из
+    основной базы и видит свои изменения, даже если реплика отстаёт.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def use_replica(self, request, pin_key):
+        return (
+            request.method in SAFE_METHODS
+            and request.path.startswith(settings.DB_REPLICA_PATHS)
+            and not (pin_key and get_cache().get(pin_key))
+        )
+
+    def __call__(self, request):
+        if not settings.DB_REPLICA_ALIASES:
+            return self.get_response(request)
+        pin_key = get_pin_key(request)
+        replica = None
+        if self.use_replica(request, pin_key):
+            replica = choose_replica()
+        token = read_replica.set(replica)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_replica.reset(token)
+        if request.method not in SAFE_METHODS and pin_key:
+            get_cache().set(pin_key, True, settings.DB_REPLICA_LAG)
+        return response
+
+
+class ServerTimingMiddleware:
+    """Заголовок Server-Timing с длительностью фаз запроса.
+
+    Включается настройкой `SERVER_TIMING`; выключенный middleware не
+    загружается. Запрос администратора с `?profile=1` дополнительно
+    сохраняет дамп cProfile: профилирование начинается после
+    аутентификации (`api.profiling.profiled`).
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING:
+            raise MiddlewareNotUsed
+        profiling.install()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = profiling.Timings()
+        token = profiling.current.set(timings)
+        started = perf_counter()
+        try:
+            with profiling.measure_queries(timings):
+                response = self.get_response(request)
+        finally:
+            if timings.profile is not None:
+                timings.profile.disable()
+            profiling.current.reset(token)
+        total = perf_counter() - started
+        profile = timings.profile
+        if profile is not None:
+            profile = profiling.save_profile(profile, request)
+        response['Server-Timing'] = timings.get_header(total, profile)
+        return response
+
+
+class MetricsMiddleware:
+    """Число, задержка и SQL-запросы HTTP-запросов для `api.metrics`.
+
+    Включается настройкой `METRICS`; выключенный middleware не
+    загружается.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # [число SQL-запросов, время в них]
+        queries = [0, 0.0]
+        started = perf_counter()
+        with metrics.count_queries(queries):
+            response = self.get_response(request)
+        try:
+            metrics.record_request(
+                request, response, perf_counter() - started, *queries
+            )
+        except Exception:
+            # Ошибка учёта не должна менять ответ.
+            metrics.logger.exception('Ошибка при учёте метрик запроса')
+        return response
@@ -1,8 +1,5 @@
-from django.shortcuts import get_object_or_404
 from rest_framework import permissions
 
-from users.models import CustomUser
-
 
 class OwnerOrAdmins(permissions.BasePermission):
 
@@ -24,11 +21,9 @@ class OwnerOrAdmins(permissions.BasePermission):
 class AdminRole(permissions.BasePermission):
 
     def has_permission(self, request, view):
-        cur_user = get_object_or_404(
-            CustomUser,
-            username=request.user.username)
         return (
-            cur_user.is_admin
+            request.user.is_authenticated
+            and request.user.is_admin
         )
 
 
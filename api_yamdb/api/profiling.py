@@ -0,0 +1,168 @@
+"""Разбивка времени запроса на фазы для заголовка Server-Timing.
+
+Фазы измеряются обёртками методов DRF (`install`), которые ставятся
+только при включённом `SERVER_TIMING`; без текущего замера обёртка сразу
+вызывает исходный метод. Время фазы исключает вложенные фазы: запросы к
+базе во время сериализации учитываются в `db`, а не в `serialize`, а
+`queryset` — построение SQL, чтение строк и создание объектов моделей.
+"""
+import os
+import random
+import re
+from cProfile import Profile
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.db.models.query import QuerySet
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework.serializers import ListSerializer, Serializer
+from rest_framework.views import APIView
+
+# Фазы в порядке вывода и их описания: значения заголовков передаются в
+# latin-1, поэтому описания на английском.
+PHASES = {
+    'auth': 'Authentication',
+    'permissions': 'Permission checks',
+    'queryset': 'Queryset evaluation',
+    'db': 'SQL queries',
+    'serialize': 'Serialization',
+    'render': 'Rendering',
+}
+PROFILE_PARAM = 'profile'
+current = ContextVar('server_timing', default=None)
+
+
+class Timings:
+    """Исключительное время фаз одного запроса."""
+
+    def __init__(self):
+        self.phases = defaultdict(float)
+        self.counts = Counter()
+        self.stack = []
+        self.profile = None
+
+    @contextmanager
+    def measure(self, name):
+        # [время вложенных фаз] для вычитания из времени этой фазы.
+        frame = [0.0]
+        self.stack.append(frame)
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - started
+            self.stack.pop()
+            self.phases[name] += elapsed - frame[0]
+            self.counts[name] += 1
+            if self.stack:
+                self.stack[-1][0] += elapsed
+
+    def get_header(self, total, profile=None):
+        metrics = []
+        for name, description in PHASES.items():
+            if name in self.phases:
+                if name == 'db':
+                    description = f'{description}: {self.counts[name]}'
+                metrics.append(
+                    f'{name};dur={self.phases[name] * 1000:.3f};'
+                    f'desc="{description}"'
+                )
+        metrics.append(f'total;dur={total * 1000:.3f}')
+        if profile:
+            metrics.append(f'profile;desc="{profile}"')
+        return ', '.join(metrics)
+
+
+def timed(name, function):
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        timings = current.get()
+        if timings is None:
+            return function(*args, **kwargs)
+        with timings.measure(name):
+            return function(*args, **kwargs)
+    return wrapper
+
+
+def timed_property(name, prop):
+    return property(timed(name, prop.fget), prop.fset, prop.fdel)
+
+
+def profiled(function):
+    """Запускает cProfile сразу после аутентификации: до неё неизвестно,
+    сделал ли запрос администратор.
+    """
+    @wraps(function)
+    def wrapper(self, request):
+        function(self, request)
+        timings = current.get()
+        if timings is not None and timings.profile is None:
+            timings.profile = start_profile(request)
+    return wrapper
+
+
+def install():
+    """Оборачивает методы DRF, время которых составляет фазы запроса."""
+    if getattr(APIView, '_server_timing', False):
+        return
+    APIView._server_timing = True
+    APIView.perform_authentication = profiled(timed(
+        'auth', APIView.perform_authentication
+    ))
+    APIView.check_permissions = timed(
+        'permissions', APIView.check_permissions
+    )
+    APIView.check_object_permissions = timed(
+        'permissions', APIView.check_object_permissions
+    )
+    QuerySet._fetch_all = timed('queryset', QuerySet._fetch_all)
+    Serializer.data = timed_property('serialize', Serializer.data)
+    ListSerializer.data = timed_property('serialize', ListSerializer.data)
+    Response.rendered_content = timed_property(
+        'render', Response.rendered_content
+    )
+
+
+@contextmanager
+def measure_queries(timings):
+    def execute(execute, sql, params, many, context):
+        with timings.measure('db'):
+            return execute(sql, params, many, context)
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(execute))
+        yield
+
+
+def start_profile(request):
+    """cProfile для запроса администратора с параметром `?profile=1` с
+    вероятностью `PROFILE_SAMPLE_RATE`.
+    """
+    if (
+        request.GET.get(PROFILE_PARAM) != '1'
+        or not getattr(request.user, 'is_admin', False)
+        or random.random() >= settings.PROFILE_SAMPLE_RATE
+    ):
+        return None
+    profile = Profile()
+    profile.enable()
+    return profile
+
+
+def save_profile(profile, request):
+    """Сохраняет дамп в PROFILE_DIR и возвращает имя файла."""
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    path = re.sub(r'\W+', '-', request.path, flags=re.ASCII).strip('-')
+    name = (
+        f'{timezone.now():%Y%m%d-%H%M%S-%f}-{request.method.lower()}-'
+        f'{path}.prof'
+    )
+    profile.dump_stats(os.path.join(settings.PROFILE_DIR, name))
+    return name
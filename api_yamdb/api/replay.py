@@ -0,0 +1,315 @@
+"""Воспроизведение реального трафика: Postman-коллекция и журналы доступа.
+
+Запросы превращаются в шаги нагрузки (`Step`) и выполняются в несколько
+потоков с заданной частотой через отправителей из `api.benchmark`.
+"""
+import json
+import re
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from threading import Lock
+from time import perf_counter, sleep
+from urllib.parse import urlsplit
+
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+from api.benchmark import summarize
+from users.models import CustomUser
+
+# Шаг нагрузки. В `path`, `body` и `token` коллекции могут быть
+# переменные `{{name}}`; `expected` — ожидаемый статус ответа. Шаг
+# `anonymous` выполняется без учётных данных исходного запроса, поэтому
+# ответ 401/403 на него — отказ в доступе, а не ошибка.
+Step = namedtuple(
+    'Step', 'name method path body token expected anonymous',
+    defaults=(False,)
+)
+VARIABLE = re.compile(r'{{\s*(\w+)\s*}}')
+# Статус, который проверяет тест запроса в коллекции.
+EXPECTED_STATUS = re.compile(r'to\.be\.eql\(\s*["\']([A-Z][\w ]+)["\']\s*\)')
+# Значение из ответа, которое тест сохраняет в переменную коллекции.
+RESPONSE_FIELD = re.compile(
+    r'const (\w+) = _\.get\(responseData, ["\'](\w+)["\']\)'
+)
+SET_VARIABLE = re.compile(
+    r'pm\.collectionVariables\.set\(["\'](\w+)["\'], (\w+)\)'
+)
+# Строка журнала доступа: runserver, nginx и gunicorn (Combined Log
+# Format) записывают запрос и статус одинаково.
+LOG_LINE = re.compile(
+    r'"(?P<method>[A-Z]+) (?P<path>\S+) HTTP/[\d.]+" (?P<status>\d{3})'
+)
+SAFE_METHODS = ('GET', 'HEAD')
+DENIED_STATUSES = (HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN)
+CONFIRMATION_CODE = re.compile(r'^(\w+)ConfirmationCode$')
+# Пользователи, которых создаёт `postman_collection/set_up_data.sh`.
+COLLECTION_USERS = (
+    ('superuser', 'superuser@admin.ru', 'user', True),
+    ('admin-user', 'admin-user@admin.ru', 'admin', False),
+    ('moderator', 'moderator@admin.ru', 'moderator', False),
+)
+STATUSES = {status.phrase: status.value for status in HTTPStatus}
+
+
+def get_expected_status(item):
+    for event in item.get('event', ()):
+        if event.get('listen') != 'test':
+            continue
+        for phrase in EXPECTED_STATUS.findall('\n'.join(
+            event['script'].get('exec', ())
+        )):
+            if phrase in STATUSES:
+                return STATUSES[phrase]
+    return None
+
+
+def get_extractors(item):
+    """Переменные, которые тест запроса заполняет полями ответа."""
+    script = '\n'.join(
+        line for event in item.get('event', ())
+        if event.get('listen') == 'test'
+        for line in event['script'].get('exec', ())
+    )
+    fields = dict(RESPONSE_FIELD.findall(script))
+    return {
+        variable: fields[local]
+        for variable, local in SET_VARIABLE.findall(script)
+        if local in fields
+    }
+
+
+def get_token(auth):
+    if not auth or auth.get('type') != 'bearer':
+        return None
+    for option in auth.get('bearer', ()):
+        if option.get('key') == 'token':
+            return option.get('value')
+    return None
+
+
+def get_path(url):
+    raw = url['raw'] if isinstance(url, dict) else url
+    parts = urlsplit(raw if '://' in raw else f'http://host{raw}')
+    return f'{parts.path}?{parts.query}' if parts.query else parts.path
+
+
+def load_collection(path):
+    """Шаги и начальные переменные Postman-коллекции (формат 2.1).
+
+    Авторизация наследуется от папок. Кроме шагов возвращается словарь
+    `extractors`: номер шага -> {переменная: поле ответа}.
+    """
+    with open(path, encoding='utf-8') as file:
+        collection = json.load(file)
+    variables = {
+        variable['key']: variable.get('value', '')
+        for variable in collection.get('variable', ())
+    }
+    steps, extractors = [], {}
+
+    def walk(items, auth):
+        for item in items:
+            if 'item' in item:
+                walk(item['item'], item.get('auth', auth))
+                continue
+            request = item['request']
+            body = request.get('body') or {}
+            step = Step(
+                name=item['name'],
+                method=request['method'],
+                path=get_path(request['url']),
+                body=body.get('raw') if body.get('mode') == 'raw' else None,
+                token=get_token(request.get('auth', auth)),
+                expected=get_expected_status(item)
+            )
+            steps.append(step)
+            extractors[len(steps) - 1] = get_extractors(item)
+
+    walk(collection.get('item', ()), collection.get('auth'))
+    return steps, variables, extractors
+
+
+def load_access_log(path):
+    """Безопасные запросы из журнала доступа, число пропущенных строк и
+    число строк с отказом в доступе.
+
+    Тела запросов в журнал не попадают, поэтому изменяющие запросы не
+    воспроизводятся; ожидаемый статус берётся из журнала. Заголовки тоже
+    не записываются: повтор идёт без `If-None-Match`, поэтому вместо 304
+    ожидается 200, и без учётных данных, поэтому строки с 401/403
+    пропускаются, а такие ответы на остальные запросы считаются отказами.
+    """
+    steps, skipped, denied = [], 0, 0
+    with open(path, encoding='utf-8', errors='replace') as file:
+        for line in file:
+            match = LOG_LINE.search(line)
+            if match is None or match['method'] not in SAFE_METHODS:
+                skipped += bool(line.strip())
+                continue
+            status = int(match['status'])
+            if status in DENIED_STATUSES:
+                denied += 1
+                continue
+            if status == HTTPStatus.NOT_MODIFIED:
+                status = HTTPStatus.OK
+            steps.append(Step(
+                None, match['method'], match['path'], None, None, status,
+                anonymous=True
+            ))
+    return steps, skipped, denied
+
+
+def create_collection_users():
+    """Пользователи коллекции, как после `set_up_data.sh`."""
+    for username, email, role, superuser in COLLECTION_USERS:
+        CustomUser.objects.get_or_create(
+            username=username,
+            defaults={
+                'email': email, 'role': role, 'is_superuser': superuser,
+                'is_staff': superuser,
+            }
+        )
+
+
+def lookup_variable(name, variables):
+    """Код подтверждения читается из базы по имени пользователя."""
+    match = CONFIRMATION_CODE.match(name)
+    username = match and variables.get(f'{match.group(1)}Username')
+    if not username:
+        return None
+    return CustomUser.objects.filter(username=username).values_list(
+        'confirmation_code', flat=True
+    ).first()
+
+
+def render(template, variables):
+    if template is None:
+        return None
+
+    def replace(match):
+        name = match.group(1)
+        value = lookup_variable(name, variables)
+        if value is None:
+            value = variables.get(name)
+        return match.group(0) if value is None else str(value)
+
+    return VARIABLE.sub(replace, template)
+
+
+def resolve_step(step, variables):
+    return step._replace(
+        path=render(step.path, variables),
+        body=render(step.body, variables),
+        token=render(step.token, variables)
+    )
+
+
+def send_step(send, step):
+    headers = {'Authorization': f'Bearer {step.token}'} if step.token else {}
+    return send(step.method.lower(), step.path, {}, step.body, headers)
+
+
+def is_denied(step, result):
+    return step.anonymous and result.status in DENIED_STATUSES
+
+
+def is_error(step, result):
+    """Ошибка — статус, отличный от ожидаемого, или 5xx без ожидания.
+
+    Отказ в доступе анонимному шагу (`is_denied`) ошибкой не считается.
+    """
+    if is_denied(step, result):
+        return False
+    if step.expected is None:
+        return result.status >= 500
+    return result.status != step.expected
+
+
+def prime(send, steps, variables, extractors, skip=('DELETE',)):
+    """Последовательно выполняет коллекцию, заполняя переменные.
+
+    Запросы с методами из `skip` не выполняются, чтобы созданные
+    коллекцией объекты остались для нагрузки. Возвращает шаги с
+    подставленными значениями и число ответов с неожиданным статусом.
+    """
+    variables = dict(variables)
+    resolved, failures = [], 0
+    for index, step in enumerate(steps):
+        if step.method in skip:
+            continue
+        step = resolve_step(step, variables)
+        resolved.append(step)
+        result = send_step(send, step)
+        failures += is_error(step, result)
+        if extractors.get(index) and 200 <= result.status < 300:
+            data = json.loads(result.content or 'null')
+            for variable, field in extractors[index].items():
+                if isinstance(data, dict) and data.get(field):
+                    variables[variable] = data[field]
+    # Переменные, заполненные позже шага, подставляются повторно.
+    return [resolve_step(step, variables) for step in resolved], failures
+
+
+def get_group(step):
+    if step.name:
+        return step.name
+    try:
+        route = resolve(urlsplit(step.path).path).url_name
+    except Resolver404:
+        route = urlsplit(step.path).path
+    return f'{step.method} {route}'
+
+
+def replay(make_sender, workload, concurrency=1, rate=None):
+    """Выполняет шаги в `concurrency` потоков не чаще `rate` в секунду.
+
+    Возвращает сводку `summarize` по каждой группе запросов и по всем
+    запросам вместе (`all`); ошибки считает `is_error`, отказы в доступе
+    (`denied`) — `is_denied`.
+    """
+    lock = Lock()
+    queue = enumerate(workload)
+    records = []
+    started = perf_counter()
+
+    def worker():
+        send = make_sender()
+        try:
+            while True:
+                with lock:
+                    item = next(queue, None)
+                if item is None:
+                    return
+                number, step = item
+                if rate:
+                    delay = started + number / rate - perf_counter()
+                    if delay > 0:
+                        sleep(delay)
+                records.append((step, send_step(send, step)))
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        for future in [
+            executor.submit(worker) for _ in range(concurrency)
+        ]:
+            future.result()
+    total = perf_counter() - started
+    groups = defaultdict(list)
+    for step, result in records:
+        groups[get_group(step)].append((step, result))
+    groups['all'] = records
+    report = {}
+    for name, group in groups.items():
+        errors = sum(is_error(step, result) for step, result in group)
+        summary = summarize(
+            [result for step, result in group], total, errors
+        )
+        summary['error_rate'] = round(errors / len(group), 4)
+        summary['denied'] = sum(
+            is_denied(step, result) for step, result in group
+        )
+        report[name] = summary
+    return report
@@ -0,0 +1,43 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Реплика, из которой читает текущий запрос; None — основная база.
+read_replica = ContextVar('read_replica', default=None)
+
+
+def choose_replica():
+    replicas = settings.DB_REPLICA_ALIASES
+    return random.choice(replicas) if replicas else None
+
+
+def use_primary():
+    """Переключает чтение в текущем запросе на основную базу."""
+    read_replica.set(None)
+
+
+class ReplicaRouter:
+    """Направляет чтение моделей каталога и отзывов в реплику.
+
+    Реплику для запроса выбирает `api.middleware.ReplicaMiddleware`;
+    пользователи, запись и запросы вне этого контекста всегда идут в
+    основную базу.
+    """
+
+    route_app_labels = {'reviews'}
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in self.route_app_labels:
+            return read_replica.get()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DB_REPLICA_ALIASES}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
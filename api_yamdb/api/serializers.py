@@ -4,10 +4,13 @@ from rest_framework.response import Response
 
 from api_yamdb.settings import (
     EMAIL_ML,
+    LEADERBOARD_MAX_LIMIT,
+    MAX_LENGTH_TEXT,
     USERNAME_ML,
     USERNAME_REGEX
 )
 from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.search import KINDS
 from users.models import CustomUser
 
 
@@ -124,18 +127,120 @@ class GenreSerializer(serializers.ModelSerializer):
         model = Genre
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class SparseFieldsetMixin:
+    """Выбор полей ответа параметрами запроса `fields` и `expand`.
+
+    `fields` — поля через запятую, остальные не сериализуются. Связи из
+    `expandable_fields` выводятся вложенными объектами, только если они
+    перечислены в `expand`, иначе — слагами; без параметра `expand` все
+    связи вложены, как в полном ответе.
+    """
+
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+    # Связь: параметры `SlugRelatedField` для вывода без вложения.
+    expandable_fields = {}
+
+    @classmethod
+    def get_sparse_fieldset(cls, request):
+        """Запрошенные поля (`None` — все) и вложенные связи."""
+        params = request.query_params
+        allowed = cls.Meta.fields
+        fields = expand = None
+        if cls.fields_query_param in params:
+            fields = set(filter(None, params[cls.fields_query_param].split(
+                ','
+            )))
+            unknown = fields - set(allowed)
+            if unknown or not fields:
+                raise serializers.ValidationError({
+                    cls.fields_query_param: (
+                        f'Допустимые поля: {", ".join(allowed)}'
+                    )
+                })
+        if cls.expand_query_param in params:
+            expand = set(filter(None, params[cls.expand_query_param].split(
+                ','
+            )))
+            if expand - set(cls.expandable_fields):
+                raise serializers.ValidationError({
+                    cls.expand_query_param: (
+                        'Допустимые связи: '
+                        f'{", ".join(cls.expandable_fields)}'
+                    )
+                })
+        else:
+            expand = set(cls.expandable_fields)
+        return fields, expand
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None:
+            return
+        fields, expand = self.get_sparse_fieldset(request)
+        for name in list(self.fields):
+            if fields is not None and name not in fields:
+                self.fields.pop(name)
+            elif name in self.expandable_fields and name not in expand:
+                self.fields[name] = serializers.SlugRelatedField(
+                    slug_field='slug', read_only=True,
+                    **self.expandable_fields[name]
+                )
+
+
+class TitleReadSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Сериализатор для чтения произведений."""
 
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(read_only=True, many=True)
-    rating = serializers.IntegerField(read_only=True, required=False)
+    expandable_fields = {'category': {}, 'genre': {'many': True}}
 
     class Meta:
-        fields = '__all__'
+        fields = (
+            'id',
+            'name',
+            'year',
+            'rating',
+            'description',
+            'genre',
+            'category'
+        )
         model = Title
 
 
+class TitleTopSerializer(TitleReadSerializer):
+    """Произведение в таблице лидеров со сглаженной оценкой."""
+
+    score = serializers.FloatField(read_only=True)
+
+    class Meta(TitleReadSerializer.Meta):
+        fields = TitleReadSerializer.Meta.fields + ('score',)
+
+
+class TitleTopQuerySerializer(serializers.Serializer):
+    genre = serializers.SlugField(required=False)
+    category = serializers.SlugField(required=False)
+    decade = serializers.IntegerField(required=False)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=LEADERBOARD_MAX_LIMIT, default=10
+    )
+
+    def validate_decade(self, value):
+        if value % 10:
+            raise serializers.ValidationError(
+                'Десятилетие задаётся первым годом, например 1990.'
+            )
+        return value
+
+    def validate(self, data):
+        if 'genre' in data and 'category' in data:
+            raise serializers.ValidationError(
+                'Укажите либо жанр, либо категорию.'
+            )
+        return data
+
+
 class TitleEditSerializer(serializers.ModelSerializer):
     """Сериализатор для записи и изменения произведений."""
 
@@ -150,7 +255,14 @@ class TitleEditSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = '__all__'
+        fields = (
+            'id',
+            'name',
+            'year',
+            'description',
+            'genre',
+            'category'
+        )
         model = Title
 
 
@@ -175,15 +287,6 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = '__all__'
         model = Review
 
-    def validate(self, data):
-        if self.context['request'].method == 'POST':
-            title = data.get('title')
-            author = self.context['request'].user
-            if Review.objects.filter(title=title, author=author).exists():
-                raise serializers.ValidationError(
-                    'Вы уже оставляли отзыв на это произведение.')
-        return data
-
 
 class CommentSerializer(serializers.ModelSerializer):
     review = serializers.SlugRelatedField(
@@ -213,3 +316,28 @@ class MeSerializer(serializers.ModelSerializer):
             'bio',
             'role'
         )
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=MAX_LENGTH_TEXT)
+    type = serializers.CharField(required=False)
+
+    def validate_type(self, value):
+        kinds = tuple(dict.fromkeys(
+            kind.strip() for kind in value.split(',') if kind.strip()
+        ))
+        unknown = set(kinds) - set(KINDS)
+        if unknown or not kinds:
+            raise serializers.ValidationError(
+                f'Допустимые типы: {", ".join(KINDS)}'
+            )
+        return kinds
+
+
+class SearchResultSerializer(serializers.Serializer):
+    type = serializers.CharField()
+    id = serializers.IntegerField()
+    title_id = serializers.IntegerField()
+    review_id = serializers.IntegerField(allow_null=True)
+    text = serializers.CharField()
+    rank = serializers.FloatField(allow_null=True)
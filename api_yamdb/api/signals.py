@@ -0,0 +1,117 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db.models.signals import (m2m_changed, post_delete, post_init,
+                                      post_save)
+from django.dispatch import receiver
+
+from api.authentication import (AUTH_FIELDS, invalidate_authorization,
+                                revoke_user_tokens)
+from api.cache import invalidate, invalidate_all
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import CustomUser
+
+# Пространства имён кэша, которые устаревают при изменении объекта модели.
+CACHE_DEPENDENCIES = {
+    Category: lambda category: ('categories', 'titles'),
+    Genre: lambda genre: ('genres', 'titles'),
+    Title: lambda title: ('titles', f'reviews:{title.pk}'),
+    Review: lambda review: (
+        'titles', f'reviews:{review.title_id}', f'comments:{review.pk}'
+    ),
+    Comment: lambda comment: (f'comments:{comment.review_id}',),
+}
+
+
+def invalidate_cached_responses(sender, instance, **kwargs):
+    invalidate(*CACHE_DEPENDENCIES[sender](instance))
+
+
+for model in CACHE_DEPENDENCIES:
+    post_save.connect(invalidate_cached_responses, sender=model)
+    post_delete.connect(invalidate_cached_responses, sender=model)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, instance, action, **kwargs):
+    if action.startswith('post_'):
+        invalidate('titles')
+
+
+@receiver(post_init, sender=CustomUser)
+def remember_username(sender, instance, **kwargs):
+    instance._loaded_username = instance.username
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_usernames(sender, instance, created, **kwargs):
+    """Имена авторов выводятся в отзывах и комментариях."""
+    if not created and instance.username != instance._loaded_username:
+        invalidate('usernames')
+    instance._loaded_username = instance.username
+
+
+@receiver(post_init, sender=CustomUser)
+def remember_authorization(sender, instance, **kwargs):
+    instance._loaded_authorization = get_authorization_fields(instance)
+
+
+def get_authorization_fields(instance):
+    # Отложенные поля не загружаются: их значение не могло измениться.
+    return {
+        name: instance.__dict__[name] for name in AUTH_FIELDS
+        if name in instance.__dict__
+    }
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_user_authorization(sender, instance, created, **kwargs):
+    invalidate_authorization(instance.pk)
+    loaded = instance._loaded_authorization
+    current = get_authorization_fields(instance)
+    if settings.JWT_ROLE_CLAIMS and not created and any(
+        current[name] != value for name, value in loaded.items()
+    ):
+        # Роль записана в выданные токены: их нужно отозвать.
+        revoke_user_tokens(instance.pk)
+    instance._loaded_authorization = current
+
+
+@receiver(post_delete, sender=CustomUser)
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    invalidate_authorization(instance.pk)
+    if settings.JWT_ROLE_CLAIMS:
+        revoke_user_tokens(instance.pk)
+
+
+def get_authorizations():
+    return {
+        data['id']: data
+        for data in CustomUser.objects.values(*AUTH_FIELDS).iterator()
+    }
+
+
+@contextmanager
+def reloading_data():
+    """Сбрасывает кэши после массовой загрузки данных.
+
+    `bulk_create`, `bulk_update` и очистка таблиц не вызывают сигналов, а
+    после повторной загрузки id совпадают со старыми, поэтому меняется
+    общая версия всех ответов. Кэш прав пользователей, изменённых или
+    удалённых загрузкой, сбрасывается, а при `JWT_ROLE_CLAIMS` их токены
+    отзываются.
+    """
+    before = get_authorizations()
+    yield
+    after = get_authorizations()
+    changed = [
+        user_id for user_id in before.keys() | after.keys()
+        if before.get(user_id) != after.get(user_id)
+    ]
+    invalidate_all()
+    if changed:
+        invalidate_authorization(*changed)
+    if settings.JWT_ROLE_CLAIMS:
+        revoked = [user_id for user_id in changed if user_id in before]
+        if revoked:
+            revoke_user_tokens(*revoked)
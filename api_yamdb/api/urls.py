@@ -7,7 +7,9 @@ from api.views import (
     CommentViewSet,
     GenreViewSet,
     ObtainTokenView,
+    RevokeTokenView,
     ReviewViewSet,
+    SearchView,
     TitleViewSet,
     UserViewSet)
 
@@ -27,8 +29,32 @@ router_v1.register(
     basename='comments'
 )
 
+# Максимальное число SQL-запросов на один запрос к API для каждого маршрута.
+# Бюджет не должен зависеть от размера страницы: рост числа запросов вместе
+# с количеством объектов в ответе означает проблему N+1.
+QUERY_BUDGETS = {
+    'signup': {'create': 10},
+    'token': {'create': 5},
+    'user': {
+        'list': 3, 'retrieve': 2, 'create': 4, 'update': 5, 'delete': 17
+    },
+    'category': {'list': 3, 'create': 3, 'delete': 6},
+    'genre': {'list': 3, 'create': 3, 'delete': 6},
+    'title': {
+        'list': 4, 'retrieve': 3, 'create': 13, 'update': 13, 'delete': 15
+    },
+    'reviews': {
+        'list': 4, 'retrieve': 3, 'create': 8, 'update': 9, 'delete': 12
+    },
+    'comments': {
+        'list': 3, 'retrieve': 2, 'create': 4, 'update': 4, 'delete': 6
+    },
+}
+
 urlpatterns = [
     path('v1/auth/signup/', AuthView.as_view()),
     path('v1/auth/token/', ObtainTokenView.as_view()),
+    path('v1/auth/token/revoke/', RevokeTokenView.as_view()),
+    path('v1/search/', SearchView.as_view()),
     path('v1/', include(router_v1.urls)),
 ]
@@ -1,8 +1,8 @@
-from django.core.mail import send_mail
 from django.shortcuts import get_object_or_404
 from rest_framework.exceptions import ValidationError
 
 from api_yamdb.settings import PROJECT_MAIL
+from users.mail import queue_mail
 from users.models import CustomUser
 
 
@@ -17,10 +17,9 @@ def verification(cur_user, cur_email):
     user.confirmation_code = verification_code
     user.save()
 
-    send_mail(
+    queue_mail(
         subject='Верификация',
         message=verification_code,
         from_email=PROJECT_MAIL,
         recipient_list=[user.email, ],
-        fail_silently=True,
     )
@@ -1,3 +1,4 @@
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, status, viewsets
@@ -10,9 +11,11 @@ from rest_framework.pagination import (
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 
-from api.filters import TitleFilter
+from api.authentication import issue_access_token, revoke_token
+from api.cache import CachedListMixin, CachedResponseMixin
+from api.filters import StableOrderingFilter, TitleFilter
+from api.pagination import PageNumberOrCursorPagination
 from api.permissions import (
     IsAdminOrReadOnly,
     IsOwnerOrReadOnlyReview,
@@ -25,8 +28,12 @@ from api.serializers import (
     MeSerializer,
     ObtainTokenSerializer,
     ReviewSerializer,
+    SearchQuerySerializer,
+    SearchResultSerializer,
     TitleEditSerializer,
     TitleReadSerializer,
+    TitleTopQuerySerializer,
+    TitleTopSerializer,
     UserRegistraionSerializer,
     UserSerializer)
 from api.utils import verification
@@ -35,7 +42,9 @@ from reviews.models import (
     Comment,
     Genre,
     Review,
-    Title)
+    Title,
+    TitleRanking)
+from reviews.search import KINDS, get_search_backend
 from users.models import CustomUser
 
 
@@ -83,9 +92,8 @@ class ObtainTokenView(APIView):
         if serializer.is_valid():
             user = get_object_or_404(CustomUser,
                                      username=request.data.get('username'))
-            refresh = RefreshToken.for_user(user)
             return Response(
-                {'token': str(refresh.access_token)},
+                {'token': str(issue_access_token(user))},
                 status=status.HTTP_200_OK
             )
         cur_user = CustomUser.objects.filter(
@@ -99,6 +107,38 @@ class ObtainTokenView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class RevokeTokenView(APIView):
+    """Отзыв токена, с которым выполнен запрос."""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        revoke_token(request.auth)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class SearchView(APIView):
+    """Полнотекстовый поиск по произведениям, отзывам и комментариям.
+
+    Параметры: `q` — запрос, `type` — типы документов через запятую.
+    """
+
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        query = SearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        results = get_search_backend().search(
+            query.validated_data['q'],
+            query.validated_data.get('type', KINDS)
+        )
+        paginator = PageNumberPagination()
+        page = paginator.paginate_queryset(results, request, view=self)
+        return paginator.get_paginated_response(
+            SearchResultSerializer(page, many=True).data
+        )
+
+
 class UserViewSet(viewsets.ModelViewSet):
     queryset = CustomUser.objects.all().order_by('id')
     serializer_class = UserSerializer
@@ -128,9 +168,10 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class CategoryViewSet(ListCreateViewSet):
+class CategoryViewSet(CachedListMixin, ListCreateViewSet):
     """Вьюсет для просмотра категорий."""
 
+    cache_namespace = 'categories'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     pagination_class = LimitOffsetPagination
@@ -140,9 +181,10 @@ class CategoryViewSet(ListCreateViewSet):
     lookup_field = 'slug'
 
 
-class GenreViewSet(ListCreateViewSet):
+class GenreViewSet(CachedListMixin, ListCreateViewSet):
     """Вьюсет для просмотра жанров."""
 
+    cache_namespace = 'genres'
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrReadOnly,)
@@ -152,32 +194,82 @@ class GenreViewSet(ListCreateViewSet):
     lookup_field = 'slug'
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     """Вьюсет для работы с произведениями."""
 
-    queryset = Title.objects.all().order_by('id')
+    cache_namespace = 'titles'
+    queryset = Title.objects.with_related().order_by('id')
     permission_classes = (IsAdminOrReadOnly,)
     pagination_class = LimitOffsetPagination
     filterset_class = TitleFilter
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, StableOrderingFilter)
+    # Только денормализованные поля с индексами (поле, id): сортировка
+    # по рейтингу не вычисляет средние оценки по таблице отзывов.
+    ordering_fields = ('id', 'name', 'year', 'rating', 'reviews_count')
+    ordering = ('id',)
     http_method_names = ('get', 'post', 'patch', 'delete')
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return TitleReadSerializer
+        if self.action == 'top':
+            return TitleTopSerializer
         return TitleEditSerializer
 
+    def get_sparse_queryset(self):
+        """Произведения только с полями из параметра `fields`."""
+        fields, expand = self.get_serializer_class().get_sparse_fieldset(
+            self.request
+        )
+        return Title.objects.with_related(fields)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    def get_queryset(self):
+        if self.action in ('list', 'retrieve'):
+            return self.get_sparse_queryset().order_by('id')
+        return super().get_queryset()
+
+    @action(detail=False, url_path='top')
+    def top(self, request):
+        """Лучшие произведения по сглаженной оценке в жанре, категории
+        и десятилетии: `?genre=drama&decade=1990&limit=10`.
+        """
+        return self.get_cached_response(self.get_top, request)
+
+    def get_top(self, request):
+        query = TitleTopQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        limit = query.validated_data.pop('limit')
+        scores = dict(
+            TitleRanking.objects.top(**query.validated_data).values_list(
+                'title_id', 'score'
+            )[:limit]
+        )
+        titles = self.get_sparse_queryset().in_bulk(scores)
+        for title_id, score in scores.items():
+            if title_id in titles:
+                titles[title_id].score = score
+        serializer = self.get_serializer(
+            [titles[title_id] for title_id in scores if title_id in titles],
+            many=True
+        )
+        return Response(serializer.data)
+
+
+class ReviewViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = (IsOwnerOrReadOnlyReview,)
+    pagination_class = PageNumberOrCursorPagination
     http_method_names = ['get', 'post', 'patch', 'delete']
+    cache_responses = False
+
+    def get_cache_namespaces(self):
+        return ('usernames', f'reviews:{self.kwargs.get("title_id")}')
 
     def get_queryset(self):
         title = get_object_or_404(
             Title,
             id=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        return title.reviews.select_related('author')
 
     def perform_create(self, serializer):
         title = get_object_or_404(
@@ -187,18 +279,36 @@ class ReviewViewSet(viewsets.ModelViewSet):
                                  author=self.request.user).exists():
             raise ValidationError(
                 detail='Может существовать только один отзыв!')
-        serializer.save(author=self.request.user, title=title)
+        # Рейтинг произведения обновляют сигналы `reviews.signals` в той
+        # же транзакции.
+        with transaction.atomic():
+            serializer.save(author=self.request.user, title=title)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            # Оценка перечитывается с блокировкой строки: параллельное
+            # изменение того же отзыва дождётся фиксации этого.
+            locked = Review.objects.select_for_update().only(
+                'score'
+            ).get(pk=serializer.instance.pk)
+            serializer.instance._loaded_score = locked.score
+            serializer.save()
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = (IsOwnerOrReadOnlyReview,)
+    pagination_class = PageNumberOrCursorPagination
     http_method_names = ['get', 'post', 'patch', 'delete']
+    cache_responses = False
+
+    def get_cache_namespaces(self):
+        return ('usernames', f'comments:{self.kwargs.get("review_id")}')
 
     def get_queryset(self):
         return Comment.objects.filter(
             review_id=self.kwargs.get('review_id')
-        ).order_by('id')
+        ).select_related('author', 'review').order_by('id')
 
     def perform_create(self, serializer):
         review = get_object_or_404(
@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -27,6 +28,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -34,6 +37,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -58,13 +62,139 @@ TEMPLATES = [
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
 
+# База данных настраивается переменными окружения. По умолчанию — SQLite;
+# для PostgreSQL задаются DB_ENGINE=django.db.backends.postgresql и
+# параметры подключения. Соединения переиспользуются между запросами
+# в течение DB_CONN_MAX_AGE секунд (0 — закрывать после каждого запроса,
+# пусто — без ограничения) и проверяются при первом обращении в запросе
+# (api.db.check_connections). При работе через PgBouncer в режиме
+# transaction нужно отключить серверные курсоры.
+SQLITE_ENGINE = 'api_yamdb.sqlite3'
+DB_ENGINE = os.getenv('DB_ENGINE', SQLITE_ENGINE)
+DB_CONN_MAX_AGE = os.getenv('DB_CONN_MAX_AGE', '60')
+# Профиль SQLite для одновременной записи (api_yamdb.sqlite3): журнал WAL
+# не блокирует читателей на время записи, а транзакции сразу берут
+# блокировку на запись и ждут её до DB_TIMEOUT секунд.
+SQLITE_OPTIONS = {
+    'timeout': int(os.getenv('DB_TIMEOUT', 20)),
+    'transaction_mode': 'IMMEDIATE',
+    'pragmas': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,
+        'mmap_size': 134217728,
+        'temp_store': 'MEMORY',
+    },
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': DB_ENGINE,
+        'NAME': os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        'CONN_MAX_AGE': int(DB_CONN_MAX_AGE) if DB_CONN_MAX_AGE else None,
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', '1') == '1',
+    }
+}
+if DB_ENGINE == SQLITE_ENGINE:
+    DATABASES['default']['OPTIONS'] = SQLITE_OPTIONS
+elif DB_ENGINE != 'django.db.backends.sqlite3':
+    DATABASES['default'].update({
+        'NAME': os.getenv('DB_NAME', 'yamdb'),
+        'USER': os.getenv('POSTGRES_USER', 'postgres'),
+        'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+        'HOST': os.getenv('DB_HOST', 'localhost'),
+        'PORT': os.getenv('DB_PORT', '5432'),
+        'DISABLE_SERVER_SIDE_CURSORS': (
+            os.getenv('DB_DISABLE_SERVER_SIDE_CURSORS', '') == '1'
+        ),
+        'OPTIONS': {
+            'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 5)),
+        },
+    })
+
+# Реплики для чтения: DB_REPLICAS — через запятую пути к файлам SQLite или
+# хосты PostgreSQL. Безопасные запросы к DB_REPLICA_PATHS читают из
+# случайной реплики (api.routers.ReplicaRouter), кроме данных, изменённых
+# за последние DB_REPLICA_LAG секунд, и клиентов, которые за это время
+# выполняли запись.
+DB_REPLICA_ALIASES = []
+for number, replica in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', '').split(',')), 1
+):
+    alias = f'replica{number}'
+    option = 'NAME' if DB_ENGINE.endswith('sqlite3') else 'HOST'
+    DATABASES[alias] = dict(
+        DATABASES['default'], **{option: replica.strip()},
+        TEST={'MIRROR': 'default'}
+    )
+    DB_REPLICA_ALIASES.append(alias)
+DB_REPLICA_LAG = int(os.getenv('DB_REPLICA_LAG', 5))
+DB_REPLICA_PATHS = (
+    '/api/v1/titles/', '/api/v1/genres/', '/api/v1/categories/'
+)
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'yamdb'),
     }
 }
 
+API_CACHE_ALIAS = 'default'
+
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', 300))
+
+# Полнотекстовый поиск (reviews.search): для SQLite — индекс FTS5, для
+# остальных баз — поиск по вхождению слов без индекса.
+SEARCH_BACKEND = os.getenv(
+    'SEARCH_BACKEND',
+    'reviews.search.FTS5SearchBackend' if DB_ENGINE.endswith('sqlite3')
+    else 'reviews.search.SearchBackend'
+)
+SEARCH_MAX_RESULTS = 1000
+
+# Таблица лидеров (reviews.models.TitleRanking): средняя оценка
+# произведения сглаживается к LEADERBOARD_PRIOR_MEAN так, будто у него есть
+# ещё LEADERBOARD_PRIOR_WEIGHT отзывов с этой оценкой. После изменения
+# параметров нужно выполнить команду recalculate_rating.
+LEADERBOARD_PRIOR_MEAN = 5.5
+LEADERBOARD_PRIOR_WEIGHT = 5
+LEADERBOARD_MAX_LIMIT = 100
+
+# Профилирование запросов (api.profiling): при SERVER_TIMING=1 ответы
+# получают заголовок Server-Timing с временем аутентификации, проверки
+# прав, запросов к базе, сериализации и рендеринга. Запросы администраторов
+# с параметром ?profile=1 с вероятностью PROFILE_SAMPLE_RATE сохраняют
+# дамп cProfile в PROFILE_DIR.
+SERVER_TIMING = os.getenv('SERVER_TIMING', '') == '1'
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 1))
+PROFILE_DIR = os.getenv('PROFILE_DIR', BASE_DIR / 'profiles')
+
+# Метрики (api.metrics): при METRICS=1 число и задержка запросов, SQL-запросы
+# и попадания в кэш по маршрутам доступны по адресу /metrics/ в формате
+# Prometheus. Если задан METRICS_TOKEN, сборщик передаёт его в заголовке
+# Authorization: Bearer. При нескольких воркерах METRICS_DIR — общий каталог,
+# куда каждый процесс раз в METRICS_FLUSH_INTERVAL секунд сохраняет метрики.
+METRICS = os.getenv('METRICS', '') == '1'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_DIR = os.getenv('METRICS_DIR', '')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 1))
+
+# Очередь исходящих писем (users.mail). В режиме EMAIL_QUEUE_EAGER письма
+# отправляются сразу после фиксации транзакции, без фоновых потоков.
+EMAIL_QUEUE_EAGER = False
+EMAIL_QUEUE_WORKERS = int(os.getenv('EMAIL_QUEUE_WORKERS', 2))
+EMAIL_QUEUE_BATCH_SIZE = 50
+EMAIL_QUEUE_POLL_INTERVAL = 10
+EMAIL_QUEUE_LEASE = 300
+EMAIL_QUEUE_MAX_ATTEMPTS = 5
+EMAIL_QUEUE_RETRY_DELAY = 30
+EMAIL_QUEUE_MAX_RETRY_DELAY = 3600
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -103,7 +233,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
@@ -115,6 +245,13 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 SIMPLE_JWT = {'ACCESS_TOKEN_LIFETIME': timedelta(days=365)}
 
+# Время жизни кэша прав пользователей и записей об отзыве токенов
+# (api.authentication), секунды.
+AUTH_CACHE_TIMEOUT = int(os.getenv('AUTH_CACHE_TIMEOUT', 300))
+# Записывать роль в токен доступа, чтобы проверять права без кэша и базы.
+# Изменение роли вступает в силу только после получения нового токена.
+JWT_ROLE_CLAIMS = os.getenv('JWT_ROLE_CLAIMS', '') == '1'
+
 
 # Constants
 
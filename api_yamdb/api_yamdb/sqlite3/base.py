@@ -0,0 +1,30 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite, настроенный для одновременной записи из нескольких потоков.
+
+    При открытии соединения выполняются PRAGMA из `OPTIONS['pragmas']`.
+    Транзакции начинаются с `BEGIN <OPTIONS['transaction_mode']>`: в режиме
+    IMMEDIATE блокировка на запись берётся в начале транзакции, и
+    конкурирующие запросы ждут её до `OPTIONS['timeout']` секунд вместо
+    ошибки «database is locked» при попытке начать запись внутри уже
+    открытой читающей транзакции.
+    """
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pragmas', None)
+        params.pop('transaction_mode', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        pragmas = self.settings_dict['OPTIONS'].get('pragmas', {})
+        for name, value in pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode')
+        self.cursor().execute(f'BEGIN {mode}' if mode else 'BEGIN')
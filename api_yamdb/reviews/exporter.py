@@ -0,0 +1,125 @@
+import csv
+import json
+import os
+from time import monotonic
+
+from reviews.importer import CSV_FILES, SECRET_FIELDS, open_data_file
+from reviews.models import Title
+from users.models import CustomUser
+
+# Поля, которые не выгружаются: секреты (`SECRET_FIELDS` выгружаются по
+# запросу) и денормализованные данные, пересчитываемые при загрузке.
+EXCLUDED_FIELDS = {
+    CustomUser: ('password', 'confirmation_code', 'last_login'),
+    Title: ('rating', 'reviews_count', 'score_sum'),
+}
+FORMATS = ('csv', 'jsonl')
+
+
+def encode_value(value):
+    """Даты сохраняются в ISO 8601 с полной точностью."""
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+def get_export_columns(model, secrets=False):
+    excluded = set(EXCLUDED_FIELDS.get(model, ()))
+    if secrets:
+        excluded -= set(SECRET_FIELDS.get(model, ()))
+    return [
+        field.attname for field in model._meta.concrete_fields
+        if field.name not in excluded
+    ]
+
+
+class ExportStats:
+    """Число выгруженных строк и затраченное время для одной модели."""
+
+    def __init__(self, model, path):
+        self.label = model._meta.label
+        self.path = path
+        self.rows = 0
+        self.seconds = 0.0
+
+    @property
+    def rate(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f'{self.label}: {self.rows} строк в {self.path} '
+            f'за {self.seconds:.2f} с ({self.rate:.0f} строк/с)'
+        )
+
+
+class DataExporter:
+    """Потоковая выгрузка моделей в файлы, совместимые с `CSVImporter`.
+
+    Строки читаются итератором `values_list` порциями по `chunk_size`
+    (на PostgreSQL — серверным курсором), поэтому расход памяти не зависит
+    от размера таблиц. С `secrets=True` выгружаются и `SECRET_FIELDS`:
+    хеши паролей и коды подтверждения.
+    """
+
+    def __init__(self, out_dir, file_format='csv', compress=False,
+                 chunk_size=2000, files=None, secrets=False):
+        self.out_dir = out_dir
+        self.file_format = file_format
+        self.compress = compress
+        self.chunk_size = chunk_size
+        self.files = files or CSV_FILES
+        self.secrets = secrets
+
+    def get_path(self, filename):
+        stem = filename.rsplit('.', 1)[0]
+        name = f'{stem}.{self.file_format}'
+        if self.compress:
+            name += '.gz'
+        return os.path.join(self.out_dir, name)
+
+    def write_csv(self, data_file, columns, rows):
+        writer = csv.writer(data_file)
+        writer.writerow(columns)
+        count = 0
+        for row in rows:
+            writer.writerow(
+                encode_value(value) if hasattr(value, 'isoformat') else value
+                for value in row
+            )
+            count += 1
+        return count
+
+    def write_jsonl(self, data_file, columns, rows):
+        count = 0
+        for row in rows:
+            record = dict(zip(columns, row))
+            data_file.write(
+                json.dumps(record, ensure_ascii=False, default=encode_value)
+                + '\n'
+            )
+            count += 1
+        return count
+
+    def export_model(self, model, filename):
+        columns = get_export_columns(model, self.secrets)
+        rows = model.objects.order_by('pk').values_list(*columns).iterator(
+            chunk_size=self.chunk_size
+        )
+        return self.write_rows(model, filename, columns, rows)
+
+    def write_rows(self, model, filename, columns, rows):
+        """Записывает строки модели в файл выгрузки."""
+        path = self.get_path(filename)
+        stats = ExportStats(model, path)
+        started = monotonic()
+        write = getattr(self, f'write_{self.file_format}')
+        with open_data_file(path, 'w') as data_file:
+            stats.rows = write(data_file, columns, rows)
+        stats.seconds = monotonic() - started
+        return stats
+
+    def run(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        return [
+            self.export_model(model, filename)
+            for model, filename in self.files.items()
+        ]
@@ -0,0 +1,271 @@
+import os
+import random
+from array import array
+from datetime import datetime, timedelta
+from itertools import accumulate
+from time import monotonic
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api_yamdb.settings import MAX_LENGTH_NAME, MAX_LENGTH_TEXT
+from reviews.exporter import get_export_columns
+from reviews.importer import CSV_FILES, ImportStats, batched
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.search import all_documents, get_search_backend
+from users.models import CustomUser
+
+WORDS = (
+    'фильм книга песня история герой сюжет финал автор режиссёр роль '
+    'актёр музыка сцена диалог персонаж город война любовь дружба море '
+    'дорога время жизнь тайна мечта память ночь утро зима лето '
+    'отличный скучный сильный слабый неожиданный красивый длинный '
+    'смешной грустный честный добрый страшный живой яркий тихий '
+    'смотрел читал слушал понравился советую пересмотрю жду удивил '
+    'разочаровал тронул'
+).split()
+CATEGORIES = ('Фильм', 'Книга', 'Музыка', 'Сериал', 'Игра', 'Спектакль')
+GENRES = (
+    'Драма', 'Комедия', 'Вестерн', 'Фэнтези', 'Фантастика', 'Детектив',
+    'Триллер', 'Сказка', 'Гонзо', 'Ужасы', 'Боевик', 'Мелодрама',
+    'Шансон', 'Классика', 'Рок', 'Роман', 'Баллада', 'Джаз',
+)
+# Среднее время от отзыва до комментария к нему.
+COMMENT_DELAY = timedelta(days=2)
+
+
+def get_zipf_weights(number, exponent):
+    """Веса закона Ципфа: k-й по популярности получает 1 / k^exponent."""
+    return [1 / rank ** exponent for rank in range(1, number + 1)]
+
+
+class DataGenerator:
+    """Синтетические данные в объёме и форме, близких к рабочим.
+
+    Популярность произведений подчиняется закону Ципфа: несколько
+    произведений собирают большую часть отзывов, а самые популярные
+    получают не больше отзывов, чем есть пользователей, — пара
+    (произведение, автор) уникальна. Отзывы публикуются не раньше года
+    выпуска произведения и чаще ближе к `end`, комментарии — вскоре
+    после отзыва. Объекты создаются лениво с явными `id`, поэтому их
+    можно как сохранить в базу, так и записать в файлы для `import_csv`.
+    При одинаковом `seed` и `end` данные совпадают.
+    """
+
+    def __init__(self, users=1000, titles=1000, reviews=20000,
+                 comments=5000, categories=len(CATEGORIES),
+                 genres=len(GENRES), zipf=1.1, days=3 * 365, seed=0,
+                 end=None):
+        if reviews > titles * users:
+            raise ValueError(
+                f'{reviews} отзывов не поместятся: пользователь пишет '
+                f'не больше одного отзыва на каждое из {titles} '
+                'произведений.'
+            )
+        if comments and not reviews:
+            raise ValueError('Для комментариев нужны отзывы.')
+        if titles and not (categories and genres):
+            raise ValueError('Для произведений нужны категории и жанры.')
+        self.users = users
+        self.titles = titles
+        self.reviews = reviews
+        self.comments = comments
+        self.categories = categories
+        self.genres = genres
+        self.zipf = zipf
+        # По умолчанию период заканчивается началом текущих суток.
+        self.end = end or timezone.now().replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        self.start = self.end - timedelta(days=days)
+        self.seed = seed
+
+    def get_text(self, words, limit=MAX_LENGTH_TEXT):
+        text = ' '.join(self.rng.choices(WORDS, k=words)).capitalize()
+        return text[:limit]
+
+    def get_date(self, timestamp):
+        return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+    def generate_categories(self):
+        for pk in range(1, self.categories + 1):
+            name = CATEGORIES[(pk - 1) % len(CATEGORIES)]
+            yield Category(id=pk, name=f'{name} {pk}', slug=f'category{pk}')
+
+    def generate_genres(self):
+        for pk in range(1, self.genres + 1):
+            name = GENRES[(pk - 1) % len(GENRES)]
+            yield Genre(id=pk, name=f'{name} {pk}', slug=f'genre{pk}')
+
+    def generate_users(self):
+        for pk in range(1, self.users + 1):
+            yield CustomUser(
+                id=pk,
+                username=f'user{pk}',
+                email=f'user{pk}@yamdb.fake',
+                role='moderator' if pk % 100 == 0 else 'user',
+                date_joined=self.start
+            )
+
+    def generate_titles(self):
+        category_weights = list(accumulate(
+            get_zipf_weights(self.categories, 1)
+        ))
+        categories = range(1, self.categories + 1)
+        start = self.start.timestamp()
+        for pk in range(1, self.titles + 1):
+            # Новых произведений больше, чем старых.
+            year = max(
+                self.end.year - int(self.rng.expovariate(1 / 15)), 1900
+            )
+            released = datetime(year, 1, 1, tzinfo=timezone.utc)
+            self.title_dates.append(max(released.timestamp(), start))
+            yield Title(
+                id=pk,
+                name=self.get_text(self.rng.randint(1, 4), MAX_LENGTH_NAME),
+                year=year,
+                description=self.get_text(self.rng.randint(10, 30)),
+                category_id=self.rng.choices(
+                    categories, cum_weights=category_weights
+                )[0]
+            )
+
+    def generate_genre_links(self):
+        weights = get_zipf_weights(self.genres, 1)
+        genres = range(1, self.genres + 1)
+        pk = 0
+        for title_id in range(1, self.titles + 1):
+            linked = set(self.rng.choices(
+                genres, weights, k=self.rng.randint(1, 3)
+            ))
+            for genre_id in sorted(linked):
+                pk += 1
+                yield Title.genre.through(
+                    id=pk, title_id=title_id, genre_id=genre_id
+                )
+
+    def get_review_counts(self):
+        """Число отзывов каждого произведения по закону Ципфа.
+
+        Произведение, у которого отзывы уже написали все пользователи,
+        выбывает, и оставшиеся отзывы распределяются между остальными.
+        """
+        weights = get_zipf_weights(self.titles, self.zipf)
+        # Популярные произведения разбросаны по id.
+        self.rng.shuffle(weights)
+        counts = [0] * self.titles
+        candidates = range(self.titles)
+        remaining = self.reviews
+        while remaining:
+            candidates = [
+                index for index in candidates if counts[index] < self.users
+            ]
+            for index in self.rng.choices(
+                candidates, [weights[index] for index in candidates],
+                k=min(remaining, 100_000)
+            ):
+                if counts[index] < self.users:
+                    counts[index] += 1
+                    remaining -= 1
+        return counts
+
+    def generate_reviews(self):
+        pk = 0
+        end = self.end.timestamp()
+        for index, count in enumerate(self.get_review_counts()):
+            if not count:
+                continue
+            released = self.title_dates[index]
+            quality = self.rng.gauss(6.5, 1.5)
+            for author_id in self.rng.sample(range(1, self.users + 1), count):
+                pk += 1
+                # Плотность отзывов растёт к концу периода.
+                timestamp = released + (
+                    (end - released) * self.rng.random() ** 0.5
+                )
+                self.review_dates.append(timestamp)
+                yield Review(
+                    id=pk,
+                    title_id=index + 1,
+                    author_id=author_id,
+                    text=self.get_text(self.rng.randint(3, 25)),
+                    score=min(max(round(self.rng.gauss(quality, 1.8)), 1), 10),
+                    pub_date=self.get_date(timestamp)
+                )
+
+    def generate_comments(self):
+        end = self.end.timestamp()
+        delay = COMMENT_DELAY.total_seconds()
+        # Отзыв выбирается равновероятно, поэтому комментарии
+        # сосредоточены у популярных произведений вместе с отзывами.
+        for pk in range(1, self.comments + 1):
+            review_id = self.rng.randint(1, self.reviews)
+            timestamp = min(
+                self.review_dates[review_id - 1]
+                + self.rng.expovariate(1 / delay),
+                end
+            )
+            yield Comment(
+                id=pk,
+                review_id=review_id,
+                author_id=self.rng.randint(1, self.users),
+                text=self.get_text(self.rng.randint(2, 15)),
+                pub_date=self.get_date(timestamp)
+            )
+
+    def generate(self):
+        """Пары (модель, объекты) в порядке загрузки `CSVImporter`."""
+        self.rng = random.Random(self.seed)
+        # Даты произведений и отзывов нужны для дат отзывов и комментариев.
+        self.title_dates = array('d')
+        self.review_dates = array('d')
+        yield Category, self.generate_categories()
+        yield Genre, self.generate_genres()
+        yield CustomUser, self.generate_users()
+        yield Title, self.generate_titles()
+        yield Title.genre.through, self.generate_genre_links()
+        yield Review, self.generate_reviews()
+        yield Comment, self.generate_comments()
+
+    def save(self, batch_size=1000):
+        """Добавляет данные в базу пакетными INSERT в одной транзакции.
+
+        Рейтинги, таблица лидеров и поисковый индекс пересчитываются,
+        как после `import_csv`.
+        """
+        results = []
+        with transaction.atomic():
+            for model, objects in self.generate():
+                stats = ImportStats(model)
+                started = monotonic()
+                for batch in batched(objects, batch_size):
+                    model.objects.bulk_create(batch)
+                    stats.rows += len(batch)
+                stats.created = stats.rows
+                stats.seconds = monotonic() - started
+                results.append(stats)
+            # Последовательности id после вставки с явными значениями.
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(
+                    no_style(), list(CSV_FILES)
+                ):
+                    cursor.execute(sql)
+            Title.objects.recalculate_rating()
+        get_search_backend().rebuild(all_documents(Title, Review, Comment))
+        return results
+
+    def write(self, exporter):
+        """Записывает данные в файлы `import_csv` через `DataExporter`."""
+        os.makedirs(exporter.out_dir, exist_ok=True)
+        results = []
+        for model, objects in self.generate():
+            columns = get_export_columns(model)
+            results.append(exporter.write_rows(
+                model, CSV_FILES[model], columns,
+                (
+                    [getattr(obj, column) for column in columns]
+                    for obj in objects
+                )
+            ))
+        return results
@@ -0,0 +1,353 @@
+import csv
+import gzip
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from graphlib import TopologicalSorter
+from itertools import islice
+from time import monotonic
+
+import django
+from django.apps import apps
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.management import CommandError
+from django.db import connection, connections, transaction
+
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleRanking)
+from reviews.search import all_documents, get_search_backend
+from users.models import CustomUser
+
+CSV_FILES = {
+    Category: 'category.csv',
+    Genre: 'genre.csv',
+    CustomUser: 'users.csv',
+    Title: 'titles.csv',
+    Title.genre.through: 'genre_title.csv',
+    Review: 'review.csv',
+    Comment: 'comments.csv'
+}
+# Таблицы, которые строятся по загруженным данным и очищаются вместе с ними.
+DERIVED_MODELS = (TitleRanking,)
+# Секреты, которые `export_data` выгружает только с --with-passwords.
+# Очистка таблицы, файл которой их не содержит, стёрла бы их без возврата.
+SECRET_FIELDS = {CustomUser: ('password', 'confirmation_code')}
+
+
+def get_columns(model, header):
+    """Сопоставляет колонки CSV полям модели.
+
+    Внешний ключ можно указать как по имени поля (`category`), так и по
+    имени колонки в базе (`category_id`).
+    """
+    fields = {}
+    for field in model._meta.concrete_fields:
+        fields[field.name] = fields[field.attname] = field
+    return [fields[name] for name in header]
+
+
+def get_data_path(data_dir, filename):
+    """Путь к файлу данных модели.
+
+    Кроме CSV поддерживаются JSON Lines (`.jsonl`) и сжатые gzip (`.gz`)
+    версии обоих форматов, которые создаёт команда `export_data`.
+    """
+    stem = filename.rsplit('.', 1)[0]
+    for name in (filename, f'{filename}.gz',
+                 f'{stem}.jsonl', f'{stem}.jsonl.gz'):
+        path = os.path.join(data_dir, name)
+        if os.path.exists(path):
+            return path
+    return os.path.join(data_dir, filename)
+
+
+def open_data_file(path, mode='r'):
+    opener = gzip.open if path.endswith('.gz') else open
+    return opener(path, f'{mode}t', encoding='utf-8', newline='')
+
+
+def read_table(path):
+    """Построчно читает файл данных: первым идёт заголовок, затем строки."""
+    with open_data_file(path) as data_file:
+        if '.jsonl' not in path:
+            yield from filter(None, csv.reader(data_file))
+            return
+        header = None
+        for line in filter(str.strip, data_file):
+            record = json.loads(line)
+            if header is None:
+                header = list(record)
+                yield header
+            yield [record.get(name) for name in header]
+
+
+def read_columns(model, path):
+    with closing(read_table(path)) as table:
+        return get_columns(model, next(table))
+
+
+def read_objects(model, path):
+    """Лениво читает объекты модели из файла данных построчно."""
+    table = read_table(path)
+    columns = get_columns(model, next(table))
+    for row in table:
+        yield model(**{
+            field.attname: (
+                None if value in ('', None) and field.null
+                else field.to_python(value)
+            )
+            for field, value in zip(columns, row)
+        })
+
+
+def get_dependency_levels(models):
+    """Разбивает модели на уровни по внешним ключам между ними.
+
+    Модели одного уровня не ссылаются друг на друга и могут загружаться
+    одновременно; каждый следующий уровень зависит только от предыдущих.
+    """
+    sorter = TopologicalSorter({
+        model: {
+            field.related_model for field in model._meta.concrete_fields
+            if field.many_to_one and field.related_model in models
+            and field.related_model is not model
+        }
+        for model in models
+    })
+    sorter.prepare()
+    while sorter.is_active():
+        level = sorter.get_ready()
+        yield level
+        sorter.done(*level)
+
+
+def get_references(models):
+    """Внешние ключи моделей не из `models`, ссылающиеся на `models`."""
+    return [
+        (model, field)
+        for model in apps.get_models(include_auto_created=True)
+        if model not in models
+        for field in model._meta.concrete_fields
+        if field.is_relation and field.related_model in models
+    ]
+
+
+def has_secrets(model, name):
+    """Есть ли в таблице заданные значения секретного поля."""
+    rows = model._base_manager.exclude(
+        **{f'{name}__isnull': True}
+    ).exclude(**{name: ''})
+    if name == 'password':
+        rows = rows.exclude(password__startswith=UNUSABLE_PASSWORD_PREFIX)
+    return rows.exists()
+
+
+def batched(objects, batch_size):
+    objects = iter(objects)
+    while batch := list(islice(objects, batch_size)):
+        yield batch
+
+
+class ImportStats:
+    """Число загруженных строк и затраченное время для одной модели."""
+
+    def __init__(self, model):
+        self.label = model._meta.label
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.seconds = 0.0
+
+    @property
+    def rate(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f'{self.label}: {self.rows} строк '
+            f'(добавлено {self.created}, обновлено {self.updated}) '
+            f'за {self.seconds:.2f} с ({self.rate:.0f} строк/с)'
+        )
+
+
+def setup_worker():
+    django.setup()
+    connections.close_all()
+
+
+def load_in_worker(label, data_dir, filename, batch_size, upsert):
+    """Загружает одну модель в отдельном процессе и транзакции."""
+    model = apps.get_model(label)
+    importer = CSVImporter(data_dir, batch_size, files={model: filename})
+    with transaction.atomic():
+        return importer.load_model(model, filename, upsert)
+
+
+class CSVImporter:
+    """Потоковая загрузка CSV-файлов пакетами ограниченного размера.
+
+    В памяти одновременно находится не больше одного пакета объектов.
+    Порядок загрузки выводится из внешних ключей моделей. По умолчанию
+    таблицы очищаются и все файлы загружаются в одной транзакции; с
+    `per_model=True` каждая модель фиксируется отдельно, а с `workers > 1`
+    независимые модели одного уровня загружаются в отдельных процессах.
+    В режиме `upsert` таблицы не очищаются: строки сопоставляются по `id`,
+    новые добавляются, изменившиеся обновляются.
+    """
+
+    def __init__(self, data_dir, batch_size=1000, files=None,
+                 report=None, report_every=100000):
+        self.data_dir = data_dir
+        self.batch_size = batch_size
+        self.files = files or CSV_FILES
+        self.report = report or (lambda message: None)
+        self.report_every = report_every
+
+    def clear(self):
+        """Очищает таблицы без загрузки удаляемых объектов в память.
+
+        Строки удаляются начиная со ссылающихся таблиц. Таблицы других
+        моделей не затрагиваются: если их строки ссылаются на удаляемые
+        (журнал админки, группы пользователей), очистка прерывается —
+        иначе их пришлось бы удалить каскадом.
+        """
+        models = [*self.files, *DERIVED_MODELS]
+        references = [
+            f'{model._meta.label}.{field.name}'
+            for model, field in get_references(models)
+            if model._base_manager.filter(
+                **{f'{field.name}__isnull': False}
+            ).exists()
+        ]
+        if references:
+            raise CommandError(
+                'Таблицы нельзя очистить: на их строки ссылаются '
+                f'{", ".join(references)}. Удалите эти строки или '
+                'загрузите данные с --upsert.'
+            )
+        with connection.cursor() as cursor:
+            for level in reversed(list(get_dependency_levels(models))):
+                for model in level:
+                    cursor.execute('DELETE FROM {}'.format(
+                        connection.ops.quote_name(model._meta.db_table)
+                    ))
+
+    def check_secrets(self):
+        """Прерывает загрузку с очисткой, если в файле нет колонки секрета
+        (пароля, кода подтверждения), который задан у существующих строк.
+        """
+        lost = [
+            f'{model._meta.label}.{name}'
+            for model, names in SECRET_FIELDS.items() if model in self.files
+            for name in names
+            if name not in {
+                field.name for field in read_columns(
+                    model, get_data_path(self.data_dir, self.files[model])
+                )
+            } and has_secrets(model, name)
+        ]
+        if lost:
+            raise CommandError(
+                'Таблицы нельзя очистить: в файлах нет значений '
+                f'{", ".join(lost)}, и они будут потеряны. Выгрузите данные '
+                'командой export_data --with-passwords или загрузите их '
+                'с --upsert.'
+            )
+
+    def save_batch(self, model, batch, fields, stats):
+        """Добавляет объекты пакета в базу.
+
+        Если переданы `fields`, существующие по `id` объекты не добавляются,
+        а обновляются, и только когда значения этих полей изменились.
+        """
+        if fields is None:
+            model.objects.bulk_create(batch)
+            stats.created += len(batch)
+            return
+        existing = model.objects.in_bulk([obj.pk for obj in batch])
+        created, changed = [], []
+        for obj in batch:
+            current = existing.get(obj.pk)
+            if current is None:
+                created.append(obj)
+            elif any(
+                getattr(obj, field.attname) != getattr(current, field.attname)
+                for field in fields
+            ):
+                changed.append(obj)
+        model.objects.bulk_create(created)
+        if changed:
+            model.objects.bulk_update(
+                changed, [field.name for field in fields]
+            )
+        stats.created += len(created)
+        stats.updated += len(changed)
+
+    def load_model(self, model, filename, upsert=False):
+        stats = ImportStats(model)
+        started = monotonic()
+        reported = 0
+        path = get_data_path(self.data_dir, filename)
+        fields = None
+        if upsert:
+            fields = [
+                field for field in read_columns(model, path)
+                if not field.primary_key
+            ]
+        for batch in batched(read_objects(model, path), self.batch_size):
+            self.save_batch(model, batch, fields, stats)
+            stats.rows += len(batch)
+            if stats.rows - reported >= self.report_every:
+                reported = stats.rows
+                stats.seconds = monotonic() - started
+                self.report(str(stats))
+        stats.seconds = monotonic() - started
+        return stats
+
+    def load_level(self, level, upsert, workers):
+        if workers < 2 or len(level) < 2:
+            for model in level:
+                with transaction.atomic():
+                    yield self.load_model(model, self.files[model], upsert)
+            return
+        connections.close_all()
+        with ProcessPoolExecutor(
+            min(workers, len(level)), initializer=setup_worker
+        ) as executor:
+            futures = [
+                executor.submit(
+                    load_in_worker, model._meta.label, self.data_dir,
+                    self.files[model], self.batch_size, upsert
+                )
+                for model in level
+            ]
+            for future in futures:
+                yield future.result()
+
+    def run(self, per_model=False, upsert=False, workers=1):
+        results = []
+        levels = list(get_dependency_levels(self.files))
+        if not upsert:
+            self.check_secrets()
+        if per_model or workers > 1:
+            if not upsert:
+                with transaction.atomic():
+                    self.clear()
+            for level in levels:
+                for stats in self.load_level(level, upsert, workers):
+                    results.append(stats)
+                    self.report(str(stats))
+        else:
+            with transaction.atomic():
+                if not upsert:
+                    self.clear()
+                for level in levels:
+                    for model in level:
+                        results.append(self.load_model(
+                            model, self.files[model], upsert
+                        ))
+                        self.report(str(results[-1]))
+        Title.objects.recalculate_rating()
+        get_search_backend().rebuild(all_documents(Title, Review, Comment))
+        return results
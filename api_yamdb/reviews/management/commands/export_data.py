@@ -0,0 +1,63 @@
+from time import monotonic
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from reviews.exporter import FORMATS, DataExporter
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает данные в файлы той же структуры, что читает import_csv.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--out-dir',
+            default=f'{settings.BASE_DIR}/export',
+            help='Каталог для файлов выгрузки.'
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default='csv',
+            help='Формат файлов: CSV или JSON Lines.'
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Сжимать файлы gzip.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Количество строк, читаемых из базы за один раз.'
+        )
+        parser.add_argument(
+            '--with-passwords',
+            action='store_true',
+            help=(
+                'Выгружать хеши паролей и коды подтверждения, чтобы '
+                'import_csv восстановил их при загрузке.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        exporter = DataExporter(
+            options['out_dir'],
+            file_format=options['format'],
+            compress=options['gzip'],
+            chunk_size=options['chunk_size'],
+            secrets=options['with_passwords']
+        )
+        started = monotonic()
+        results = exporter.run()
+        for stats in results:
+            self.stdout.write(str(stats))
+        rows = sum(stats.rows for stats in results)
+        seconds = monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные выгружены! {rows} строк за {seconds:.2f} с '
+            f'({rows / seconds if seconds else 0:.0f} строк/с)'
+        ))
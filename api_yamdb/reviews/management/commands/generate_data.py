@@ -0,0 +1,112 @@
+from time import monotonic
+
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from api.signals import reloading_data
+from reviews.exporter import FORMATS, DataExporter
+from reviews.generator import DataGenerator
+from reviews.importer import CSV_FILES, CSVImporter
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетических пользователей, произведения, отзывы и '
+        'комментарии с популярностью по закону Ципфа: в базу или в файлы '
+        'для import_csv.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5000)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=5000)
+        parser.add_argument('--categories', type=int, default=6)
+        parser.add_argument('--genres', type=int, default=18)
+        parser.add_argument(
+            '--zipf',
+            type=float,
+            default=1.1,
+            help='Показатель закона Ципфа: чем больше, тем сильнее отзывы '
+                 'сосредоточены на немногих произведениях.'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=3 * 365,
+            help='За сколько последних дней публикуются отзывы.'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Начальное значение генератора случайных чисел.'
+        )
+        parser.add_argument(
+            '--out-dir',
+            help='Записать файлы для import_csv в каталог вместо базы.'
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default='csv',
+            help='Формат файлов: CSV или JSON Lines.'
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Сжимать файлы gzip.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество строк в одном INSERT.'
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Очистить таблицы, как import_csv, если в базе уже есть '
+                 'данные.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            generator = DataGenerator(
+                users=options['users'],
+                titles=options['titles'],
+                reviews=options['reviews'],
+                comments=options['comments'],
+                categories=options['categories'],
+                genres=options['genres'],
+                zipf=options['zipf'],
+                days=options['days'],
+                seed=options['seed']
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        started = monotonic()
+        if options['out_dir']:
+            results = generator.write(DataExporter(
+                options['out_dir'],
+                file_format=options['format'],
+                compress=options['gzip']
+            ))
+        else:
+            with reloading_data(), transaction.atomic():
+                if options['clear']:
+                    CSVImporter(data_dir=None).clear()
+                elif any(model.objects.exists() for model in CSV_FILES):
+                    raise CommandError(
+                        'В базе уже есть данные: добавьте --clear, чтобы '
+                        'заменить их.'
+                    )
+                results = generator.save(batch_size=options['batch_size'])
+        for stats in results:
+            self.stdout.write(str(stats))
+        rows = sum(stats.rows for stats in results)
+        seconds = monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные созданы! {rows} строк за {seconds:.2f} с '
+            f'({rows / seconds if seconds else 0:.0f} строк/с)'
+        ))
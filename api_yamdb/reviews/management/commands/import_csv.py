@@ -1,32 +1,69 @@
-import csv
+from time import monotonic
+
 from django.conf import settings
 from django.core.management import BaseCommand
 
-from reviews.models import Category, Comment, Genre, Review, Title
-from users.models import CustomUser
-
-
-MODELS: dict = {
-    Category: 'category.csv',
-    Genre: 'genre.csv',
-    CustomUser: 'users.csv',
-    Title: 'titles.csv',
-    Title.genre.through: 'genre_title.csv',
-    Review: 'review.csv',
-    Comment: 'comments.csv'
-}
+from api.signals import reloading_data
+from reviews.importer import CSVImporter
 
 
 class Command(BaseCommand):
+    help = 'Загружает данные из CSV-файлов в базу.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir',
+            default=f'{settings.BASE_DIR}/static/data',
+            help='Каталог с CSV-файлами.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество строк в одном INSERT.'
+        )
+        parser.add_argument(
+            '--per-model',
+            action='store_true',
+            help='Фиксировать каждую модель в отдельной транзакции.'
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help='Не очищать таблицы: добавлять новые и обновлять '
+                 'изменившиеся строки по id.'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Число процессов для одновременной загрузки независимых '
+                 'файлов; больше одного включает --per-model.'
+        )
+        parser.add_argument(
+            '--report-every',
+            type=int,
+            default=100000,
+            help='Сообщать о прогрессе каждые N строк.'
+        )
 
-    def handle(self, *args, **kwargs):
-        for model, csv_f in MODELS.items():
-            model.objects.all().delete()
-            with open(
-                f'{settings.BASE_DIR}/static/data/{csv_f}',
-                'r',
-                    encoding='utf-8') as csv_file:
-                reader = csv.DictReader(csv_file)
-                model.objects.bulk_create(
-                    model(**data) for data in reader)
-        self.stdout.write(self.style.SUCCESS('Данные прогружены!'))
+    def handle(self, *args, **options):
+        importer = CSVImporter(
+            options['data_dir'],
+            batch_size=options['batch_size'],
+            report=self.stdout.write,
+            report_every=options['report_every']
+        )
+        started = monotonic()
+        with reloading_data():
+            results = importer.run(
+                per_model=options['per_model'],
+                upsert=options['upsert'],
+                workers=options['workers']
+            )
+        rows = sum(stats.rows for stats in results)
+        seconds = monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные прогружены! {rows} строк за {seconds:.2f} с '
+            f'({rows / seconds if seconds else 0:.0f} строк/с)'
+        ))
@@ -0,0 +1,15 @@
+from django.core.management import BaseCommand
+
+from reviews.models import Comment, Review, Title
+from reviews.search import all_documents, get_search_backend
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает поисковый индекс произведений, отзывов '
+        'и комментариев.'
+    )
+
+    def handle(self, *args, **kwargs):
+        get_search_backend().rebuild(all_documents(Title, Review, Comment))
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс перестроен'))
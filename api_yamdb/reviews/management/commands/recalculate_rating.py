@@ -0,0 +1,13 @@
+from django.core.management import BaseCommand
+
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинг произведений по всем отзывам.'
+
+    def handle(self, *args, **kwargs):
+        updated = Title.objects.recalculate_rating()
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинг пересчитан, обновлено произведений: {updated}'
+        ))
@@ -0,0 +1,59 @@
+from django.db import migrations
+
+CREATE_INDEX = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS reviews_search USING fts5("
+    "name, body, kind, object_id UNINDEXED, title_id UNINDEXED, "
+    "review_id UNINDEXED, text UNINDEXED, "
+    "tokenize = 'unicode61 remove_diacritics 2')"
+)
+# Документы существующих объектов; rowid — id * 3 + номер типа (title,
+# review, comment). Текст записывается без выделения основ: основа —
+# начало слова, поэтому префиксный запрос поиска находит и эти документы,
+# а `rebuild_search_index` заменяет их на документы текущей версии.
+FILL_INDEX = (
+    "INSERT INTO reviews_search "
+    "(rowid, name, body, kind, object_id, title_id, review_id, text) "
+    "SELECT id * 3, name, COALESCE(description, ''), 'title', id, id, "
+    "NULL, name FROM {title}",
+    "INSERT INTO reviews_search "
+    "(rowid, name, body, kind, object_id, title_id, review_id, text) "
+    "SELECT id * 3 + 1, '', text, 'review', id, title_id, id, text "
+    "FROM {review}",
+    "INSERT INTO reviews_search "
+    "(rowid, name, body, kind, object_id, title_id, review_id, text) "
+    "SELECT comment.id * 3 + 2, '', comment.text, 'comment', comment.id, "
+    "review.title_id, comment.review_id, comment.text "
+    "FROM {comment} comment JOIN {review} review "
+    "ON review.id = comment.review_id",
+)
+
+
+def create_index(apps, schema_editor):
+    """Индекс FTS5 создаётся только в SQLite."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_INDEX)
+    tables = {
+        name: schema_editor.quote_name(
+            apps.get_model('reviews', name)._meta.db_table
+        )
+        for name in ('title', 'review', 'comment')
+    }
+    for sql in FILL_INDEX:
+        schema_editor.execute(sql.format(**tables))
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS reviews_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_title_rating'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 3.2 on 2026-10-18 18:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Параметры и формула таблицы лидеров на момент миграции: последующие
+# изменения в reviews.models не меняют результат миграции.
+PRIOR_MEAN = 5.5
+PRIOR_WEIGHT = 5
+
+
+def bayesian_score(score_sum, reviews_count):
+    return (
+        (PRIOR_MEAN * PRIOR_WEIGHT + score_sum)
+        / (float(PRIOR_WEIGHT) + reviews_count)
+    )
+
+
+def get_decade(year):
+    return year // 10 * 10
+
+
+def fill_rankings(apps, schema_editor):
+    """Строки таблицы лидеров для уже существующих произведений."""
+    Title = apps.get_model('reviews', 'Title')
+    TitleRanking = apps.get_model('reviews', 'TitleRanking')
+    using = schema_editor.connection.alias
+    genres = {}
+    for title_id, genre_id in Title.genre.through.objects.using(
+        using
+    ).values_list('title_id', 'genre_id'):
+        genres.setdefault(title_id, []).append(genre_id)
+    rows = []
+    for title in Title.objects.using(using).iterator():
+        scopes = [(None, None), (None, title.category_id)]
+        scopes.extend((genre_id, None) for genre_id in genres.get(
+            title.pk, ()
+        ))
+        rows.extend(
+            TitleRanking(
+                title_id=title.pk, genre_id=genre_id,
+                category_id=category_id, decade=decade,
+                score=bayesian_score(title.score_sum, title.reviews_count)
+            )
+            for genre_id, category_id in scopes
+            for decade in (None, get_decade(title.year))
+        )
+    TitleRanking.objects.using(using).bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('decade', models.IntegerField(null=True)),
+                ('score', models.FloatField()),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.category')),
+                ('genre', models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.genre')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.title')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+                'verbose_name_plural': 'Таблица лидеров',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['genre', 'category', 'decade', '-score', 'title'], name='title_ranking_top_idx'),
+        ),
+        migrations.RunPython(fill_rankings, migrations.RunPython.noop),
+    ]
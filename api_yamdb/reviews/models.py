@@ -1,14 +1,23 @@
+import threading
+
 from django.db import models
-from django.db.models import Avg
+from django.db.models import (Case, Count, ExpressionWrapper, F, OuterRef,
+                              Subquery, Sum, Value, When)
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
+from django.utils import timezone
 
-from api_yamdb.settings import (MAX_LENGTH_NAME,
+from api_yamdb.settings import (LEADERBOARD_PRIOR_MEAN,
+                                LEADERBOARD_PRIOR_WEIGHT,
+                                MAX_LENGTH_NAME,
                                 MAX_LENGTH_SLAG,
                                 MAX_LENGTH_TEXT)
 from reviews.validators import validate_regular_exp, validate_year
 
 User = get_user_model()
+# Произведения, которые удаляются в текущем потоке (`Title.delete`).
+deleting = threading.local()
 
 
 class Genre(models.Model):
@@ -57,6 +66,86 @@ class Category(models.Model):
         return self.name
 
 
+class TitleQuerySet(models.QuerySet):
+    """Запросы к произведениям с поддержкой денормализованного рейтинга."""
+
+    def with_related(self, fields=None):
+        """Подгружает категорию и жанры вместе с произведениями.
+
+        Если заданы `fields` — имена полей ответа, — загружаются только
+        эти колонки и нужные из связей.
+        """
+        if fields is None:
+            return self.select_related('category').prefetch_related('genre')
+        queryset = self
+        if 'category' in fields:
+            queryset = queryset.select_related('category')
+        if 'genre' in fields:
+            queryset = queryset.prefetch_related('genre')
+        return queryset.only('id', *(
+            field.name for field in Title._meta.concrete_fields
+            if field.name in fields
+        ))
+
+    def update_rating(self, score_delta, count_delta):
+        """Инкрементально обновляет сумму оценок, число отзывов и рейтинг.
+
+        Оценка произведения в таблице лидеров обновляется тем же вызовом.
+        """
+        score_sum = F('score_sum') + score_delta
+        reviews_count = F('reviews_count') + count_delta
+        updated = self.update(
+            score_sum=score_sum,
+            reviews_count=reviews_count,
+            rating=Case(
+                When(reviews_count=-count_delta, then=Value(None)),
+                default=score_sum / reviews_count,
+                output_field=models.IntegerField()
+            )
+        )
+        TitleRanking.objects.filter(
+            title__in=self.values('pk')
+        ).update_score()
+        return updated
+
+    def recalculate_rating(self):
+        """Полностью пересчитывает рейтинг по таблице отзывов."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        self.update(
+            reviews_count=Coalesce(
+                Subquery(reviews.annotate(count=Count('pk')).values('count')),
+                0
+            ),
+            score_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0
+            )
+        )
+        updated = self.update(
+            rating=Case(
+                When(reviews_count=0, then=Value(None)),
+                default=F('score_sum') / F('reviews_count'),
+                output_field=models.IntegerField()
+            )
+        )
+        TitleRanking.objects.rebuild()
+        return updated
+
+
+def bayesian_score(score_sum, reviews_count):
+    """Средняя оценка, сглаженная к априорной: у произведения с парой
+    отзывов она близка к LEADERBOARD_PRIOR_MEAN, а не к крайним оценкам.
+
+    Принимает числа или выражения запроса.
+    """
+    return (
+        (LEADERBOARD_PRIOR_MEAN * LEADERBOARD_PRIOR_WEIGHT + score_sum)
+        / (float(LEADERBOARD_PRIOR_WEIGHT) + reviews_count)
+    )
+
+
 class Title(models.Model):
     """Описание модели произведений, к которым пишут отзывы."""
 
@@ -80,23 +169,55 @@ class Title(models.Model):
     category = models.ForeignKey(
         Category,
         on_delete=models.PROTECT,
-        verbose_name='Slug категории'
+        verbose_name='Slug категории',
+        db_index=False
     )
-    raitng = models.IntegerField(
-        verbose_name='Рейтинг',
+    rating = models.IntegerField(
+        verbose_name='Рейтинг',
         blank=True,
-        null=True
+        null=True,
+        editable=False
+    )
+    reviews_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+        editable=False
     )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        # Фильтры и сортировки списка (api.filters) с id для пагинации.
+        indexes = [
+            models.Index(fields=('category', 'id'), name='title_category_idx'),
+            models.Index(fields=('year', 'id'), name='title_year_idx'),
+            models.Index(fields=('name', 'id'), name='title_name_idx'),
+            models.Index(fields=('rating', 'id'), name='title_rating_idx'),
+            models.Index(
+                fields=('reviews_count', 'id'), name='title_reviews_count_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
-    def rating(self):
-        return self.reviews.aggregate(rating=Avg('score'))['rating'] or None
+    def delete(self, *args, **kwargs):
+        """Отзывы удаляются каскадом вместе с произведением, поэтому
+        сигналы `reviews.signals` не пересчитывают его рейтинг.
+        """
+        titles = deleting.__dict__.setdefault('titles', set())
+        titles.add(self.pk)
+        try:
+            return super().delete(*args, **kwargs)
+        finally:
+            titles.discard(self.pk)
 
 
 class Review(models.Model):
@@ -104,6 +225,7 @@ class Review(models.Model):
         Title,
         on_delete=models.CASCADE,
         related_name='reviews',
+        db_index=False
     )
     text = models.TextField(
         'текст отзыва',
@@ -123,9 +245,11 @@ class Review(models.Model):
         ],
         error_messages={'validators': 'Оценка от 1 до 10!'}
     )
+    # Не `auto_now_add`: дата из файлов `import_csv` сохраняется как есть.
     pub_date = models.DateTimeField(
         'дата публикации',
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         db_index=True
     )
 
@@ -136,6 +260,14 @@ class Review(models.Model):
                 fields=('title', 'author', ),
                 name='Уникальный отзыв'
             )]
+        # Отзывы произведения в порядке публикации, в том числе
+        # курсорная пагинация по (pub_date, id).
+        indexes = [
+            models.Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_idx'
+            ),
+        ]
         ordering = ('pub_date',)
 
     def __str__(self):
@@ -147,7 +279,8 @@ class Comment(models.Model):
         Review,
         on_delete=models.CASCADE,
         related_name='comments',
-        verbose_name='отзыв'
+        verbose_name='отзыв',
+        db_index=False
     )
     text = models.CharField(
         'текст комментария',
@@ -159,11 +292,134 @@ class Comment(models.Model):
         related_name='comments',
         verbose_name='автор'
     )
+    # Не `auto_now_add`: дата из файлов `import_csv` сохраняется как есть.
     pub_date = models.DateTimeField(
         'дата публикации',
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         db_index=True
     )
 
+    class Meta:
+        # Комментарии отзыва по id и, в курсорном режиме, по дате.
+        indexes = [
+            models.Index(fields=('review', 'id'), name='comment_review_idx'),
+            models.Index(
+                fields=('review', 'pub_date', 'id'),
+                name='comment_review_pub_date_idx'
+            ),
+        ]
+
     def __str__(self):
         return self.text
+
+
+class TitleRankingQuerySet(models.QuerySet):
+
+    def update_score(self):
+        """Пересчитывает оценку по сумме оценок и числу отзывов."""
+        return self.update(score=Subquery(
+            Title.objects.filter(pk=OuterRef('title_id')).annotate(
+                score=ExpressionWrapper(
+                    bayesian_score(F('score_sum'), F('reviews_count')),
+                    output_field=models.FloatField()
+                )
+            ).values('score')
+        ))
+
+    def for_title(self, title, genre_ids, base=True):
+        """Строки таблицы лидеров для произведения и его жанров.
+
+        Без `base` — только строки жанров, без всего каталога и категории.
+        """
+        score = bayesian_score(title.score_sum, title.reviews_count)
+        scopes = [(None, None), (None, title.category_id)] if base else []
+        scopes.extend((genre_id, None) for genre_id in genre_ids)
+        return [
+            TitleRanking(
+                title_id=title.pk, genre_id=genre_id,
+                category_id=category_id, decade=decade, score=score
+            )
+            for genre_id, category_id in scopes
+            for decade in (None, get_decade(title.year))
+        ]
+
+    def rebuild(self, batch_size=1000):
+        """Заполняет таблицу лидеров заново по всем произведениям."""
+        genres = {}
+        for title_id, genre_id in Title.genre.through.objects.values_list(
+            'title_id', 'genre_id'
+        ):
+            genres.setdefault(title_id, []).append(genre_id)
+        self.all().delete()
+        rows = []
+        for title in Title.objects.only(
+            'pk', 'year', 'category_id', 'score_sum', 'reviews_count'
+        ).iterator():
+            rows.extend(self.for_title(title, genres.get(title.pk, ())))
+            if len(rows) >= batch_size:
+                self.bulk_create(rows)
+                rows = []
+        self.bulk_create(rows)
+
+    def top(self, genre=None, category=None, decade=None):
+        """Строки среза по убыванию оценки: проход по индексу
+        `title_ranking_top_idx` без сортировки всего каталога.
+        """
+        scope = self.filter(decade=decade)
+        if genre is None:
+            scope = scope.filter(genre__isnull=True)
+        else:
+            scope = scope.filter(genre__slug=genre)
+        if category is None:
+            scope = scope.filter(category__isnull=True)
+        else:
+            scope = scope.filter(category__slug=category)
+        return scope.order_by('-score', 'title_id')
+
+
+def get_decade(year):
+    return year // 10 * 10
+
+
+class TitleRanking(models.Model):
+    """Строка таблицы лидеров: оценка произведения в одном срезе каталога.
+
+    Для произведения хранятся строки для всего каталога, его категории и
+    каждого жанра, а также для тех же срезов внутри десятилетия выхода;
+    `None` в колонке среза означает «любой». Строки обновляются вместе
+    с рейтингом (`TitleQuerySet.update_rating`) и сигналами произведения.
+    """
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='rankings'
+    )
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='+',
+        db_index=False
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='+'
+    )
+    decade = models.IntegerField(null=True)
+    score = models.FloatField()
+
+    objects = TitleRankingQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Таблица лидеров'
+        indexes = [
+            models.Index(
+                fields=('genre', 'category', 'decade', '-score', 'title'),
+                name='title_ranking_top_idx'
+            ),
+        ]
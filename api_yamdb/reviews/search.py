@@ -0,0 +1,242 @@
+from collections import namedtuple
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from reviews.stemmer import WORD, stem, stem_text
+
+# Документ поискового индекса: `name` (название произведения) весит больше
+# `body` (описание произведения, текст отзыва или комментария); `text`
+# возвращается в результатах поиска.
+Document = namedtuple(
+    'Document', 'kind object_id title_id review_id name body text'
+)
+KINDS = ('title', 'review', 'comment')
+
+
+def title_documents(titles):
+    for pk, name, description in titles.values_list(
+        'pk', 'name', 'description'
+    ):
+        yield Document('title', pk, pk, None, name, description, name)
+
+
+def review_documents(reviews):
+    for pk, title_id, text in reviews.values_list('pk', 'title_id', 'text'):
+        yield Document('review', pk, title_id, pk, '', text, text)
+
+
+def comment_documents(comments):
+    for pk, title_id, review_id, text in comments.values_list(
+        'pk', 'review__title_id', 'review_id', 'text'
+    ):
+        yield Document('comment', pk, title_id, review_id, '', text, text)
+
+
+def all_documents(title_model, review_model, comment_model, using=None):
+    """Документы для всех объектов; модели передаются и из миграций."""
+    yield from title_documents(
+        title_model.objects.using(using).order_by('pk')
+    )
+    yield from review_documents(
+        review_model.objects.using(using).order_by('pk')
+    )
+    yield from comment_documents(
+        comment_model.objects.using(using).order_by('pk')
+    )
+
+
+class SearchResults:
+    """Ленивые результаты поиска для `Paginator`: срез выполняет запрос."""
+
+    def __init__(self, count, fetch):
+        self._count = count
+        self._fetch = fetch
+
+    def count(self):
+        if callable(self._count):
+            self._count = self._count()
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, page):
+        return self._fetch(page.start or 0, page.stop - (page.start or 0))
+
+
+class SearchBackend:
+    """Поиск без индекса: все слова запроса ищутся через `icontains`.
+
+    Используется для баз без поддержки полнотекстового поиска; обновлять
+    индекс не нужно, поэтому методы индексации ничего не делают.
+    """
+
+    def index(self, documents):
+        pass
+
+    def remove(self, keys):
+        pass
+
+    def rebuild(self, documents, batch_size=1000):
+        pass
+
+    def search(self, query, kinds=KINDS):
+        from reviews.models import Comment, Review, Title
+
+        words = WORD.findall(query)
+        fields = {
+            'title': (Title, ('name', 'description'), title_documents),
+            'review': (Review, ('text',), review_documents),
+            'comment': (Comment, ('text',), comment_documents),
+        }
+        documents = []
+        for kind in kinds:
+            model, names, to_documents = fields[kind]
+            condition = Q()
+            for word in words:
+                condition &= reduce(or_, (
+                    Q(**{f'{name}__icontains': word}) for name in names
+                ))
+            documents.extend(to_documents(
+                model.objects.filter(condition).order_by('pk')[
+                    :settings.SEARCH_MAX_RESULTS
+                ]
+            ))
+        hits = [
+            self.get_hit(document, None) for document in documents
+        ][:settings.SEARCH_MAX_RESULTS]
+        return SearchResults(
+            len(hits), lambda offset, limit: hits[offset:offset + limit]
+        )
+
+    def get_hit(self, document, rank):
+        return {
+            'type': document.kind,
+            'id': document.object_id,
+            'title_id': document.title_id,
+            'review_id': document.review_id,
+            'text': document.text,
+            'rank': rank,
+        }
+
+
+class FTS5SearchBackend(SearchBackend):
+    """Инвертированный индекс на виртуальной таблице SQLite FTS5.
+
+    В индекс записываются основы слов (`reviews.stemmer`), поэтому запрос
+    «книги» находит «книгой» и «книга». `rowid` документа вычисляется из
+    типа и первичного ключа объекта, поэтому обновление и удаление
+    документа не требуют поиска по индексу. Результаты упорядочены по
+    BM25, совпадения в названии произведения весят больше.
+    """
+
+    table = 'reviews_search'
+    name_weight = 10.0
+
+    def __init__(self, using=None):
+        self.using = using
+
+    def get_connection(self, write=False):
+        from reviews.models import Title
+
+        if self.using:
+            return connections[self.using]
+        if write:
+            return connections[DEFAULT_DB_ALIAS]
+        return connections[router.db_for_read(Title)]
+
+    def get_rowid(self, kind, object_id):
+        return object_id * len(KINDS) + KINDS.index(kind)
+
+    def index(self, documents):
+        rows = [
+            (
+                self.get_rowid(document.kind, document.object_id),
+                stem_text(document.name),
+                stem_text(document.body),
+                document.kind,
+                document.object_id,
+                document.title_id,
+                document.review_id,
+                document.text,
+            )
+            for document in documents
+        ]
+        with self.get_connection(write=True).cursor() as cursor:
+            cursor.executemany(
+                f'INSERT OR REPLACE INTO {self.table} '
+                '(rowid, name, body, kind, object_id, title_id, review_id, '
+                'text) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)',
+                rows
+            )
+
+    def remove(self, keys):
+        """Удаляет документы по парам (тип, первичный ключ)."""
+        with self.get_connection(write=True).cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.table} WHERE rowid = %s',
+                [(self.get_rowid(kind, pk),) for kind, pk in keys]
+            )
+
+    def rebuild(self, documents, batch_size=1000):
+        with self.get_connection(write=True).cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+        batch = []
+        for document in documents:
+            batch.append(document)
+            if len(batch) >= batch_size:
+                self.index(batch)
+                batch = []
+        self.index(batch)
+
+    def get_match(self, query, kinds):
+        terms = ' '.join(
+            f'"{stem(word)}"*' for word in WORD.findall(query)
+        )
+        kinds = ' OR '.join(kinds)
+        return f'{{name body}} : ({terms}) AND kind : ({kinds})'
+
+    def search(self, query, kinds=KINDS):
+        if not WORD.search(query):
+            return SearchResults(0, lambda offset, limit: [])
+        match = self.get_match(query, kinds)
+
+        def count():
+            with self.get_connection().cursor() as cursor:
+                cursor.execute(
+                    f'SELECT count(*) FROM {self.table} '
+                    f'WHERE {self.table} MATCH %s',
+                    [match]
+                )
+                return cursor.fetchone()[0]
+
+        def fetch(offset, limit):
+            with self.get_connection().cursor() as cursor:
+                cursor.execute(
+                    'SELECT kind, object_id, title_id, review_id, text, '
+                    # Совпадение по колонке `kind` не влияет на ранг.
+                    f'bm25({self.table}, %s, 1.0, 0.0) AS rank '
+                    f'FROM {self.table} WHERE {self.table} MATCH %s '
+                    'ORDER BY rank LIMIT %s OFFSET %s',
+                    [self.name_weight, match, limit, offset]
+                )
+                return [
+                    self.get_hit(
+                        Document(kind, object_id, title_id, review_id,
+                                 '', '', text),
+                        round(-rank, 4)
+                    )
+                    for kind, object_id, title_id, review_id, text, rank
+                    in cursor.fetchall()
+                ]
+
+        return SearchResults(count, fetch)
+
+
+def get_search_backend():
+    return import_string(settings.SEARCH_BACKEND)()
@@ -0,0 +1,168 @@
+import threading
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_init,
+                                      post_save)
+from django.dispatch import receiver
+
+from reviews.models import (Comment, Review, Title, TitleRanking, deleting,
+                            get_decade)
+from reviews.search import Document, get_search_backend
+
+# Документ поискового индекса для сохранённого объекта модели.
+SEARCH_DOCUMENTS = {
+    Title: lambda title: Document(
+        'title', title.pk, title.pk, None, title.name, title.description,
+        title.name
+    ),
+    Review: lambda review: Document(
+        'review', review.pk, review.title_id, review.pk, '', review.text,
+        review.text
+    ),
+    Comment: lambda comment: Document(
+        'comment', comment.pk, comment.review.title_id, comment.review_id,
+        '', comment.text, comment.text
+    ),
+}
+SEARCH_KINDS = {Title: 'title', Review: 'review', Comment: 'comment'}
+pending = threading.local()
+
+
+def index_document(sender, instance, **kwargs):
+    """Обновляет документ в той же транзакции, что и объект."""
+    get_search_backend().index([SEARCH_DOCUMENTS[sender](instance)])
+
+
+def schedule_removal(sender, instance, **kwargs):
+    """Откладывает удаление документа до фиксации транзакции.
+
+    При каскадном удалении произведения сигнал приходит для каждого
+    отзыва и комментария: документы удаляются одним запросом.
+    """
+    removals = pending.__dict__.setdefault('removals', {})
+    removals.setdefault(sender, set()).add(instance.pk)
+    transaction.on_commit(flush_removals)
+
+
+def flush_removals():
+    removals = pending.__dict__.pop('removals', None)
+    if not removals:
+        return
+    keys = []
+    for model, ids in removals.items():
+        # После отката транзакции объекты остаются в базе и в индексе.
+        ids -= set(
+            model.objects.using(DEFAULT_DB_ALIAS).filter(
+                pk__in=ids
+            ).values_list('pk', flat=True)
+        )
+        keys.extend((SEARCH_KINDS[model], pk) for pk in ids)
+    get_search_backend().remove(keys)
+
+
+for model in SEARCH_DOCUMENTS:
+    post_save.connect(index_document, sender=model)
+    post_delete.connect(schedule_removal, sender=model)
+
+
+@receiver(post_init, sender=Review)
+def remember_score(sender, instance, **kwargs):
+    instance._loaded_score = instance.__dict__.get('score')
+
+
+@receiver(post_save, sender=Review)
+def add_review_score(sender, instance, created, **kwargs):
+    """Рейтинг произведения следует за оценками отзывов.
+
+    Изменение применяется выражением `F()`, поэтому параллельные отзывы к
+    одному произведению не теряют обновлений. Для изменения оценки
+    отзыв нужно загрузить с блокировкой строки (`select_for_update`),
+    иначе разница считается от устаревшей оценки.
+    """
+    if created:
+        Title.objects.filter(pk=instance.title_id).update_rating(
+            instance.score, 1
+        )
+    elif instance._loaded_score not in (None, instance.score):
+        Title.objects.filter(pk=instance.title_id).update_rating(
+            instance.score - instance._loaded_score, 0
+        )
+    instance._loaded_score = instance.score
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_score(sender, instance, **kwargs):
+    """Срабатывает и при каскадном удалении отзывов вместе с автором.
+
+    Рейтинг удаляемого произведения (`Title.delete`) не пересчитывается.
+    """
+    if instance.title_id in deleting.__dict__.get('titles', ()):
+        return
+    Title.objects.filter(pk=instance.title_id).update_rating(
+        -instance.score, -1
+    )
+
+
+@receiver(post_init, sender=Title)
+def remember_ranking_scope(sender, instance, **kwargs):
+    # Отложенные поля не загружаются: их значение не могло измениться.
+    instance._loaded_ranking_scope = get_ranking_scope(instance)
+
+
+def get_ranking_scope(instance):
+    return {
+        name: instance.__dict__[name] for name in ('category_id', 'year')
+        if name in instance.__dict__
+    }
+
+
+@receiver(post_save, sender=Title)
+def update_title_rankings(sender, instance, created, **kwargs):
+    """Строки таблицы лидеров следуют за категорией и годом выхода."""
+    loaded = instance._loaded_ranking_scope
+    instance._loaded_ranking_scope = get_ranking_scope(instance)
+    if created:
+        TitleRanking.objects.bulk_create(
+            TitleRanking.objects.for_title(instance, ())
+        )
+        return
+    rankings = TitleRanking.objects.filter(title=instance)
+    if loaded.get('category_id', instance.category_id) != (
+        instance.category_id
+    ):
+        rankings.filter(category__isnull=False).update(
+            category=instance.category_id
+        )
+    if loaded.get('year', instance.year) != instance.year:
+        rankings.filter(decade__isnull=False).update(
+            decade=get_decade(instance.year)
+        )
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def update_genre_rankings(sender, instance, action, reverse, pk_set,
+                          **kwargs):
+    if reverse:
+        # `instance` — жанр, `pk_set` — произведения.
+        genre_rankings = TitleRanking.objects.filter(genre=instance)
+        if action == 'post_add':
+            TitleRanking.objects.bulk_create([
+                row for title in Title.objects.filter(pk__in=pk_set)
+                for row in TitleRanking.objects.for_title(
+                    title, (instance.pk,), base=False
+                )
+            ])
+        elif action == 'post_remove':
+            genre_rankings.filter(title__in=pk_set).delete()
+        elif action == 'post_clear':
+            genre_rankings.delete()
+        return
+    title_rankings = TitleRanking.objects.filter(title=instance)
+    if action == 'post_add':
+        TitleRanking.objects.bulk_create(
+            TitleRanking.objects.for_title(instance, pk_set, base=False)
+        )
+    elif action == 'post_remove':
+        title_rankings.filter(genre__in=pk_set).delete()
+    elif action == 'post_clear':
+        title_rankings.filter(genre__isnull=False).delete()
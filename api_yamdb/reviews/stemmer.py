@@ -0,0 +1,66 @@
+import re
+
+# Стеммер Портера (Snowball) для русского языка: окончания отбрасываются
+# только в области RV — после первой гласной слова.
+VOWELS = 'аеиоуыэюя'
+RV = re.compile(f'^(.*?[{VOWELS}])(.*)$')
+PERFECTIVE_GERUND = re.compile(
+    '((ив|ивши|ившись|ыв|ывши|ывшись)|((?<=[ая])(в|вши|вшись)))$'
+)
+REFLEXIVE = re.compile('(с[яь])$')
+ADJECTIVE = re.compile(
+    '(ее|ие|ые|ое|ими|ыми|ей|ий|ый|ой|ем|им|ым|ом|его|ого|ему|ому|их|ых|'
+    'ую|юю|ая|яя|ою|ею)$'
+)
+PARTICIPLE = re.compile('((ивш|ывш|ующ)|((?<=[ая])(ем|нн|вш|ющ|щ)))$')
+VERB = re.compile(
+    '((ила|ыла|ена|ейте|уйте|ите|или|ыли|ей|уй|ил|ыл|им|ым|ен|ило|ыло|ено|'
+    'ят|ует|уют|ит|ыт|ены|ить|ыть|ишь|ую|ю)|'
+    '((?<=[ая])(ла|на|ете|йте|ли|й|л|ем|н|ло|но|ет|ют|ны|ть|ешь|нно)))$'
+)
+NOUN = re.compile(
+    '(а|ев|ов|ие|ье|е|иями|ями|ами|еи|ии|и|ией|ей|ой|ий|й|иям|ям|ием|ем|'
+    'ам|ом|о|у|ах|иях|ях|ы|ь|ию|ью|ю|ия|ья|я)$'
+)
+DERIVATIONAL = re.compile(f'.*[^{VOWELS}]+[{VOWELS}].*ость?$')
+DERIVATIONAL_ENDING = re.compile('ость?$')
+SUPERLATIVE = re.compile('(ейше|ейш)$')
+WORD = re.compile(r'\w+')
+
+
+def remove(pattern, word):
+    return pattern.sub('', word, 1)
+
+
+def stem(word):
+    """Основа русского слова; слова на других языках не изменяются."""
+    word = word.lower().replace('ё', 'е')
+    match = RV.match(word)
+    if match is None:
+        return word
+    prefix, rv = match.groups()
+    stripped = remove(PERFECTIVE_GERUND, rv)
+    if stripped == rv:
+        rv = remove(REFLEXIVE, rv)
+        stripped = remove(ADJECTIVE, rv)
+        if stripped != rv:
+            rv = remove(PARTICIPLE, stripped)
+        else:
+            stripped = remove(VERB, rv)
+            rv = remove(NOUN, rv) if stripped == rv else stripped
+    else:
+        rv = stripped
+    rv = re.sub('и$', '', rv, 1)
+    if DERIVATIONAL.match(rv):
+        rv = remove(DERIVATIONAL_ENDING, rv)
+    stripped = re.sub('ь$', '', rv, 1)
+    if stripped == rv:
+        rv = re.sub('нн$', 'н', remove(SUPERLATIVE, rv), 1)
+    else:
+        rv = stripped
+    return prefix + rv
+
+
+def stem_text(text):
+    """Основы всех слов текста через пробел."""
+    return ' '.join(stem(word) for word in WORD.findall(text or ''))
@@ -1,9 +1,20 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
-from users.models import CustomUser
+from users.models import CustomUser, OutgoingEmail, RevokedToken
 
 UserAdmin.fieldsets += (
     ('Extra Fields', {'fields': ('bio', 'role')}),
 )
 admin.site.register(CustomUser, UserAdmin)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipient', 'status', 'attempts', 'created')
+    list_filter = ('status',)
+
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'user_id', 'created', 'expires_at')
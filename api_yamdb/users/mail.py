@@ -0,0 +1,187 @@
+import logging
+import threading
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connections, transaction
+from django.utils import timezone
+
+from users.models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+
+def queue_mail(subject, message, from_email, recipient_list):
+    """Ставит письма в очередь вместо отправки внутри запроса.
+
+    Письма сохраняются в таблицу `OutgoingEmail` и не теряются при
+    перезапуске; отправка начинается после фиксации транзакции.
+    """
+    OutgoingEmail.objects.bulk_create(
+        OutgoingEmail(
+            recipient=recipient,
+            from_email=from_email,
+            subject=subject,
+            body=message
+        )
+        for recipient in recipient_list
+    )
+    transaction.on_commit(wake_workers)
+
+
+def claim_batch(batch_size):
+    """Захватывает готовые к отправке письма для одного обработчика.
+
+    Метка и аренда на `EMAIL_QUEUE_LEASE` секунд не дают другим потокам
+    и процессам взять те же письма; после падения обработчика письма
+    снова станут доступны по истечении аренды.
+    """
+    now = timezone.now()
+    claim = uuid4().hex
+    due = OutgoingEmail.objects.filter(
+        status=OutgoingEmail.PENDING, next_attempt_at__lte=now
+    ).order_by('next_attempt_at').values_list('pk', flat=True)[:batch_size]
+    claimed = OutgoingEmail.objects.filter(
+        pk__in=list(due),
+        status=OutgoingEmail.PENDING,
+        next_attempt_at__lte=now
+    ).update(
+        claim=claim,
+        next_attempt_at=now + timedelta(seconds=settings.EMAIL_QUEUE_LEASE)
+    )
+    if not claimed:
+        return []
+    return list(OutgoingEmail.objects.filter(claim=claim))
+
+
+def get_retry_delay(attempts):
+    """Экспоненциальная задержка перед повторной попыткой."""
+    return timedelta(seconds=min(
+        settings.EMAIL_QUEUE_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.EMAIL_QUEUE_MAX_RETRY_DELAY
+    ))
+
+
+def record_failure(email, error):
+    """Неудачная попытка: письмо откладывается или помечается
+    неотправленным после `EMAIL_QUEUE_MAX_ATTEMPTS` попыток.
+    """
+    email.attempts += 1
+    email.claim = None
+    email.last_error = repr(error)
+    if email.attempts >= settings.EMAIL_QUEUE_MAX_ATTEMPTS:
+        email.status = OutgoingEmail.FAILED
+    email.next_attempt_at = timezone.now() + get_retry_delay(email.attempts)
+
+
+def send_batch(connection, emails):
+    for email in emails:
+        try:
+            connection.send_messages([EmailMessage(
+                email.subject,
+                email.body,
+                email.from_email,
+                [email.recipient]
+            )])
+        except Exception as error:
+            record_failure(email, error)
+        else:
+            email.attempts += 1
+            email.claim = None
+            email.status = OutgoingEmail.SENT
+            email.sent_at = timezone.now()
+
+
+def deliver_batch(batch_size=None):
+    """Отправляет одну порцию писем через общее SMTP-соединение.
+
+    Если соединение не открылось, неудачной попыткой считается отправка
+    всей порции. Возвращает количество обработанных писем.
+    """
+    emails = claim_batch(batch_size or settings.EMAIL_QUEUE_BATCH_SIZE)
+    if not emails:
+        return 0
+    connection = get_connection()
+    try:
+        try:
+            connection.open()
+        except Exception as error:
+            for email in emails:
+                record_failure(email, error)
+        else:
+            try:
+                send_batch(connection, emails)
+            finally:
+                connection.close()
+    finally:
+        # Письма, до которых не дошла очередь, остаются захваченными до
+        # истечения аренды.
+        OutgoingEmail.objects.bulk_update(
+            emails,
+            ('status', 'attempts', 'claim', 'last_error', 'next_attempt_at',
+             'sent_at')
+        )
+    return len(emails)
+
+
+def deliver_pending(batch_size=None):
+    """Отправляет все готовые письма и возвращает их количество."""
+    total = 0
+    while processed := deliver_batch(batch_size):
+        total += processed
+    return total
+
+
+class MailWorkerPool:
+    """Пул фоновых потоков, отправляющих письма из очереди.
+
+    Потоки запускаются при первой постановке письма в очередь, после чего
+    просыпаются по сигналу или раз в `EMAIL_QUEUE_POLL_INTERVAL` секунд,
+    чтобы подхватить письма для повторной попытки и оставшиеся после
+    перезапуска.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.event = threading.Event()
+        self.threads = []
+
+    def start(self):
+        with self.lock:
+            if self.threads:
+                return
+            for number in range(settings.EMAIL_QUEUE_WORKERS):
+                thread = threading.Thread(
+                    target=self.run,
+                    name=f'mail-worker-{number}',
+                    daemon=True
+                )
+                thread.start()
+                self.threads.append(thread)
+
+    def wake(self):
+        self.start()
+        self.event.set()
+
+    def run(self):
+        while True:
+            self.event.wait(settings.EMAIL_QUEUE_POLL_INTERVAL)
+            self.event.clear()
+            try:
+                deliver_pending()
+            except Exception:
+                logger.exception('Ошибка при отправке писем из очереди')
+            finally:
+                connections.close_all()
+
+
+workers = MailWorkerPool()
+
+
+def wake_workers():
+    if settings.EMAIL_QUEUE_EAGER:
+        deliver_pending()
+    elif settings.EMAIL_QUEUE_WORKERS:
+        workers.wake()
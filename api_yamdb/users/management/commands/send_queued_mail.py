@@ -0,0 +1,20 @@
+from django.core.management import BaseCommand
+
+from users.mail import deliver_pending
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма, ожидающие в очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Количество писем, отправляемых через одно соединение.'
+        )
+
+    def handle(self, *args, **options):
+        processed = deliver_pending(options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Обработано писем: {processed}')
+        )
@@ -0,0 +1,29 @@
+# Generated by Django 3.2 on 2026-10-18 18:16
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_outgoingemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(blank=True, max_length=255, verbose_name='Идентификатор токена')),
+                ('user_id', models.PositiveIntegerField(db_index=True, verbose_name='Пользователь')),
+                ('created', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Отозван')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Истекает')),
+            ],
+            options={
+                'verbose_name': 'Отозванный токен',
+                'verbose_name_plural': 'Отозванные токены',
+                'ordering': ('id',),
+            },
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxLengthValidator, RegexValidator
+from django.utils import timezone
 
 from api_yamdb.settings import (
     EMAIL_ML,
@@ -77,3 +78,75 @@ class CustomUser(AbstractUser):
     @property
     def is_moder(self):
         return self.role == self.USER_ROLES[1][0]
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку."""
+
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не отправлено'),
+    )
+
+    recipient = models.EmailField('Получатель', max_length=EMAIL_ML)
+    from_email = models.EmailField('Отправитель', max_length=EMAIL_ML)
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    status = models.CharField(
+        'Статус',
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка',
+        default=timezone.now
+    )
+    claim = models.CharField(
+        'Метка обработчика',
+        max_length=32,
+        blank=True,
+        null=True
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('id',)
+        indexes = [
+            models.Index(
+                fields=('status', 'next_attempt_at'),
+                name='outgoing_email_due'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.subject} → {self.recipient}'
+
+
+class RevokedToken(models.Model):
+    """Отозванный токен доступа.
+
+    Пустой `jti` отзывает все токены пользователя, выданные до `created`.
+    """
+
+    jti = models.CharField('Идентификатор токена', max_length=255, blank=True)
+    user_id = models.PositiveIntegerField('Пользователь', db_index=True)
+    created = models.DateTimeField('Отозван', default=timezone.now)
+    expires_at = models.DateTimeField('Истекает', db_index=True)
+
+    class Meta:
+        verbose_name = 'Отозванный токен'
+        verbose_name_plural = 'Отозванные токены'
+        ordering = ('id',)
+
+    def __str__(self):
+        return self.jti or f'Все токены пользователя {self.user_id}'
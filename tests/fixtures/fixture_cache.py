@@ -0,0 +1,10 @@
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+
+
+@pytest.fixture(autouse=True)
+def clear_api_cache():
+    caches[settings.API_CACHE_ALIAS].clear()
+    yield
+    caches[settings.API_CACHE_ALIAS].clear()
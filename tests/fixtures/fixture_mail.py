@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def eager_mail_queue(settings):
+    """Письма из очереди отправляются сразу, без фоновых потоков."""
+    settings.EMAIL_QUEUE_EAGER = True
+    settings.EMAIL_QUEUE_WORKERS = 0
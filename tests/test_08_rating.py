@@ -0,0 +1,100 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json().get('rating')
+
+    def test_01_rating_follows_review_changes(self, admin_client, admin,
+                                              user, user_client):
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения обновляется при создании '
+            'отзыва.'
+        )
+
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 10}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(admin_client, title_id) == 7, (
+            'Проверьте, что рейтинг произведения обновляется при изменении '
+            'оценки в отзыве.'
+        )
+
+        for review in reviews:
+            response = admin_client.delete(
+                self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                    title_id=title_id, review_id=review['id']
+                )
+            )
+            assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(admin_client, title_id) is None, (
+            'Проверьте, что после удаления всех отзывов рейтинг произведения '
+            'равен `None`.'
+        )
+
+    def test_02_recalculate_rating_command(self, admin_client, admin, user,
+                                           user_client):
+        from reviews.models import Title
+
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+        Title.objects.update(rating=None, reviews_count=0, score_sum=0)
+
+        call_command('recalculate_rating')
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating, title.reviews_count, title.score_sum) == (
+            5, 2, 10
+        ), (
+            'Проверьте, что команда `recalculate_rating` пересчитывает '
+            'рейтинг произведений по отзывам.'
+        )
+
+    def test_03_rating_follows_cascade_deletes(self, admin_client, admin,
+                                               user, user_client):
+        from reviews.models import Review, Title
+
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        title = Title.objects.get(pk=title_id)
+        assert (title.reviews_count, title.score_sum) == (
+            1, Review.objects.get(title_id=title_id).score
+        ), (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзывов вместе с автором.'
+        )
+
+        Review.objects.filter(title_id=title_id).delete()
+        title.refresh_from_db()
+        assert (title.rating, title.reviews_count, title.score_sum) == (
+            None, 0, 0
+        ), (
+            'Проверьте, что рейтинг пересчитывается при удалении отзывов '
+            'запросом к базе.'
+        )
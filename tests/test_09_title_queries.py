@@ -0,0 +1,45 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    LIST_QUERIES = 3
+    DETAIL_QUERIES = 2
+
+    def create_many_titles(self, admin_client, count):
+        from reviews.models import Category, Genre, Title
+
+        create_titles(admin_client)
+        category = Category.objects.first()
+        genres = list(Genre.objects.all())
+        for idx in range(count):
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=2000, category=category
+            )
+            title.genre.set(genres)
+
+    @pytest.mark.parametrize('limit', (1, 5, 20))
+    def test_01_titles_list_queries(self, client, admin_client,
+                                    django_assert_num_queries, limit):
+        self.create_many_titles(admin_client, 20)
+        with django_assert_num_queries(self.LIST_QUERIES):
+            response = client.get(self.TITLES_URL, {'limit': limit})
+        assert len(response.json()['results']) == limit, (
+            f'Проверьте, что для эндпоинта `{self.TITLES_URL}` настроена '
+            'пагинация с параметром `limit`.'
+        )
+
+    def test_02_title_detail_queries(self, client, admin_client,
+                                     django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        with django_assert_num_queries(self.DETAIL_QUERIES):
+            client.get(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(
+                    title_id=titles[0]['id']
+                )
+            )
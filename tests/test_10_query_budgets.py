@@ -0,0 +1,224 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+LIST_SIZES = (1, 5, 12)
+ACTION_METHODS = {
+    'list': 'get',
+    'retrieve': 'get',
+    'create': 'post',
+    'update': 'patch',
+    'delete': 'delete',
+}
+EXPECTED_STATUS = {
+    'list': HTTPStatus.OK,
+    'retrieve': HTTPStatus.OK,
+    'create': HTTPStatus.CREATED,
+    'update': HTTPStatus.OK,
+    'delete': HTTPStatus.NO_CONTENT,
+}
+
+
+@pytest.fixture
+def catalog(admin, token_admin, django_user_model, request):
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from api.authentication import is_revoked
+    from reviews.models import Category, Comment, Genre, Review, Title
+
+    size = getattr(request, 'param', LIST_SIZES[-1])
+    categories = [
+        Category.objects.create(name=f'Категория {idx}', slug=f'cat{idx}')
+        for idx in range(size)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {idx}', slug=f'genre{idx}')
+        for idx in range(size)
+    ]
+    titles = []
+    for idx in range(size):
+        title = Title.objects.create(
+            name=f'Произведение {idx}', year=2000, category=categories[0]
+        )
+        title.genre.set(genres)
+        titles.append(title)
+    authors = [admin] + [
+        django_user_model.objects.create_user(
+            username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+        )
+        for idx in range(size)
+    ]
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=author, text='Отзыв', score=5
+        )
+        for author in authors
+    ]
+    for author in authors:
+        Comment.objects.create(
+            review=reviews[0], author=author, text='Комментарий'
+        )
+    Title.objects.recalculate_rating()
+    admin.confirmation_code = 'code'
+    admin.save()
+    # Проверка отзыва токена кэшируется с первого запроса и в бюджет не
+    # входит.
+    is_revoked(AccessToken(token_admin['access']))
+    return {
+        'size': size,
+        'title': titles[0],
+        'review': reviews[0],
+        'comment': reviews[0].comments.first(),
+        'category': categories[0],
+        'empty_category': Category.objects.create(
+            name='Пустая категория', slug='empty'
+        ),
+        'genre': genres[0],
+        'user': authors[-1],
+    }
+
+
+def route_requests(catalog):
+    """Адрес списка, адрес объекта и данные запросов для каждого маршрута.
+
+    Для маршрутов авторизации адреса объекта нет: они принимают только POST.
+    """
+    title = catalog['title']
+    review = catalog['review']
+    reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+    comments_url = f'{reviews_url}{review.id}/comments/'
+    return {
+        'signup': (
+            '/api/v1/auth/signup/',
+            None,
+            {'username': 'newmember', 'email': 'newmember@yamdb.fake'},
+        ),
+        'token': (
+            '/api/v1/auth/token/',
+            None,
+            {'username': 'TestAdmin', 'confirmation_code': 'code'},
+        ),
+        'user': (
+            '/api/v1/users/',
+            f'/api/v1/users/{catalog["user"].username}/',
+            {'username': 'newuser', 'email': 'newuser@yamdb.fake'},
+        ),
+        'category': (
+            '/api/v1/categories/',
+            f'/api/v1/categories/{catalog["empty_category"].slug}/',
+            {'name': 'Новая категория', 'slug': 'newcat'},
+        ),
+        'genre': (
+            '/api/v1/genres/',
+            f'/api/v1/genres/{catalog["genre"].slug}/',
+            {'name': 'Новый жанр', 'slug': 'newgenre'},
+        ),
+        'title': (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title.id}/',
+            {
+                'name': 'Новое произведение',
+                'year': 2001,
+                'genre': [catalog['genre'].slug],
+                'category': catalog['category'].slug,
+            },
+        ),
+        'reviews': (
+            reviews_url,
+            f'{reviews_url}{review.id}/',
+            {'text': 'Новый отзыв', 'score': 7},
+        ),
+        'comments': (
+            comments_url,
+            f'{comments_url}{catalog["comment"].id}/',
+            {'text': 'Новый комментарий'},
+        ),
+    }
+
+
+def budget_cases():
+    from api.urls import QUERY_BUDGETS
+
+    return [
+        (basename, action)
+        for basename, budget in QUERY_BUDGETS.items()
+        for action in budget
+    ]
+
+
+def test_budgets_cover_all_routes():
+    from api.urls import QUERY_BUDGETS, router_v1
+
+    for _, viewset, basename in router_v1.registry:
+        assert basename in QUERY_BUDGETS, (
+            f'Для маршрута `{basename}` не задан бюджет SQL-запросов.'
+        )
+        actions = {
+            action for action in ACTION_METHODS
+            if action != 'delete' and hasattr(viewset, action)
+        }
+        if hasattr(viewset, 'destroy'):
+            actions.add('delete')
+        if hasattr(viewset, 'partial_update'):
+            actions.add('update')
+        assert actions <= set(QUERY_BUDGETS[basename]), (
+            f'Для маршрута `{basename}` бюджет SQL-запросов задан не для '
+            f'всех действий: {sorted(actions)}.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('catalog', LIST_SIZES, indirect=True)
+@pytest.mark.parametrize('basename', (
+    'user', 'category', 'genre', 'title', 'reviews', 'comments'
+))
+def test_list_query_budget(basename, catalog, admin_client):
+    from api.urls import QUERY_BUDGETS
+
+    list_url, _, _ = route_requests(catalog)[basename]
+    budget = QUERY_BUDGETS[basename]['list']
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(list_url, {'limit': catalog['size']})
+    assert response.status_code == HTTPStatus.OK
+    assert len(queries) <= budget, (
+        f'GET-запрос к `{list_url}` при размере страницы {catalog["size"]} '
+        f'выполняет {len(queries)} SQL-запросов при бюджете {budget}.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('basename,action', [
+    case for case in budget_cases() if case[1] != 'list'
+])
+def test_detail_query_budget(basename, action, catalog, admin_client,
+                             settings):
+    from api.urls import QUERY_BUDGETS
+
+    # Письма только ставятся в очередь: отправка не входит в бюджет запроса.
+    settings.EMAIL_QUEUE_EAGER = False
+
+    list_url, detail_url, data = route_requests(catalog)[basename]
+    url = list_url if action == 'create' else detail_url
+    budget = QUERY_BUDGETS[basename][action]
+    method = getattr(admin_client, ACTION_METHODS[action])
+    if action in ('create', 'update'):
+        request_kwargs = {'data': data, 'format': 'json'}
+    else:
+        request_kwargs = {}
+    if basename == 'reviews' and action == 'create':
+        catalog['review'].delete()
+    with CaptureQueriesContext(connection) as queries:
+        response = method(url, **request_kwargs)
+    expected_status = EXPECTED_STATUS[action]
+    if detail_url is None:
+        expected_status = HTTPStatus.OK
+    assert response.status_code == expected_status, (
+        f'{ACTION_METHODS[action].upper()}-запрос к `{url}` должен вернуть '
+        f'ответ со статусом {expected_status}.'
+    )
+    assert len(queries) <= budget, (
+        f'{ACTION_METHODS[action].upper()}-запрос к `{url}` выполняет '
+        f'{len(queries)} SQL-запросов при бюджете {budget}.'
+    )
@@ -0,0 +1,57 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_categories, create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ResponseCache:
+
+    CATEGORIES_URL = '/api/v1/categories/'
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def test_01_cached_list_skips_database(self, client, admin_client,
+                                           django_assert_num_queries):
+        create_categories(admin_client)
+        first = client.get(self.CATEGORIES_URL, {'limit': 1})
+        with django_assert_num_queries(0):
+            second = client.get(self.CATEGORIES_URL, {'limit': 1})
+        assert second.json() == first.json(), (
+            f'Проверьте, что повторный GET-запрос к `{self.CATEGORIES_URL}` '
+            'возвращает тот же ответ из кэша.'
+        )
+        other_page = client.get(self.CATEGORIES_URL, {'limit': 2})
+        assert len(other_page.json()['results']) == 2, (
+            'Проверьте, что параметры пагинации входят в ключ кэша.'
+        )
+
+    def test_02_cache_invalidated_on_write(self, client, admin_client):
+        create_categories(admin_client)
+        assert client.get(self.CATEGORIES_URL).json()['count'] == 2
+
+        response = admin_client.post(
+            self.CATEGORIES_URL, data={'name': 'Музыка', 'slug': 'music'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert client.get(self.CATEGORIES_URL).json()['count'] == 3, (
+            'Проверьте, что кэш списка категорий сбрасывается после '
+            'создания категории.'
+        )
+
+    def test_03_title_cache_invalidated_by_review(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        assert client.get(url).json()['rating'] is None
+
+        create_single_review(admin_client, titles[0]['id'], 'Отзыв', 8)
+        assert client.get(url).json()['rating'] == 8, (
+            'Проверьте, что кэш произведения сбрасывается после добавления '
+            'отзыва.'
+        )
+        results = client.get(self.TITLES_URL).json()['results']
+        assert results[0]['rating'] == 8, (
+            'Проверьте, что кэш списка произведений сбрасывается после '
+            'добавления отзыва.'
+        )
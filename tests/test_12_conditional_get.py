@@ -0,0 +1,113 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments, create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ConditionalGet:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def test_01_reviews_not_modified(self, client, admin_client, admin,
+                                     user, user_client,
+                                     django_assert_num_queries):
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+
+        response = client.get(url)
+        etag = response.get('ETag')
+        assert etag, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовок `ETag`.'
+        )
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[1]['id']
+            ),
+            data={'text': 'Новый текст'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения отзыва ETag списка отзывов '
+            'меняется.'
+        )
+        assert response.get('ETag') != etag
+
+    def test_02_comments_follow_username_changes(self, client, admin_client,
+                                                 admin, user, user_client):
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        etag = client.get(url).get('ETag')
+
+        user.bio = 'Новая биография'
+        user.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что изменения пользователя, не влияющие на ответ, '
+            'не меняют ETag комментариев.'
+        )
+
+        user.username = 'RenamedUser'
+        user.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что смена имени автора меняет ETag комментариев.'
+        )
+
+    def test_03_versions_expire_in_other_workers(self, client, admin_client,
+                                                 admin, user, user_client,
+                                                 settings, monkeypatch):
+        from time import sleep
+
+        from django.core.cache.backends.locmem import LocMemCache
+
+        from api import cache
+
+        # Кэш в памяти процесса у каждого воркера свой.
+        workers = [LocMemCache(f'worker{number}', {}) for number in (1, 2)]
+        current = [workers[0]]
+        monkeypatch.setattr(cache, 'get_cache', lambda: current[0])
+        settings.API_CACHE_TIMEOUT = 1
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        etag = client.get(url).get('ETag')
+
+        current[0] = workers[1]
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[1]['id']
+            ),
+            data={'text': 'Новый текст'}
+        )
+        assert response.status_code == HTTPStatus.OK
+
+        current[0] = workers[0]
+        sleep(1.1)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что версии кэша живут не дольше '
+            '`API_CACHE_TIMEOUT` и воркер, не обработавший изменение, '
+            'перестаёт отдавать 304 на устаревшие данные.'
+        )
+        assert 'Новый текст' in response.content.decode()
@@ -0,0 +1,75 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13CursorPagination:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def create_reviews(self, title_id, django_user_model, count, start=0):
+        from reviews.models import Review
+
+        return [
+            Review.objects.create(
+                title_id=title_id,
+                author=django_user_model.objects.create_user(
+                    username=f'reader{idx}', email=f'reader{idx}@yamdb.fake'
+                ),
+                text=f'Отзыв {idx}',
+                score=5
+            )
+            for idx in range(start, start + count)
+        ]
+
+    def test_01_cursor_walk_is_stable(self, client, admin_client,
+                                      django_user_model):
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        self.create_reviews(title_id, django_user_model, 7)
+        first = Review.objects.order_by('id').first()
+        Review.objects.update(pub_date=first.pub_date)
+
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        response = client.get(url, {'pagination': 'cursor', 'page_size': 3})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что курсорная пагинация не считает общее число '
+            'отзывов.'
+        )
+        seen = [review['id'] for review in data['results']]
+        self.create_reviews(title_id, django_user_model, 1, start=7)
+
+        while data['next']:
+            with CaptureQueriesContext(connection) as queries:
+                data = client.get(data['next']).json()
+            assert not any(
+                'COUNT(' in query['sql'] for query in queries
+            ), 'Курсорная пагинация не должна выполнять COUNT(*).'
+            seen.extend(review['id'] for review in data['results'])
+
+        assert seen == sorted(seen), (
+            'Проверьте, что при одинаковой дате публикации отзывы '
+            'упорядочены по id.'
+        )
+        assert len(seen) == len(set(seen)) == 8, (
+            'Проверьте, что курсорная пагинация не пропускает и не повторяет '
+            'отзывы при добавлении новых во время обхода.'
+        )
+
+    def test_02_invalid_cursor(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        response = client.get(url, {'pagination': 'cursor', 'cursor': '%%%'})
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что неверный курсор приводит к ответу со статусом '
+            '404.'
+        )
@@ -0,0 +1,177 @@
+import shutil
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError
+
+from tests.conftest import MANAGE_PATH
+
+DATA_DIR = f'{MANAGE_PATH}/static/data'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ImportCSV:
+
+    def test_01_import_in_batches(self):
+        from reviews.models import Comment, Review, Title
+
+        out = StringIO()
+        call_command('import_csv', batch_size=7, stdout=out)
+
+        assert Title.objects.count() == 32
+        assert Title.genre.through.objects.count() == 42
+        assert Comment.objects.count() == 3
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что при импорте сохраняется дата публикации из файла.'
+        )
+        title = Title.objects.get(pk=review.title_id)
+        assert title.reviews_count == title.reviews.count(), (
+            'Проверьте, что после импорта пересчитывается рейтинг.'
+        )
+        assert 'строк/с' in out.getvalue(), (
+            'Проверьте, что команда выводит статистику скорости загрузки.'
+        )
+
+    def test_02_failed_import_is_rolled_back(self, tmp_path):
+        from reviews.models import Title
+
+        call_command('import_csv', stdout=StringIO())
+        data_dir = tmp_path / 'data'
+        shutil.copytree(DATA_DIR, data_dir)
+        with open(data_dir / 'review.csv', 'a', encoding='utf-8') as file:
+            file.write('\n100000,100000,Битый отзыв,100,5,2020-01-01T00:00Z\n')
+
+        with pytest.raises(IntegrityError):
+            call_command(
+                'import_csv', data_dir=str(data_dir), stdout=StringIO()
+            )
+        assert Title.objects.count() == 32, (
+            'Проверьте, что при ошибке импорта в одной транзакции данные '
+            'в базе остаются прежними.'
+        )
+
+    def test_03_dependency_levels(self):
+        from reviews.importer import CSV_FILES, get_dependency_levels
+        from reviews.models import Category, Comment, Genre, Review, Title
+        from users.models import CustomUser
+
+        levels = [set(level) for level in get_dependency_levels(CSV_FILES)]
+        assert levels == [
+            {Category, Genre, CustomUser},
+            {Title},
+            {Title.genre.through, Review},
+            {Comment},
+        ], (
+            'Проверьте, что порядок загрузки выводится из внешних ключей '
+            'моделей.'
+        )
+
+    def test_04_upsert_keeps_existing_rows(self, tmp_path):
+        from reviews.models import Category, Title
+
+        call_command('import_csv', stdout=StringIO())
+        data_dir = tmp_path / 'data'
+        shutil.copytree(DATA_DIR, data_dir)
+        with open(data_dir / 'category.csv', 'w', encoding='utf-8') as file:
+            file.write('id,name,slug\n1,Кино,movie\n7,Игры,games\n')
+
+        out = StringIO()
+        call_command(
+            'import_csv', data_dir=str(data_dir), upsert=True, stdout=out
+        )
+        assert Category.objects.get(pk=1).name == 'Кино', (
+            'Проверьте, что в режиме `--upsert` изменившиеся строки '
+            'обновляются.'
+        )
+        assert Category.objects.filter(pk=7).exists()
+        assert Category.objects.filter(pk=2).exists(), (
+            'Проверьте, что в режиме `--upsert` таблицы не очищаются.'
+        )
+        assert Title.objects.count() == 32
+        assert 'добавлено 0, обновлено 0' in out.getvalue(), (
+            'Проверьте, что в режиме `--upsert` неизменные строки не '
+            'перезаписываются.'
+        )
+
+    def test_05_import_resets_caches(self, tmp_path):
+        import csv
+
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from users.models import CustomUser
+
+        call_command('import_csv', stdout=StringIO())
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Bearer {}'.format(
+            AccessToken.for_user(CustomUser.objects.get(pk=101))
+        ))
+        assert client.get('/api/v1/users/').status_code == 200
+        url = '/api/v1/titles/1/reviews/'
+        etag = client.get(url)['ETag']
+
+        data_dir = tmp_path / 'data'
+        shutil.copytree(DATA_DIR, data_dir)
+        for name, column, value in (
+            ('users.csv', 'role', 'user'), ('review.csv', 'text', 'Новый')
+        ):
+            with open(data_dir / name, encoding='utf-8') as file:
+                rows = list(csv.DictReader(file))
+            rows[0 if name == 'review.csv' else 1][column] = value
+            with open(data_dir / name, 'w', encoding='utf-8') as file:
+                writer = csv.DictWriter(file, rows[0].keys())
+                writer.writeheader()
+                writer.writerows(rows)
+        call_command(
+            'import_csv', data_dir=str(data_dir), upsert=True,
+            stdout=StringIO()
+        )
+        assert client.get('/api/v1/users/').status_code == 403, (
+            'Проверьте, что после импорта сбрасывается кэш прав '
+            'пользователей.'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что после импорта меняются ETag всех ответов.'
+        )
+        assert response.json()['results'][0]['text'] == 'Новый'
+
+    def test_06_clear_keeps_other_tables(self):
+        from datetime import timedelta
+
+        from django.contrib.admin.models import ADDITION, LogEntry
+        from django.core.management import CommandError
+        from django.utils import timezone
+
+        from reviews.models import Title
+        from users.models import CustomUser, OutgoingEmail, RevokedToken
+
+        call_command('import_csv', stdout=StringIO())
+        RevokedToken.objects.create(
+            jti='revoked', user_id=100,
+            expires_at=timezone.now() + timedelta(days=1)
+        )
+        OutgoingEmail.objects.create(
+            recipient='a@yamdb.fake', from_email='b@yamdb.fake',
+            subject='Тема', body='Текст'
+        )
+        call_command('import_csv', stdout=StringIO())
+        assert (
+            RevokedToken.objects.exists() and OutgoingEmail.objects.exists()
+        ), (
+            'Проверьте, что импорт не очищает таблицы, которые не загружает.'
+        )
+
+        LogEntry.objects.create(
+            user=CustomUser.objects.get(pk=101), action_flag=ADDITION,
+            object_repr='Произведение'
+        )
+        Title.objects.filter(pk=1).update(name='Изменено')
+        with pytest.raises(CommandError, match='admin.LogEntry.user'):
+            call_command('import_csv', stdout=StringIO())
+        assert Title.objects.get(pk=1).name == 'Изменено', (
+            'Проверьте, что импорт не удаляет строки, на которые ссылаются '
+            'другие таблицы.'
+        )
@@ -0,0 +1,72 @@
+import gzip
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15ExportData:
+
+    @pytest.mark.parametrize('file_format', ('csv', 'jsonl'))
+    def test_01_export_round_trip(self, tmp_path, file_format):
+        from reviews.models import Comment, Review, Title
+
+        call_command('import_csv', stdout=StringIO())
+        reviews = list(
+            Review.objects.order_by('pk').values_list('pk', 'text', 'pub_date')
+        )
+
+        call_command(
+            'export_data', out_dir=str(tmp_path), format=file_format,
+            gzip=True, stdout=StringIO()
+        )
+        with gzip.open(tmp_path / f'users.{file_format}.gz', 'rt') as file:
+            assert 'password' not in file.read(), (
+                'Проверьте, что при выгрузке не сохраняются пароли.'
+            )
+
+        call_command('import_csv', data_dir=str(tmp_path), stdout=StringIO())
+        assert list(
+            Review.objects.order_by('pk').values_list('pk', 'text', 'pub_date')
+        ) == reviews, (
+            'Проверьте, что выгруженные данные загружаются командой '
+            '`import_csv` без изменений.'
+        )
+        assert Title.objects.count() == 32
+        assert Title.genre.through.objects.count() == 42
+        assert Comment.objects.count() == 3
+
+    def test_02_round_trip_keeps_passwords(self, tmp_path):
+        from django.core.management import CommandError
+
+        from users.models import CustomUser
+
+        call_command('import_csv', stdout=StringIO())
+        user = CustomUser.objects.order_by('pk').first()
+        user.set_password('s3cret-pass')
+        user.confirmation_code = 'code-123'
+        user.save()
+
+        call_command('export_data', out_dir=str(tmp_path), stdout=StringIO())
+        with pytest.raises(CommandError):
+            call_command(
+                'import_csv', data_dir=str(tmp_path), stdout=StringIO()
+            )
+        user.refresh_from_db()
+        assert user.check_password('s3cret-pass'), (
+            'Проверьте, что загрузка выгрузки без паролей с очисткой таблиц '
+            'прерывается и не стирает пароли пользователей.'
+        )
+
+        call_command(
+            'export_data', out_dir=str(tmp_path), with_passwords=True,
+            stdout=StringIO()
+        )
+        call_command('import_csv', data_dir=str(tmp_path), stdout=StringIO())
+        user.refresh_from_db()
+        assert user.check_password('s3cret-pass'), (
+            'Проверьте, что `export_data --with-passwords` сохраняет хеши '
+            'паролей и они восстанавливаются при загрузке.'
+        )
+        assert user.confirmation_code == 'code-123'
@@ -0,0 +1,152 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+
+class FailingBackend(BaseEmailBackend):
+
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP-сервер недоступен')
+
+
+class UnreachableBackend(BaseEmailBackend):
+
+    def open(self):
+        raise ConnectionRefusedError('SMTP-сервер недоступен')
+
+    def send_messages(self, email_messages):
+        return len(email_messages)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16MailQueue:
+
+    SIGNUP_URL = '/api/v1/auth/signup/'
+    FAILING_BACKEND = 'tests.test_16_mail_queue.FailingBackend'
+    UNREACHABLE_BACKEND = 'tests.test_16_mail_queue.UnreachableBackend'
+    LOCMEM_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+    def test_01_signup_queues_mail(self, client, settings):
+        from users.models import OutgoingEmail
+
+        settings.EMAIL_QUEUE_EAGER = False
+        response = client.post(self.SIGNUP_URL, data={
+            'username': 'newmember', 'email': 'newmember@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что письмо не отправляется во время запроса.'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.recipient == 'newmember@yamdb.fake'
+        assert email.status == OutgoingEmail.PENDING
+
+        out = StringIO()
+        call_command('send_queued_mail', stdout=out)
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что команда `send_queued_mail` отправляет письма '
+            'из очереди.'
+        )
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.SENT
+        assert email.sent_at is not None
+        assert 'Обработано писем: 1' in out.getvalue()
+
+    def test_02_batches_share_connection(self, settings):
+        from users.mail import deliver_pending, queue_mail
+        from users.models import OutgoingEmail
+
+        settings.EMAIL_QUEUE_EAGER = False
+        queue_mail(
+            'Тема', 'Текст', 'from@yamdb.fake',
+            [f'user{idx}@yamdb.fake' for idx in range(5)]
+        )
+        assert deliver_pending(batch_size=2) == 5
+        assert len(mail.outbox) == 5
+        assert not OutgoingEmail.objects.exclude(
+            status=OutgoingEmail.SENT
+        ).exists(), 'Проверьте, что отправляются все письма из очереди.'
+
+    def test_03_failed_delivery_is_retried(self, settings):
+        from users.mail import deliver_pending, queue_mail
+        from users.models import OutgoingEmail
+
+        settings.EMAIL_QUEUE_EAGER = False
+        settings.EMAIL_BACKEND = self.FAILING_BACKEND
+        settings.EMAIL_QUEUE_MAX_ATTEMPTS = 2
+        queue_mail('Тема', 'Текст', 'from@yamdb.fake', ['user@yamdb.fake'])
+
+        started = timezone.now()
+        assert deliver_pending() == 1
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.PENDING, (
+            'Проверьте, что после ошибки отправки письмо остаётся в очереди.'
+        )
+        assert email.attempts == 1
+        assert 'SMTP' in email.last_error
+        assert email.next_attempt_at >= started + timedelta(
+            seconds=settings.EMAIL_QUEUE_RETRY_DELAY
+        ), 'Проверьте, что повторная попытка откладывается.'
+        assert deliver_pending() == 0, (
+            'Проверьте, что письмо не отправляется повторно до истечения '
+            'задержки.'
+        )
+
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        deliver_pending()
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.FAILED, (
+            'Проверьте, что после `EMAIL_QUEUE_MAX_ATTEMPTS` попыток письмо '
+            'помечается как неотправленное.'
+        )
+
+        settings.EMAIL_BACKEND = self.LOCMEM_BACKEND
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        assert deliver_pending() == 0
+        assert len(mail.outbox) == 0
+
+    def test_04_retry_delay_is_capped(self, settings):
+        from users.mail import get_retry_delay
+
+        settings.EMAIL_QUEUE_RETRY_DELAY = 30
+        settings.EMAIL_QUEUE_MAX_RETRY_DELAY = 100
+        assert [
+            get_retry_delay(attempts).seconds for attempts in (1, 2, 3, 4)
+        ] == [30, 60, 100, 100]
+
+    def test_05_connection_failure_is_retried(self, settings):
+        from users.mail import deliver_pending, queue_mail
+        from users.models import OutgoingEmail
+
+        settings.EMAIL_QUEUE_EAGER = False
+        settings.EMAIL_BACKEND = self.UNREACHABLE_BACKEND
+        settings.EMAIL_QUEUE_MAX_ATTEMPTS = 2
+        queue_mail(
+            'Тема', 'Текст', 'from@yamdb.fake',
+            ['first@yamdb.fake', 'second@yamdb.fake']
+        )
+
+        assert deliver_pending() == 2
+        assert not OutgoingEmail.objects.exclude(
+            attempts=1, claim=None, status=OutgoingEmail.PENDING,
+            last_error__contains='SMTP'
+        ).exists(), (
+            'Проверьте, что ошибка соединения считается неудачной попыткой '
+            'для всех писем порции и освобождает их.'
+        )
+        assert deliver_pending() == 0
+
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        deliver_pending()
+        assert not OutgoingEmail.objects.exclude(
+            status=OutgoingEmail.FAILED
+        ).exists(), (
+            'Проверьте, что при недоступном SMTP-сервере письма помечаются '
+            'как неотправленные после `EMAIL_QUEUE_MAX_ATTEMPTS` попыток.'
+        )
@@ -0,0 +1,144 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17AuthCache:
+
+    CATEGORIES_URL = '/api/v1/categories/'
+
+    def test_01_authorization_is_cached(self, admin_client,
+                                        django_assert_num_queries):
+        admin_client.get(self.CATEGORIES_URL)
+        with django_assert_num_queries(0):
+            response = admin_client.get(self.CATEGORIES_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что права пользователя берутся из кэша, а не из базы.'
+        )
+
+    def test_02_cache_invalidated_on_user_save(self, user, user_client):
+        data = {'name': 'Музыка', 'slug': 'music'}
+        response = user_client.post(self.CATEGORIES_URL, data=data)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        user.role = 'admin'
+        user.save()
+        response = user_client.post(self.CATEGORIES_URL, data=data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что кэш прав сбрасывается при изменении роли '
+            'пользователя.'
+        )
+
+        user.delete()
+        response = user_client.get(self.CATEGORIES_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен удалённого пользователя не принимается.'
+        )
+
+    def test_03_role_claims(self, admin, settings,
+                            django_assert_num_queries):
+        from api.authentication import CachedJWTAuthentication, is_revoked
+
+        settings.JWT_ROLE_CLAIMS = True
+        admin.confirmation_code = 'code'
+        admin.save()
+        response = APIClient().post('/api/v1/auth/token/', data={
+            'username': admin.username, 'confirmation_code': 'code'
+        })
+        assert response.status_code == HTTPStatus.OK
+
+        token = AccessToken(response.json()['token'])
+        is_revoked(token)
+        assert token['role'] == 'admin', (
+            'Проверьте, что при `JWT_ROLE_CLAIMS` роль записывается в токен.'
+        )
+        with django_assert_num_queries(0):
+            user = CachedJWTAuthentication().get_user(token)
+        assert user.pk == admin.pk
+        assert user.is_admin, (
+            'Проверьте, что права пользователя определяются по токену.'
+        )
+
+    def test_04_revoke_token(self, user, user_client):
+        from api.authentication import issue_access_token
+
+        response = user_client.post('/api/v1/auth/token/revoke/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        response = user_client.get(self.CATEGORIES_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что отозванный токен не принимается.'
+        )
+
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {issue_access_token(user)}'
+        )
+        assert client.get(self.CATEGORIES_URL).status_code == HTTPStatus.OK
+
+    def test_05_role_change_revokes_claims(self, user, settings):
+        from api.authentication import issue_access_token
+
+        settings.JWT_ROLE_CLAIMS = True
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {issue_access_token(user)}'
+        )
+        assert client.get(self.CATEGORIES_URL).status_code == HTTPStatus.OK
+
+        user.bio = 'Новая биография'
+        user.save()
+        assert client.get(self.CATEGORIES_URL).status_code == HTTPStatus.OK, (
+            'Проверьте, что токены не отзываются при изменении полей, '
+            'не влияющих на права.'
+        )
+
+        user.role = 'admin'
+        user.save()
+        response = client.get(self.CATEGORIES_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что при изменении роли токены с устаревшей ролью '
+            'отзываются.'
+        )
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {issue_access_token(user)}'
+        )
+        response = client.post(
+            self.CATEGORIES_URL, data={'name': 'Музыка', 'slug': 'music'}
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что новый токен содержит актуальную роль.'
+        )
+
+    def test_06_revocation_cached_per_token(self, user, user_client,
+                                            django_assert_num_queries):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from api.authentication import issue_access_token
+        from users.models import RevokedToken
+
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {issue_access_token(user)}'
+        )
+        assert client.get(self.CATEGORIES_URL).status_code == HTTPStatus.OK
+        expired = RevokedToken.objects.create(
+            jti='expired', user_id=user.pk,
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        response = user_client.post('/api/v1/auth/token/revoke/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        with django_assert_num_queries(0):
+            response = client.get(self.CATEGORIES_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что отзыв одного токена не сбрасывает кэш проверки '
+            'других токенов.'
+        )
+        assert not RevokedToken.objects.filter(pk=expired.pk).exists(), (
+            'Проверьте, что истёкшие записи об отзыве удаляются.'
+        )
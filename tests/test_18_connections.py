@@ -0,0 +1,59 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Connections:
+
+    def test_01_settings_profile(self, settings):
+        database = settings.DATABASES['default']
+        assert database['CONN_MAX_AGE'] != 0, (
+            'Проверьте, что по умолчанию соединения с базой '
+            'переиспользуются между запросами.'
+        )
+        assert database['CONN_HEALTH_CHECKS'], (
+            'Проверьте, что переиспользуемые соединения проверяются.'
+        )
+
+    def test_02_unusable_connection_closed(self, monkeypatch):
+        from api.db import check_connections
+
+        connection = connections['default']
+        connection.ensure_connection()
+        checks, closed = [], []
+
+        def is_usable():
+            checks.append(True)
+            return False
+
+        monkeypatch.setattr(connection, 'is_usable', is_usable)
+        monkeypatch.setattr(connection, 'close', lambda: closed.append(True))
+        monkeypatch.setitem(
+            connection.settings_dict, 'CONN_HEALTH_CHECKS', True
+        )
+        check_connections()
+        assert not checks, (
+            'Проверьте, что соединение проверяется только при первом '
+            'обращении к базе в запросе.'
+        )
+        connection.ensure_connection()
+        connection.ensure_connection()
+        assert closed == [True] and checks == [True], (
+            'Проверьте, что разорванное соединение проверяется один раз и '
+            'закрывается перед первым использованием в запросе.'
+        )
+
+    def test_03_benchmark(self):
+        out = StringIO()
+        call_command(
+            'benchmark_connections', path='/api/v1/categories/', requests=3,
+            stdout=out
+        )
+        output = out.getvalue()
+        assert 'CONN_MAX_AGE=0' in output and 'CONN_MAX_AGE=60' in output
+        assert 'мс/запрос' in output, (
+            'Проверьте, что команда выводит время обработки запроса.'
+        )
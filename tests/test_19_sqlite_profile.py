@@ -0,0 +1,51 @@
+import subprocess
+import sys
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from tests.conftest import MANAGE_PATH
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19SQLiteProfile:
+
+    def test_01_pragmas(self):
+        if connection.vendor != 'sqlite':
+            pytest.skip('Профиль настраивается только для SQLite.')
+        connection.close()
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            assert cursor.fetchone()[0] == 1, (
+                'Проверьте, что при открытии соединения устанавливается '
+                '`PRAGMA synchronous = NORMAL`.'
+            )
+            cursor.execute('PRAGMA temp_store')
+            assert cursor.fetchone()[0] == 2
+
+    def test_02_immediate_transactions(self):
+        from reviews.models import Category
+
+        if connection.vendor != 'sqlite':
+            pytest.skip('Профиль настраивается только для SQLite.')
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                Category.objects.create(name='Музыка', slug='music')
+        assert queries[0]['sql'] == 'BEGIN IMMEDIATE', (
+            'Проверьте, что транзакции SQLite сразу берут блокировку на '
+            'запись.'
+        )
+
+    def test_03_write_benchmark(self):
+        result = subprocess.run(
+            [sys.executable, 'manage.py', 'benchmark_sqlite_writes',
+             '--threads', '2', '--reviews', '3'],
+            cwd=MANAGE_PATH, capture_output=True, text=True, timeout=120
+        )
+        assert result.returncode == 0, result.stderr
+        assert 'tuned: 2 потоков, 6 отзывов' in result.stdout, (
+            'Проверьте, что замер записывает все отзывы без ошибок '
+            'блокировки базы.'
+        )
+        assert 'ошибок: 0' in result.stdout
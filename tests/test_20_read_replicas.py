@@ -0,0 +1,75 @@
+import json
+import os
+import subprocess
+import sys
+
+from tests.conftest import MANAGE_PATH
+
+# Сценарий выполняется в отдельном процессе с двумя файлами SQLite:
+# основной базой и репликой, в которую изменения не реплицируются.
+SCRIPT = '''
+import json
+import time
+
+from django.test import Client
+
+from api.authentication import issue_access_token
+from reviews.models import Category
+from users.models import CustomUser
+
+admin = CustomUser.objects.create_user(
+    username='admin', email='admin@yamdb.fake', role='admin'
+)
+token = f'Bearer {issue_access_token(admin)}'
+Category.objects.create(name='Книги', slug='books')
+client = Client()
+url = '/api/v1/categories/'
+counts = {'fresh': client.get(url).json()['count']}
+time.sleep(1.1)
+counts['replica'] = client.get(url, {'limit': 1}).json()['count']
+client.post(
+    '/api/v1/users/', {'username': 'member', 'email': 'member@yamdb.fake'},
+    HTTP_AUTHORIZATION=token
+)
+counts['pinned'] = client.get(
+    url, {'limit': 2}, HTTP_AUTHORIZATION=token
+).json()['count']
+counts['other'] = client.get(url, {'limit': 3}).json()['count']
+print(json.dumps(counts))
+'''
+
+
+def run_manage(*args, env):
+    return subprocess.run(
+        [sys.executable, 'manage.py', *args], cwd=MANAGE_PATH, env=env,
+        capture_output=True, text=True, timeout=120, check=True
+    ).stdout
+
+
+def test_read_replica_routing(tmp_path):
+    env = dict(
+        os.environ,
+        DB_ENGINE='api_yamdb.sqlite3',
+        DB_NAME=str(tmp_path / 'primary.sqlite3'),
+        DB_REPLICAS=str(tmp_path / 'replica.sqlite3'),
+        DB_REPLICA_LAG='1',
+    )
+    run_manage('migrate', '-v', '0', env=env)
+    run_manage('migrate', '-v', '0', '--database', 'replica1', env=env)
+    counts = json.loads(run_manage('shell', '-c', SCRIPT, env=env))
+
+    assert counts['fresh'] == 1, (
+        'Проверьте, что данные, изменённые менее `DB_REPLICA_LAG` секунд '
+        'назад, читаются из основной базы.'
+    )
+    assert counts['replica'] == 0, (
+        'Проверьте, что GET-запросы к каталогу читают из реплики.'
+    )
+    assert counts['pinned'] == 1, (
+        'Проверьте, что после запроса на запись клиент читает из основной '
+        'базы.'
+    )
+    assert counts['other'] == 0, (
+        'Проверьте, что закрепление за основной базой действует только '
+        'для клиента, выполнившего запись.'
+    )
@@ -0,0 +1,122 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def library(user):
+    from reviews.models import Category, Comment, Review, Title
+
+    category = Category.objects.create(name='Книги', slug='books')
+    novel = Title.objects.create(
+        name='Мастер и Маргарита', year=1967, category=category,
+        description='Роман о визите дьявола в Москву'
+    )
+    poems = Title.objects.create(
+        name='Книга стихов', year=1990, category=category
+    )
+    # Вес слова в BM25 тем больше, чем реже оно встречается: совпадения
+    # не должны быть в каждом документе.
+    Title.objects.bulk_create(
+        Title(name=f'Сборник {number}', year=2000, category=category)
+        for number in range(5)
+    )
+    # Таблица FTS5 не очищается между тестами вместе с моделями.
+    call_command('rebuild_search_index')
+    review = Review.objects.create(
+        title=novel, author=user, text='Отличная книга, читал дважды',
+        score=9
+    )
+    comment = Comment.objects.create(
+        review=review, author=user, text='Согласен, хорошей книгой назовёшь'
+    )
+    return novel, poems, review, comment
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Search:
+
+    URL = '/api/v1/search/'
+
+    def search(self, **params):
+        response = APIClient().get(self.URL, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что `{self.URL}` доступен без авторизации.'
+        )
+        return response.json()
+
+    def test_01_word_forms(self, library):
+        novel, poems, review, comment = library
+        found = {
+            (hit['type'], hit['id'])
+            for hit in self.search(q='книги')['results']
+        }
+        assert found == {
+            ('title', poems.pk), ('review', review.pk),
+            ('comment', comment.pk),
+        }, (
+            'Проверьте, что поиск находит разные формы слова.'
+        )
+        hit = self.search(q='дьяволы')['results'][0]
+        assert hit['type'] == 'title' and hit['id'] == novel.pk, (
+            'Проверьте, что поиск выполняется по описанию произведения.'
+        )
+
+    def test_02_type_filter_and_validation(self, library):
+        novel, poems, review, comment = library
+        data = self.search(q='книга', type='comment')
+        assert data['count'] == 1
+        assert data['results'][0] == {
+            'type': 'comment', 'id': comment.pk, 'title_id': novel.pk,
+            'review_id': review.pk, 'text': comment.text,
+            'rank': data['results'][0]['rank'],
+        }, (
+            'Проверьте, что параметр `type` ограничивает типы документов.'
+        )
+        client = APIClient()
+        for params in ({}, {'q': ''}, {'q': 'книга', 'type': 'user'}):
+            response = client.get(self.URL, params)
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что без запроса или с неизвестным типом '
+                'возвращается статус 400.'
+            )
+
+    def test_03_name_ranked_first(self, library):
+        novel, poems, review, comment = library
+        results = self.search(q='книга')['results']
+        assert results[0]['type'] == 'title', (
+            'Проверьте, что совпадения в названии произведения выше '
+            'совпадений в тексте отзывов и комментариев.'
+        )
+        ranks = [hit['rank'] for hit in results]
+        assert ranks == sorted(ranks, reverse=True)
+
+    def test_04_index_follows_changes(self, library, user_client):
+        novel, poems, review, comment = library
+        response = user_client.patch(
+            f'/api/v1/titles/{novel.pk}/reviews/{review.pk}/',
+            data={'text': 'Прекрасный роман'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        found = {hit['type'] for hit in self.search(q='книга')['results']}
+        assert 'review' not in found, (
+            'Проверьте, что индекс обновляется при изменении отзыва.'
+        )
+        assert self.search(q='романы')['count'] == 2
+
+        novel.delete()
+        assert self.search(q='книга')['count'] == 1, (
+            'Проверьте, что при удалении произведения из индекса удаляются '
+            'его отзывы и комментарии.'
+        )
+
+    def test_05_query_count(self, library, django_assert_num_queries):
+        client = APIClient()
+        with django_assert_num_queries(2):
+            response = client.get(self.URL, {'q': 'книга'})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что поиск выполняет не больше двух запросов: '
+            'подсчёт совпадений и выборку страницы.'
+        )
@@ -0,0 +1,36 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22QueryPlans:
+
+    def test_01_no_full_scans(self, user):
+        from reviews.models import Category, Comment, Genre, Review, Title
+
+        category = Category.objects.create(name='Фильм', slug='movie')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        title = Title.objects.create(
+            name='Начало', year=2010, category=category
+        )
+        title.genre.set([genre])
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=8
+        )
+        Comment.objects.create(review=review, author=user, text='Коммент')
+
+        out = StringIO()
+        try:
+            call_command('explain_queries', stdout=out)
+        except CommandError as error:
+            pytest.fail(
+                'Проверьте, что запросы API используют индексы: '
+                f'{error}\n{out.getvalue()}'
+            )
+        assert f'/api/v1/titles/{title.pk}/reviews/: OK' in out.getvalue()
+
+    def test_02_requires_data(self):
+        with pytest.raises(CommandError):
+            call_command('explain_queries', stdout=StringIO())
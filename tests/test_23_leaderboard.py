@@ -0,0 +1,158 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+
+def get_reviewers(django_user_model, count):
+    from api.authentication import issue_access_token
+
+    clients = []
+    for number in range(count):
+        user = django_user_model.objects.create_user(
+            username=f'reviewer{number}me',
+            email=f'reviewer{number}@yamdb.fake'
+        )
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {issue_access_token(user)}'
+        )
+        clients.append(client)
+    return clients
+
+
+@pytest.fixture
+def catalog(admin_client):
+    from reviews.models import Category, Genre
+
+    Category.objects.create(name='Фильм', slug='movie')
+    Category.objects.create(name='Книга', slug='book')
+    Genre.objects.create(name='Драма', slug='drama')
+    Genre.objects.create(name='Комедия', slug='comedy')
+    titles = {}
+    for name, year, category, genres in (
+        ('Крёстный отец', 1972, 'movie', ['drama']),
+        ('Форрест Гамп', 1994, 'movie', ['drama', 'comedy']),
+        ('Маска', 1994, 'movie', ['comedy']),
+        ('Идиот', 1869, 'book', ['drama']),
+    ):
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': name, 'year': year, 'category': category,
+            'genre': genres
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        titles[name] = response.json()['id']
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Leaderboard:
+
+    URL = '/api/v1/titles/top/'
+
+    def top(self, **params):
+        response = APIClient().get(self.URL, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что `{self.URL}` доступен без авторизации.'
+        )
+        return [title['name'] for title in response.json()]
+
+    def review(self, clients, title_id, scores):
+        for client, score in zip(clients, scores):
+            response = client.post(
+                f'/api/v1/titles/{title_id}/reviews/',
+                data={'text': 'Отзыв', 'score': score}
+            )
+            assert response.status_code == HTTPStatus.CREATED
+
+    def test_01_bayesian_order(self, catalog, django_user_model):
+        clients = get_reviewers(django_user_model, 8)
+        self.review(clients, catalog['Маска'], [10])
+        self.review(clients, catalog['Форрест Гамп'], [9] * 8)
+        self.review(clients, catalog['Крёстный отец'], [1, 2])
+        assert self.top() == [
+            'Форрест Гамп', 'Маска', 'Идиот', 'Крёстный отец'
+        ], (
+            'Проверьте, что произведения упорядочены по сглаженной оценке: '
+            'единственная высокая оценка не должна опережать много высоких.'
+        )
+        data = APIClient().get(self.URL, {'limit': 1}).json()
+        assert len(data) == 1 and data[0]['rating'] == 9
+        assert data[0]['score'] == pytest.approx((5.5 * 5 + 72) / 13)
+
+    def test_02_scopes(self, catalog, django_user_model):
+        clients = get_reviewers(django_user_model, 3)
+        self.review(clients, catalog['Идиот'], [10, 10, 10])
+        self.review(clients, catalog['Маска'], [3, 3, 3])
+        assert self.top(genre='drama') == [
+            'Идиот', 'Крёстный отец', 'Форрест Гамп'
+        ]
+        assert self.top(genre='drama', decade=1990) == ['Форрест Гамп'], (
+            'Проверьте фильтрацию таблицы лидеров по жанру и десятилетию.'
+        )
+        assert self.top(category='movie', decade=1990) == [
+            'Форрест Гамп', 'Маска'
+        ]
+        assert self.top(category='book') == ['Идиот']
+        client = APIClient()
+        for params in (
+            {'genre': 'drama', 'category': 'movie'}, {'decade': 1995},
+            {'limit': 0}, {'limit': 1000},
+        ):
+            response = client.get(self.URL, params)
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте валидацию параметров таблицы лидеров.'
+            )
+
+    def test_03_follows_title_changes(self, catalog, admin_client):
+        gump = catalog['Форрест Гамп']
+        response = admin_client.patch(
+            f'/api/v1/titles/{gump}/',
+            data={'year': 1972, 'genre': ['comedy'], 'category': 'book'},
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.top(genre='drama') == ['Крёстный отец', 'Идиот'], (
+            'Проверьте, что таблица лидеров обновляется при изменении '
+            'жанров произведения.'
+        )
+        assert self.top(genre='comedy', decade=1970) == ['Форрест Гамп']
+        assert 'Форрест Гамп' in self.top(category='book')
+
+        admin_client.delete(f'/api/v1/titles/{gump}/')
+        assert 'Форрест Гамп' not in self.top(), (
+            'Проверьте, что удалённое произведение исчезает из таблицы.'
+        )
+
+    def test_04_rebuild_matches_incremental(self, catalog,
+                                            django_user_model):
+        from reviews.models import TitleRanking
+
+        clients = get_reviewers(django_user_model, 2)
+        self.review(clients, catalog['Маска'], [7, 2])
+
+        def rows():
+            return list(TitleRanking.objects.order_by(
+                'title_id', 'genre_id', 'category_id', 'decade'
+            ).values_list(
+                'title_id', 'genre_id', 'category_id', 'decade', 'score'
+            ))
+
+        incremental = rows()
+        call_command('recalculate_rating')
+        assert rows() == incremental, (
+            'Проверьте, что пересчёт таблицы лидеров совпадает '
+            'с инкрементальным обновлением.'
+        )
+
+    def test_05_query_count(self, catalog, django_assert_num_queries):
+        client = APIClient()
+        for limit in (1, 4):
+            with django_assert_num_queries(3):
+                response = client.get(
+                    self.URL, {'genre': 'drama', 'limit': limit}
+                )
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что число запросов таблицы лидеров не зависит '
+                'от размера выдачи.'
+            )
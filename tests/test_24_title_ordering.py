@@ -0,0 +1,91 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def titles():
+    from reviews.models import Category, Genre, Title
+
+    category = Category.objects.create(name='Фильм', slug='movie')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    created = {}
+    for name, year, rating, count, genres in (
+        ('Бриллиантовая рука', 1968, 9, 40, [comedy]),
+        ('Весна на Заречной улице', 1956, 7, 10, [drama]),
+        ('Афоня', 1975, 9, 25, [drama, comedy]),
+        ('Гараж', 1979, None, 0, [drama, comedy]),
+    ):
+        title = Title.objects.create(name=name, year=year, category=category)
+        title.genre.set(genres)
+        Title.objects.filter(pk=title.pk).update(
+            rating=rating, reviews_count=count
+        )
+        created[name] = title.pk
+    return created
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24TitleOrdering:
+
+    URL = '/api/v1/titles/'
+
+    def names(self, **params):
+        response = APIClient().get(self.URL, params)
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_ordering(self, titles):
+        assert self.names(ordering='-reviews_count') == [
+            'Бриллиантовая рука', 'Афоня', 'Весна на Заречной улице',
+            'Гараж'
+        ], (
+            'Проверьте сортировку произведений по числу отзывов.'
+        )
+        assert self.names(ordering='name')[0] == 'Афоня'
+        assert self.names(ordering='-year')[0] == 'Гараж'
+        assert self.names(rating__gte=1, ordering='-rating') == [
+            'Афоня', 'Бриллиантовая рука', 'Весна на Заречной улице'
+        ], (
+            'Проверьте, что при равном рейтинге порядок определяется id '
+            'в направлении сортировки.'
+        )
+        assert self.names(ordering='description') == list(titles), (
+            'Проверьте, что по неподдерживаемым полям список не сортируется.'
+        )
+
+    def test_02_range_filters(self, titles):
+        assert self.names(year__gte=1960, year__lte=1976) == [
+            'Бриллиантовая рука', 'Афоня'
+        ], (
+            'Проверьте фильтрацию произведений по диапазону лет.'
+        )
+        assert self.names(rating__gte=8) == ['Бриллиантовая рука', 'Афоня']
+        assert self.names(rating__lte=7) == ['Весна на Заречной улице']
+
+    def test_03_genres(self, titles):
+        assert self.names(genre__in='drama,comedy') == list(titles), (
+            'Проверьте, что `genre__in` возвращает произведения любого из '
+            'жанров без повторов.'
+        )
+        assert self.names(genre__all='drama,comedy') == ['Афоня', 'Гараж'], (
+            'Проверьте, что `genre__all` возвращает произведения со всеми '
+            'жанрами.'
+        )
+
+    def test_04_ordering_without_aggregates(self, titles,
+                                            django_assert_num_queries):
+        with django_assert_num_queries(3) as context:
+            response = APIClient().get(
+                self.URL, {'ordering': '-rating', 'genre__all': 'drama'}
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert not any(
+            'reviews_review' in query['sql']
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что сортировка по рейтингу не обращается к таблице '
+            'отзывов.'
+        )
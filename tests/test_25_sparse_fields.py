@@ -0,0 +1,83 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def title():
+    from reviews.models import Category, Genre, Title
+
+    category = Category.objects.create(name='Фильм', slug='movie')
+    title = Title.objects.create(
+        name='Сталкер', year=1979, category=category,
+        description='Фильм Андрея Тарковского'
+    )
+    title.genre.set([
+        Genre.objects.create(name='Драма', slug='drama'),
+        Genre.objects.create(name='Фантастика', slug='sci-fi'),
+    ])
+    return title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25SparseFields:
+
+    URL = '/api/v1/titles/'
+
+    def test_01_fields(self, title, django_assert_num_queries):
+        client = APIClient()
+        with django_assert_num_queries(2) as context:
+            response = client.get(self.URL, {'fields': 'id,name,rating'})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == [
+            {'id': title.pk, 'name': 'Сталкер', 'rating': None}
+        ], (
+            'Проверьте, что параметр `fields` оставляет в ответе только '
+            'перечисленные поля.'
+        )
+        sql = context.captured_queries[-1]['sql']
+        assert 'reviews_category' not in sql and 'description' not in sql, (
+            'Проверьте, что для неперечисленных в `fields` полей не '
+            'загружаются колонки и связи.'
+        )
+
+        response = client.get(f'{self.URL}{title.pk}/', {'fields': 'year'})
+        assert response.json() == {'year': 1979}
+
+    def test_02_expand(self, title):
+        client = APIClient()
+        data = client.get(
+            f'{self.URL}{title.pk}/', {'expand': 'category'}
+        ).json()
+        assert data['category'] == {'name': 'Фильм', 'slug': 'movie'}
+        assert data['genre'] == ['drama', 'sci-fi'], (
+            'Проверьте, что связи не из `expand` выводятся слагами.'
+        )
+        data = client.get(f'{self.URL}{title.pk}/').json()
+        assert data['genre'][0] == {'name': 'Драма', 'slug': 'drama'}, (
+            'Проверьте, что без `expand` ответ не изменился.'
+        )
+        data = client.get(
+            self.URL, {'fields': 'name,genre', 'expand': ''}
+        ).json()['results']
+        assert data == [{'name': 'Сталкер', 'genre': ['drama', 'sci-fi']}]
+
+    def test_03_validation(self, title):
+        client = APIClient()
+        for params in (
+            {'fields': 'name,password'}, {'fields': ''},
+            {'expand': 'author'},
+        ):
+            response = client.get(self.URL, params)
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что неизвестные поля и связи отклоняются.'
+            )
+
+    def test_04_top(self, title):
+        data = APIClient().get(
+            f'{self.URL}top/', {'fields': 'id,score'}
+        ).json()
+        assert data == [{'id': title.pk, 'score': 5.5}], (
+            'Проверьте, что `fields` работает и в таблице лидеров.'
+        )
@@ -0,0 +1,57 @@
+import json
+import subprocess
+import sys
+
+from tests.conftest import MANAGE_PATH
+
+
+def run_command(*args):
+    result = subprocess.run(
+        [sys.executable, 'manage.py', 'benchmark_api', *args],
+        cwd=MANAGE_PATH, capture_output=True, text=True, timeout=300
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+class Test26Benchmark:
+
+    def test_01_results_are_comparable(self, tmp_path):
+        base, new = tmp_path / 'base.json', tmp_path / 'new.json'
+        for output in (base, new):
+            run_command(
+                '--reviews', '60', '--requests', '5', '--output', str(output)
+            )
+        report = json.loads(base.read_text(encoding='utf-8'))
+        assert report['meta']['dataset'] == {
+            'titles': 3, 'reviews': 60, 'comments': 12
+        }, (
+            'Проверьте, что замер заполняет набор данных заданного размера.'
+        )
+        for name in ('titles-list', 'reviews-list', 'signup', 'token'):
+            result = report['results'][name]
+            assert result['requests'] == 5 and result['errors'] == 0, (
+                f'Проверьте, что сценарий `{name}` выполняется без ошибок.'
+            )
+            assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+            assert result['queries'] is not None
+
+        output = run_command('--compare', str(base), str(new))
+        assert 'titles-list' in output and 'p95_ms' in output, (
+            'Проверьте, что результаты двух замеров можно сравнить.'
+        )
+
+    def test_02_scenarios_without_data_are_skipped(self, tmp_path):
+        output = tmp_path / 'report.json'
+        stdout = run_command(
+            '--reviews', '4', '--requests', '5', '--output', str(output)
+        )
+        report = json.loads(output.read_text(encoding='utf-8'))
+        assert report['meta']['dataset']['comments'] == 0
+        assert 'comments-list' not in report['results'] and (
+            'comments-list   пропущен' in stdout
+        ), (
+            'Проверьте, что сценарий без данных в наборе пропускается с '
+            'сообщением, а не завершает замер ошибкой.'
+        )
+        assert report['results']['titles-list']['errors'] == 0
@@ -0,0 +1,78 @@
+from collections import Counter
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from rest_framework.test import APIClient
+
+OPTIONS = {
+    'users': 30, 'titles': 20, 'reviews': 200, 'comments': 50,
+    'categories': 3, 'genres': 5, 'stdout': StringIO(),
+}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27GenerateData:
+
+    def test_01_database(self):
+        from reviews.models import Comment, Review, Title, TitleRanking
+        from users.models import CustomUser
+
+        call_command('generate_data', **OPTIONS)
+        assert CustomUser.objects.count() == 30
+        assert Title.objects.count() == 20
+        assert Review.objects.count() == 200
+        assert Comment.objects.count() == 50
+        counts = sorted(Counter(
+            Review.objects.values_list('title_id', flat=True)
+        ).values(), reverse=True)
+        assert counts[0] == 30 and sum(counts[:5]) > 100, (
+            'Проверьте, что несколько произведений получают большую часть '
+            'отзывов, но не больше одного отзыва от каждого пользователя.'
+        )
+        assert len({
+            date.date() for date in Review.objects.values_list(
+                'pub_date', flat=True
+            )
+        }) > 100, 'Проверьте, что даты отзывов распределены по периоду.'
+        for review, date in Comment.objects.values_list(
+            'review__pub_date', 'pub_date'
+        ):
+            assert date >= review, (
+                'Проверьте, что комментарий публикуется после отзыва.'
+            )
+        title = Title.objects.order_by('-reviews_count').first()
+        assert title.reviews_count == 30 and title.rating is not None, (
+            'Проверьте, что рейтинги пересчитываются после генерации.'
+        )
+        assert TitleRanking.objects.exists()
+
+        with pytest.raises(CommandError):
+            call_command('generate_data', **OPTIONS)
+        client = APIClient()
+        review = Review.objects.get(pk=1)
+        url = f'/api/v1/titles/{review.title_id}/reviews/1/comments/'
+        etag = client.get(url)['ETag']
+        call_command('generate_data', clear=True, seed=1, **OPTIONS)
+        assert Review.objects.count() == 200
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code != 304, (
+            'Проверьте, что после замены данных меняются ETag всех ответов.'
+        )
+
+    def test_02_files_for_import(self, tmp_path):
+        from reviews.models import Comment, Review
+
+        call_command('generate_data', out_dir=str(tmp_path), **OPTIONS)
+        call_command('generate_data', out_dir=str(tmp_path / 'again'),
+                     **OPTIONS)
+        for path in tmp_path.glob('*.csv'):
+            assert (tmp_path / 'again' / path.name).read_bytes() == (
+                path.read_bytes()
+            ), 'Проверьте, что при одном `seed` данные совпадают.'
+        call_command('import_csv', data_dir=str(tmp_path), stdout=StringIO())
+        assert Review.objects.count() == 200
+        assert Comment.objects.count() == 50
+
+    def test_03_impossible_scale(self):
+        with pytest.raises(CommandError):
+            call_command('generate_data', **{**OPTIONS, 'reviews': 601})
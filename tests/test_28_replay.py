@@ -0,0 +1,102 @@
+import json
+import subprocess
+import sys
+
+import pytest
+from django.test import Client
+
+from tests.conftest import MANAGE_PATH
+
+LOG = (
+    '[18/Oct/2026 18:54:32] "GET /api/v1/titles/ HTTP/1.1" 200 1234\n'
+    '127.0.0.1 - - [18/Oct/2026:18:54:33 +0000] '
+    '"GET /api/v1/genres/?search=d HTTP/1.1" 200 532 "-" "curl/8.0"\n'
+    '127.0.0.1 - - [18/Oct/2026:18:54:33 +0000] '
+    '"POST /api/v1/auth/signup/ HTTP/1.1" 400 32 "-" "curl/8.0"\n'
+    '[18/Oct/2026 18:54:34] "GET /api/v1/titles/1/ HTTP/1.1" 200 50\n'
+    '[18/Oct/2026 18:54:35] "GET /api/v1/titles/ HTTP/1.1" 304 0\n'
+    '[18/Oct/2026 18:54:36] "GET /api/v1/users/me/ HTTP/1.1" 401 58\n'
+)
+
+
+class Test28Replay:
+
+    def test_01_collection(self):
+        from api.replay import load_collection
+        from api.management.commands.replay_traffic import COLLECTION
+
+        steps, variables, extractors = load_collection(COLLECTION)
+        assert len(steps) == 231 and variables['adminUsername'] == (
+            'admin-user'
+        )
+        by_name = {step.name: (index, step) for index, step in
+                   enumerate(steps)}
+        index, step = by_name['get_token_for_admin']
+        assert (step.method, step.path, step.token, step.expected) == (
+            'POST', '/api/v1/auth/token/', None, 200
+        )
+        assert extractors[index] == {'adminToken': 'token'}, (
+            'Проверьте, что переменные коллекции заполняются из ответов.'
+        )
+        index, step = by_name['create_title_without_name // Admin']
+        assert step.token == '{{adminToken}}' and step.expected == 400, (
+            'Проверьте, что авторизация наследуется от папки.'
+        )
+
+    def test_02_access_log(self, tmp_path):
+        from api.replay import load_access_log
+
+        path = tmp_path / 'access.log'
+        path.write_text(LOG + 'garbage\n', encoding='utf-8')
+        steps, skipped, denied = load_access_log(str(path))
+        assert [(step.method, step.path, step.expected) for step in steps] == [
+            ('GET', '/api/v1/titles/', 200),
+            ('GET', '/api/v1/genres/?search=d', 200),
+            ('GET', '/api/v1/titles/1/', 200),
+            ('GET', '/api/v1/titles/', 200),
+        ] and skipped == 2, (
+            'Проверьте, что из журнала воспроизводятся только GET- и '
+            'HEAD-запросы, а вместо 304 ожидается 200.'
+        )
+        assert denied == 1 and all(step.anonymous for step in steps), (
+            'Проверьте, что строки с 401/403 не воспроизводятся.'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_replay(self):
+        from api.benchmark import client_sender
+        from api.replay import Step, replay
+
+        steps = [
+            Step(None, 'GET', '/api/v1/titles/', None, None, 200),
+            Step(None, 'GET', '/api/v1/titles/1/', None, None, 200),
+            Step(None, 'GET', '/api/v1/users/me/', None, None, 200,
+                 anonymous=True),
+        ]
+        report = replay(
+            lambda: client_sender(Client()), steps * 3, concurrency=2
+        )
+        assert report['all']['requests'] == 9
+        assert report['GET user-get-patch-me']['errors'] == 0, (
+            'Проверьте, что отказ в доступе запросу из журнала, '
+            'повторённому без учётных данных, не считается ошибкой.'
+        )
+        assert report['all']['denied'] == 3
+        assert report['GET title-list']['errors'] == 0
+        assert report['GET title-detail']['error_rate'] == 1.0, (
+            'Проверьте, что ответ с неожиданным статусом считается ошибкой.'
+        )
+
+    def test_04_command(self, tmp_path):
+        output = tmp_path / 'replay.json'
+        result = subprocess.run(
+            [sys.executable, 'manage.py', 'replay_traffic', '--iterations',
+             '1', '--concurrency', '2', '--output', str(output)],
+            cwd=MANAGE_PATH, capture_output=True, text=True, timeout=300
+        )
+        assert result.returncode == 0, result.stderr
+        report = json.loads(output.read_text(encoding='utf-8'))
+        assert report['meta']['concurrency'] == 2
+        assert report['results']['get_titles_list // No Auth'][
+            'errors'
+        ] == 0, 'Проверьте, что запросы коллекции воспроизводятся.'
@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+PHASES = ('auth', 'permissions', 'db', 'serialize', 'render', 'total')
+
+
+def get_metrics(response):
+    return {
+        metric.split(';')[0]: metric
+        for metric in response['Server-Timing'].split(', ')
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29ServerTiming:
+
+    URL = '/api/v1/users/'
+
+    def test_01_disabled_by_default(self, admin_client):
+        response = admin_client.get(self.URL)
+        assert response.status_code == HTTPStatus.OK
+        assert not response.has_header('Server-Timing'), (
+            'Проверьте, что профилирование выключено по умолчанию.'
+        )
+
+    def test_02_phases(self, settings, admin_client):
+        settings.SERVER_TIMING = True
+        response = admin_client.get(self.URL)
+        metrics = get_metrics(response)
+        assert all(phase in metrics for phase in PHASES), (
+            'Проверьте, что заголовок Server-Timing содержит длительность '
+            f'фаз {PHASES}.'
+        )
+        assert 'dur=' in metrics['total']
+
+    def test_03_profile_for_admins(self, settings, tmp_path, admin_client,
+                                   user_client):
+        settings.SERVER_TIMING = True
+        settings.PROFILE_DIR = str(tmp_path)
+        response = admin_client.get(self.URL, {'profile': 1})
+        name = get_metrics(response)['profile'].split('"')[1]
+        assert (tmp_path / name).exists(), (
+            'Проверьте, что для администратора сохраняется дамп cProfile.'
+        )
+        for client in (user_client, APIClient()):
+            response = client.get('/api/v1/titles/', {'profile': 1})
+            assert 'profile' not in get_metrics(response)
+        settings.PROFILE_SAMPLE_RATE = 0
+        response = admin_client.get(self.URL, {'profile': 1})
+        assert 'profile' not in get_metrics(response)
+        assert len(list(tmp_path.iterdir())) == 1
+
+    def test_04_nested_phases(self):
+        from api.profiling import Timings
+
+        timings = Timings()
+        with timings.measure('serialize'):
+            with timings.measure('db'):
+                sum(range(100000))
+        assert 0 < timings.phases['serialize'] < timings.phases['db'], (
+            'Проверьте, что время вложенных фаз не учитывается во внешней.'
+        )
+
+    def test_05_profile_starts_after_authentication(
+        self, settings, monkeypatch, tmp_path, user_client
+    ):
+        from api import profiling
+
+        created = []
+
+        class Profile(profiling.Profile):
+            def __init__(self):
+                super().__init__()
+                created.append(self)
+
+        monkeypatch.setattr(profiling, 'Profile', Profile)
+        settings.SERVER_TIMING = True
+        settings.PROFILE_DIR = str(tmp_path)
+        for client in (user_client, APIClient()):
+            client.get('/api/v1/titles/', {'profile': 1})
+        assert not created, (
+            'Проверьте, что cProfile не запускается для запросов '
+            'анонимов и пользователей без прав администратора.'
+        )
@@ -0,0 +1,138 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from time import sleep
+
+import pytest
+from rest_framework.test import APIClient
+
+from api import metrics as api_metrics
+from api.metrics import registry
+
+URL = '/metrics/'
+
+
+def get_samples(client, **kwargs):
+    response = client.get(URL, **kwargs)
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    samples = {}
+    for line in response.content.decode().splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+@pytest.fixture
+def metrics(settings):
+    settings.METRICS = True
+    registry.reset()
+    yield
+    registry.reset()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30Metrics:
+
+    def test_01_disabled_by_default(self, client):
+        response = client.get(URL)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что метрики выключены по умолчанию.'
+        )
+
+    def test_02_requests(self, metrics):
+        client = APIClient()
+        for _ in range(2):
+            client.get('/api/v1/titles/')
+        client.get('/api/v1/unknown/')
+        samples = get_samples(client)
+        labels = 'route="title-list",method="GET"'
+        assert samples[
+            'yamdb_http_requests_total{' + labels + ',status="200"}'
+        ] == 2, 'Проверьте, что запросы считаются по имени маршрута.'
+        assert samples[
+            'yamdb_http_request_duration_seconds_count{' + labels + '}'
+        ] == 2
+        assert samples[
+            'yamdb_http_request_duration_seconds_bucket{'
+            + labels + ',le="+Inf"}'
+        ] == 2
+        assert f'yamdb_db_queries_per_request_sum{{{labels}}}' in samples
+        assert samples[
+            'yamdb_http_requests_total{route="unmatched",method="GET",'
+            'status="404"}'
+        ] == 1, (
+            'Проверьте, что запросы к неизвестным адресам не создают '
+            'отдельную метку для каждого пути.'
+        )
+        assert samples[
+            'yamdb_cache_requests_total{cache="response",result="hit"}'
+        ] == 1, 'Проверьте, что считаются попадания в кэш ответов.'
+        assert samples[
+            'yamdb_cache_requests_total{cache="response",result="miss"}'
+        ] == 1
+
+    def test_03_token(self, metrics, settings):
+        settings.METRICS_TOKEN = 'secret'
+        client = APIClient()
+        assert client.get(URL).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что при METRICS_TOKEN метрики доступны только '
+            'с токеном.'
+        )
+        get_samples(client, HTTP_AUTHORIZATION='Bearer secret')
+
+    def test_04_processes(self, metrics, settings, tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        client = APIClient()
+        client.get('/api/v1/genres/')
+        registry.flush(str(tmp_path))
+        files = list(tmp_path.glob('*.json'))
+        assert len(files) == 1, (
+            'Проверьте, что процесс сохраняет метрики в METRICS_DIR.'
+        )
+        other = json.loads(files[0].read_text())
+        (tmp_path / 'other.json').write_text(json.dumps(other))
+        samples = get_samples(client)
+        assert samples[
+            'yamdb_http_requests_total{route="genre-list",method="GET",'
+            'status="200"}'
+        ] == 2, 'Проверьте, что метрики процессов из METRICS_DIR суммируются.'
+
+    def test_05_concurrent_flush(self, metrics, tmp_path):
+        registry.increment('yamdb_http_requests_total', ('r', 'GET', '200'))
+
+        def flush(_):
+            registry.flush(str(tmp_path))
+
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(flush, range(400)))
+        files = list(tmp_path.iterdir())
+        assert [file.suffix for file in files] == ['.json'], (
+            'Проверьте, что одновременная запись метрик не оставляет '
+            'временных файлов.'
+        )
+        assert json.loads(files[0].read_text()) == registry.snapshot()
+
+    def test_06_background_flush(self, metrics, settings, tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        settings.METRICS_FLUSH_INTERVAL = 0.05
+        APIClient().get('/api/v1/genres/')
+        for _ in range(100):
+            if list(tmp_path.glob('*.json')):
+                break
+            sleep(0.05)
+        assert list(tmp_path.glob('*.json')), (
+            'Проверьте, что метрики сохраняются в METRICS_DIR фоновым '
+            'потоком.'
+        )
+
+    def test_07_errors_do_not_fail_requests(self, metrics, monkeypatch):
+        def fail(*args):
+            raise OSError
+
+        monkeypatch.setattr(api_metrics, 'record_request', fail)
+        response = APIClient().get('/api/v1/genres/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ошибка учёта метрик не влияет на ответ.'
+        )